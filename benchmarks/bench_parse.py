@@ -0,0 +1,84 @@
+"""Benchmark the parsing of the bundled PRIDE dataset.
+
+Compares the construction of one path object per row (the previous
+implementation of parse_from_pandas) with the current parse functions.
+
+    python benchmarks/bench_parse.py
+    python benchmarks/bench_parse.py --dataset ensembl --repeat 5
+    python benchmarks/bench_parse.py --jobs 2 4 8
+
+"""
+
+import argparse
+import os
+import time
+
+import pandas as pd
+
+import path2insight
+from path2insight import PosixFilePath
+
+DATA_DIR = os.path.join(
+    os.path.dirname(path2insight.__file__), 'datasets', 'data')
+DATASETS = {
+    'pride': ('pride.csv.gzip', 'utf-8'),
+    'ensembl': ('ensembl90.csv.gzip', 'ascii'),
+}
+
+
+def timeit(func, repeat):
+    """Return the best time of a number of runs."""
+
+    times = []
+    for _ in range(repeat):
+        start = time.time()
+        func()
+        times.append(time.time() - start)
+
+    return min(times)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dataset", choices=sorted(DATASETS),
+                        default='pride')
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--jobs", type=int, nargs='*', default=[],
+                        help="also parse with these numbers of processes")
+    args = parser.parse_args()
+
+    filename, encoding = DATASETS[args.dataset]
+    data = pd.read_csv(os.path.join(DATA_DIR, filename), encoding=encoding,
+                       compression='gzip')
+    series = data.iloc[:, 0]
+
+    cases = [
+        ('one PosixFilePath per row',
+         lambda: [PosixFilePath(fp) for fp in series.tolist()]),
+        ('parse (list)',
+         lambda: path2insight.parse(series, os_name='posix')),
+        ('parse (columnar)',
+         lambda: path2insight.parse(series, os_name='posix',
+                                    columnar=True)),
+    ]
+    for n_jobs in args.jobs:
+        cases += [
+            ('parse (list, n_jobs={})'.format(n_jobs),
+             lambda n_jobs=n_jobs: path2insight.parse(
+                 series, os_name='posix', n_jobs=n_jobs)),
+            ('parse (columnar, n_jobs={})'.format(n_jobs),
+             lambda n_jobs=n_jobs: path2insight.parse(
+                 series, os_name='posix', columnar=True, n_jobs=n_jobs)),
+        ]
+
+    baseline = None
+    for name, func in cases:
+        elapsed = timeit(func, args.repeat)
+        baseline = baseline or elapsed
+        print("{:<32s} {:8.3f}s {:10.0f} paths/s {:6.1f}x".format(
+            name, elapsed, len(series) / elapsed, baseline / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark path2insight.profile on the bundled datasets.
+
+Compares the sequential calls of the count functions (one pass over the
+paths each) with a single call of path2insight.profile.
+
+    python benchmarks/bench_profile.py
+    python benchmarks/bench_profile.py --dataset ensembl --lower
+
+"""
+
+import argparse
+import time
+
+import path2insight
+from path2insight.datasets import load_pride, load_ensembl
+
+DATASETS = {
+    'pride': load_pride,
+    'ensembl': load_ensembl,
+}
+
+
+def sequential(paths, stats, lower):
+    """Compute the statistics with the count functions."""
+
+    funcs = {
+        'depth': lambda: path2insight.depth_counts(paths),
+        'extension': lambda: path2insight.extension_counts(
+            paths, lower=lower),
+        'n_extension': lambda: path2insight.n_extension_counts(paths),
+        'name': lambda: path2insight.name_counts(paths, lower=lower),
+        'stem': lambda: path2insight.stem_counts(paths, lower=lower),
+        'drive': lambda: path2insight.drive_counts(paths, lower=lower),
+        'token': lambda: path2insight.token_counts(paths, lower=lower),
+    }
+
+    return dict((stat, funcs[stat]()) for stat in stats)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dataset", choices=sorted(DATASETS),
+                        default='pride')
+    parser.add_argument("--lower", action='store_true')
+    args = parser.parse_args()
+
+    all_stats = list(path2insight.PROFILE_STATS)
+    no_tokens = [stat for stat in all_stats if stat != 'token']
+
+    # each run on freshly loaded paths, the tokens are memoised on the
+    # paths after the first run
+    for stats in [no_tokens, all_stats]:
+        print("stats: {}".format(", ".join(stats)))
+
+        results = []
+        for name, func in [('sequential calls', sequential),
+                           ('profile', path2insight.profile)]:
+            paths = DATASETS[args.dataset]()
+
+            start = time.time()
+            results.append(func(paths, stats, lower=args.lower))
+            elapsed = time.time() - start
+
+            print("  {:<22s} {:8.3f}s".format(name, elapsed))
+
+        assert results[0] == results[1]
+
+
+if __name__ == "__main__":
+    main()
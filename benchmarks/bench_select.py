@@ -0,0 +1,116 @@
+"""Benchmark path2insight.select and select_re on the bundled PRIDE dataset.
+
+Compares the previous implementation (one pass over the paths per level,
+re.match for every path and value) with the compiled query plan of the
+current select functions, on multi-level and multi-value queries.
+
+    python benchmarks/bench_select.py
+    python benchmarks/bench_select.py --dataset ensembl --repeat 5
+
+"""
+
+import argparse
+import re
+import time
+
+from collections import Counter
+
+import path2insight
+from path2insight.datasets import load_pride, load_ensembl
+
+DATASETS = {
+    'pride': load_pride,
+    'ensembl': load_ensembl,
+}
+
+
+def timeit(func, repeat):
+    """Return the best time of a number of runs."""
+
+    times = []
+    for _ in range(repeat):
+        start = time.time()
+        func()
+        times.append(time.time() - start)
+
+    return min(times)
+
+
+def select_previous(paths, use_re, **kwargs):
+    """The previous implementation of select and select_re."""
+
+    def match(path, level, v):
+        if use_re:
+            return bool(re.match(v, path[level]))
+        elif v == "*" or v is True:
+            path[level]
+            return True
+        return path[level] == v
+
+    selection = paths
+    for key, value in kwargs.items():
+        level = int(key[5:])
+        if not isinstance(value, (list, tuple)):
+            value = [value]
+
+        temp = []
+        for path in selection:
+            try:
+                if any([match(path.parts, level, v) for v in value]):
+                    temp.append(path)
+            except IndexError:
+                pass
+        selection = temp
+
+    return selection
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dataset", choices=sorted(DATASETS),
+                        default='pride')
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    paths = DATASETS[args.dataset]()
+
+    # the most common parts on levels 1 to 4 as query values
+    common = [path2insight.select(paths, **{'level{}'.format(level): '*'})
+              for level in range(1, 5)]
+    values = [
+        [v for v, _ in Counter(
+            [fp.parts[level + 1] for fp in selection]).most_common(3)]
+        for level, selection in enumerate(common)]
+
+    queries = [
+        ('select, 2 levels',
+         False, {'level1': values[0][0], 'level2': values[1]}),
+        ('select, 4 levels, 3 values',
+         False, dict(('level{}'.format(i + 1), v)
+                     for i, v in enumerate(values))),
+        ('select_re, 2 levels',
+         True, {'level1': r"^[a-z]", 'level3': [r"^20", r"^PXD"]}),
+        ('select_re, 3 levels, 3 patterns',
+         True, {'level2': [r"^a", r"^d", r"^p"],
+                'level3': [r"^19", r"^20", r"^PRD"],
+                'level4': [r"\d$", r"^P", r"^[a-z]"]}),
+    ]
+
+    print("{:<32s} {:>10s} {:>10s} {:>8s}".format(
+        'query', 'previous', 'current', 'speedup'))
+    for name, use_re, kwargs in queries:
+        func = path2insight.select_re if use_re else path2insight.select
+
+        assert func(paths, **kwargs) == \
+            select_previous(paths, use_re, **kwargs)
+
+        previous = timeit(
+            lambda: select_previous(paths, use_re, **kwargs), args.repeat)
+        current = timeit(lambda: func(paths, **kwargs), args.repeat)
+        print("{:<32s} {:9.3f}s {:9.3f}s {:7.1f}x".format(
+            name, previous, current, previous / current))
+
+
+if __name__ == "__main__":
+    main()
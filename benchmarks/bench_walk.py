@@ -0,0 +1,77 @@
+"""Benchmark the serial and parallel crawler of path2insight.walk.
+
+A synthetic deep/wide tree is created in a temporary directory. The
+latency of a network file system can be simulated with --latency (in
+milliseconds per directory listing).
+
+    python benchmarks/bench_walk.py --depth 4 --width 6 --files 10
+    python benchmarks/bench_walk.py --latency 2 --jobs 1 4 16
+
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import path2insight
+
+
+def make_tree(root, depth, width, n_files):
+    """Create a tree with width**depth leaf directories."""
+
+    if depth == 0:
+        return
+
+    for i in range(width):
+        folder = os.path.join(root, "dir{}".format(i))
+        os.mkdir(folder)
+        for j in range(n_files):
+            open(os.path.join(folder, "file{}.txt".format(j)), "w").close()
+        make_tree(folder, depth - 1, width, n_files)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--width", type=int, default=6)
+    parser.add_argument("--files", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+
+    try:
+        make_tree(root, args.depth, args.width, args.files)
+
+        if args.latency:
+            scandir = os.scandir
+
+            def slow_scandir(path):
+                time.sleep(args.latency / 1000)
+                return scandir(path)
+
+            # os.walk (serial mode) and the crawler both use os.scandir
+            os.scandir = slow_scandir
+
+        expected = None
+        for n_jobs in args.jobs:
+            start = time.time()
+            result = path2insight.walk(root, n_jobs=n_jobs)
+            elapsed = time.time() - start
+
+            if expected is None:
+                expected = result
+            assert result == expected
+
+            print("n_jobs={:<3d} files={} folders={} time={:.3f}s".format(
+                n_jobs, len(result[0]), len(result[1]), elapsed))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
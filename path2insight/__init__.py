@@ -1,6 +1,12 @@
 import sys
 
 from path2insight.core import WindowsFilePath, PosixFilePath
+from path2insight.core import CompactWindowsFilePath, CompactPosixFilePath
+from path2insight.frame import PathFrame
+from path2insight.pool import InternPool
+from path2insight.trie import PathTrie
+from path2insight.algorithms.sketches import HeavyHitters, HyperLogLog
+from path2insight.algorithms.bktree import BKTree
 from path2insight.parse import *
 from path2insight.collect import *
 from path2insight.handling import *
@@ -0,0 +1,259 @@
+"""Metric index for nearest-neighbour queries on the Levenshtein distance."""
+
+from heapq import heappush, heappop
+
+from path2insight.algorithms.stringdist import _myers_distance, _myers_masks
+from path2insight.frame import PathFrame
+from path2insight.tokenizers import DEFAULT_TOKENIZE_PATTERN
+
+
+class BKTree(object):
+    """Burkhard-Keller tree (BK-tree) of strings or token sequences.
+
+    The tree answers nearest-neighbour and range queries on the
+    Levenshtein distance without comparing the query to every indexed
+    value. Each node stores a value and its children by their distance to
+    that value. The triangle inequality limits a query to the children
+    with a distance close to the distance of the query to the node.
+
+    The values are strings (like the stems of the paths) or sequences of
+    tokens, which are stored as tuples. Duplicates are indexed once. The
+    tree is stored in flat lists, so it can be pickled (and reused) for
+    any number of values.
+
+    :param values: The strings or token sequences to index.
+    :type values: iterable
+
+    :Example:
+
+    >>> tree = path2insight.BKTree.from_paths(paths)
+    >>> tree.nearest('F01_run3', k=2)
+    [('F01_run1', 1), ('F01_run2', 1)]
+    >>> tree.within('F01_run3', 2)
+    [('F01_run1', 1), ('F01_run2', 1), ('F02_run1', 2)]
+    >>> pickle.dump(tree, open('stems.pkl', 'wb'))
+
+    """
+
+    def __init__(self, values=None):
+
+        self._values = []
+        self._children = []
+
+        if values is not None:
+            self.update(values)
+
+    @classmethod
+    def from_paths(cls, paths, key='stem', lower=False,
+                   token_pattern=DEFAULT_TOKENIZE_PATTERN):
+        """Index the stems, names or stem tokens of file paths.
+
+        :param paths: The paths to index.
+        :type paths: list of WindowsFilePath or PosixFilePath objects,
+            PathFrame
+        :param key: 'stem', 'name' or 'tokens' (the tokens of the stem).
+            Default 'stem'.
+        :type key: str
+        :param lower: Convert the values to lower before indexing. Query
+            the tree with lowered values. Default False.
+        :type lower: bool
+        :param token_pattern: The regular expression to tokenise the stems
+            with when key is 'tokens'.
+        :type token_pattern: str, regexp
+
+        :return: The tree with the unique values, indexed in sorted order.
+        :return_type: BKTree
+        """
+
+        if key not in ('stem', 'name', 'tokens'):
+            raise ValueError("key must be 'stem', 'name' or 'tokens'")
+
+        if key == 'tokens':
+            values = set([
+                tuple(t.lower() for t in fp.tokenize_stem(token_pattern))
+                if lower else tuple(fp.tokenize_stem(token_pattern))
+                for fp in paths])
+        elif isinstance(paths, PathFrame):
+            values = paths.counts(key, lower=lower)
+        elif lower:
+            values = set([getattr(fp, key).lower() for fp in paths])
+        else:
+            values = set([getattr(fp, key) for fp in paths])
+
+        return cls(sorted(values))
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return "BKTree(n={})".format(len(self))
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __contains__(self, value):
+        return bool(self.within(value, 0))
+
+    def add(self, value):
+        """Add a string or token sequence to the tree.
+
+        :return: False if the value was already in the tree.
+        :return_type: bool
+        """
+
+        if not isinstance(value, str):
+            value = tuple(value)
+
+        values = self._values
+        children = self._children
+
+        if not values:
+            values.append(value)
+            children.append(None)
+            return True
+
+        peq = _myers_masks(value)
+        m = len(value)
+
+        node = 0
+        while True:
+            d = _myers_distance(peq, m, values[node])
+            if d == 0:
+                return False
+
+            edges = children[node]
+            if edges is None:
+                children[node] = edges = {}
+
+            child = edges.get(d)
+            if child is None:
+                edges[d] = len(values)
+                values.append(value)
+                children.append(None)
+                return True
+
+            node = child
+
+    def update(self, values):
+        """Add the strings or token sequences of an iterable to the tree."""
+
+        for value in values:
+            self.add(value)
+
+    def _query(self, value):
+        """Return the bit masks, length and value for a query."""
+
+        if not isinstance(value, str):
+            value = tuple(value)
+
+        return _myers_masks(value), len(value), value
+
+    def within(self, value, radius):
+        """Find the values within a distance of a string or token sequence.
+
+        :param value: The string or token sequence to query.
+        :type value: str, list
+        :param radius: The maximum Levenshtein distance.
+        :type radius: int
+
+        :return: The pairs (value, distance), sorted by distance and value.
+        :return_type: list of tuple
+        """
+
+        if radius < 0:
+            raise ValueError('radius must be zero or positive')
+
+        if not self._values:
+            return []
+
+        values = self._values
+        children = self._children
+        peq, m, value = self._query(value)
+
+        result = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            d = _myers_distance(peq, m, values[node])
+            if d <= radius:
+                result.append((values[node], d))
+
+            edges = children[node]
+            if edges is not None:
+                for e, child in edges.items():
+                    if d - radius <= e <= d + radius:
+                        stack.append(child)
+
+        result.sort(key=lambda pair: (pair[1], pair[0]))
+
+        return result
+
+    def nearest(self, value, k=1):
+        """Find the k nearest values of a string or token sequence.
+
+        The subtrees are visited in the order of the lower bound of their
+        distance (from the triangle inequality), and the subtrees with a
+        lower bound larger than the distance of the k-th nearest value
+        found so far are skipped.
+
+        :param value: The string or token sequence to query.
+        :type value: str, list
+        :param k: The number of values to return. Default 1.
+        :type k: int
+
+        :return: The pairs (value, distance) of the k nearest values,
+            sorted by distance and value. Of the values at the distance of
+            the k-th nearest value, the smallest values are returned.
+        :return_type: list of tuple
+        """
+
+        if k < 1:
+            raise ValueError('k must be a positive integer')
+
+        if not self._values:
+            return []
+
+        values = self._values
+        children = self._children
+        peq, m, value = self._query(value)
+
+        # the k nearest values found so far, as a max-heap on (distance,
+        # value)
+        best = []
+        heap = [(0, 0)]
+        while heap:
+            bound, node = heappop(heap)
+            if len(best) == k and bound > best[0].distance:
+                break
+
+            d = _myers_distance(peq, m, values[node])
+            if len(best) < k:
+                heappush(best, _Neighbour(d, values[node]))
+            elif (d, values[node]) < (best[0].distance, best[0].value):
+                heappop(best)
+                heappush(best, _Neighbour(d, values[node]))
+
+            edges = children[node]
+            if edges is not None:
+                radius = best[0].distance if len(best) == k else None
+                for e, child in edges.items():
+                    lower_bound = max(bound, abs(d - e))
+                    if radius is None or lower_bound <= radius:
+                        heappush(heap, (lower_bound, child))
+
+        return sorted([(n.value, n.distance) for n in best],
+                      key=lambda pair: (pair[1], pair[0]))
+
+
+class _Neighbour(object):
+    """A value and its distance, ordered as a max-heap on both."""
+
+    __slots__ = ('distance', 'value')
+
+    def __init__(self, distance, value):
+
+        self.distance = distance
+        self.value = value
+
+    def __lt__(self, other):
+        return (self.distance, self.value) > (other.distance, other.value)
@@ -0,0 +1,253 @@
+"""Summaries of large streams with a bounded memory budget."""
+
+from collections import Counter
+from collections.abc import Mapping
+from hashlib import blake2b
+from heapq import nlargest
+from itertools import islice
+from math import log, sqrt
+
+# the number of items counted exactly before they are merged into the
+# summary (or hashed at once into a HyperLogLog sketch)
+CHUNK_SIZE = 10000
+
+
+class HeavyHitters(Counter):
+    """Counter of the most frequent items with a bounded memory budget.
+
+    The counter keeps at most capacity items (the Misra-Gries summary,
+    which is equivalent to the Space-Saving summary). The items are
+    counted exactly in chunks and each chunk is merged into the summary.
+    When the summary holds more than capacity items, the (capacity + 1)-th
+    largest count is subtracted from all counts and the items with a count
+    of zero or less are removed.
+
+    The counts are lower bounds: the true count of an item is at least its
+    count and at most its count plus :py:attr:`error`. Items with a true
+    count larger than :py:attr:`error` are always in the counter. The
+    error is at most n / (capacity + 1), with n the number of counted
+    items. Summaries are mergeable: updating a summary with another
+    summary gives the same guarantees for the union of the streams.
+
+    :param iterable: The items to count, or a mapping of items to counts.
+    :type iterable: iterable, dict
+    :param capacity: The maximum number of items in the counter. Default
+        1000.
+    :type capacity: int
+
+    :Example:
+
+    >>> c = HeavyHitters((fp.name for fp in paths), capacity=1000)
+    >>> c.most_common(2)
+    [('README', 4128), ('index.html', 988)]
+    >>> c.n, c.error
+    (1254321, 13)
+
+    """
+
+    def __init__(self, iterable=None, capacity=1000):
+
+        if capacity < 1:
+            raise ValueError('capacity must be a positive integer')
+
+        self.capacity = capacity
+        self.n = 0
+        self.error = 0
+
+        super(HeavyHitters, self).__init__()
+        self.update(iterable)
+
+    def update(self, iterable=None):
+        """Count the items of an iterable, or add the counts of a mapping.
+
+        Another summary (or Counter) is merged as a mapping. Its error
+        adds up with the error of this summary.
+        """
+
+        if iterable is None:
+            return
+
+        if isinstance(iterable, Mapping):
+            n = iterable.n if isinstance(iterable, HeavyHitters) \
+                else sum(iterable.values())
+            self._merge(iterable, n)
+            return
+
+        it = iter(iterable)
+        while True:
+            chunk = list(islice(it, max(self.capacity, CHUNK_SIZE)))
+            if not chunk:
+                return
+            self._merge(Counter(chunk), len(chunk), copy=False)
+
+    def _merge(self, counts, n, copy=True):
+
+        # add the smaller counts to the larger counts
+        if len(counts) > len(self):
+            merged = Counter(counts) if copy else counts
+            for key, value in self.items():
+                merged[key] += value
+        else:
+            merged = self
+            for key, value in counts.items():
+                merged[key] += value
+        self.n += n
+
+        if len(merged) > self.capacity:
+            kth = nlargest(self.capacity + 1, merged.values())[-1]
+            merged = dict([(key, value - kth)
+                           for key, value in merged.items() if value > kth])
+
+        if merged is not self:
+            dict.clear(self)
+            dict.update(self, merged)
+
+        self.error = (self.n - sum(self.values())) // (self.capacity + 1)
+
+    def copy(self):
+        """Return a copy of the summary."""
+
+        c = HeavyHitters(capacity=self.capacity)
+        dict.update(c, self)
+        c.n = self.n
+        c.error = self.error
+
+        return c
+
+    def __reduce__(self):
+        return (self.__class__, (None, self.capacity),
+                {'n': self.n, 'error': self.error}, None, iter(self.items()))
+
+
+def _hash64(s):
+    """Return a 64 bit hash of a string, equal in all processes."""
+
+    return int.from_bytes(
+        blake2b(s.encode('utf-8', 'surrogatepass'), digest_size=8).digest(),
+        'big')
+
+
+class HyperLogLog(object):
+    """Estimate the number of distinct strings with a bounded memory budget.
+
+    The HyperLogLog sketch uses 2 ** precision registers of one byte. The
+    relative standard error of the estimate is 1.04 / sqrt(2 **
+    precision), about 0.8% for the default precision of 14 (16 kB).
+    Duplicates don't change the sketch, and sketches of the same
+    precision are mergeable: the sketch of the union of two collections
+    is the merge of their sketches. The strings are hashed with BLAKE2, so
+    sketches of different processes can be merged.
+
+    :param iterable: The strings to count.
+    :type iterable: iterable of str
+    :param precision: The number of bits of the hash used to select a
+        register, between 4 and 18. Default 14.
+    :type precision: int
+
+    :Example:
+
+    >>> hll = HyperLogLog(fp.name for fp in paths)
+    >>> hll.cardinality()
+    361122
+    >>> hll.update(fp.name for fp in other_paths)
+    >>> hll.cardinality()
+    398801
+
+    """
+
+    def __init__(self, iterable=None, precision=14):
+
+        if not 4 <= precision <= 18:
+            raise ValueError('precision must be between 4 and 18')
+
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+        self.update(iterable)
+
+    @property
+    def error(self):
+        """The relative standard error of the estimate."""
+
+        return 1.04 / sqrt(len(self.registers))
+
+    def add(self, s):
+        """Add a string to the sketch."""
+
+        self._add_hashes([_hash64(s)])
+
+    def update(self, iterable=None):
+        """Add the strings of an iterable, or merge another sketch."""
+
+        if iterable is None:
+            return
+
+        if isinstance(iterable, HyperLogLog):
+            if iterable.precision != self.precision:
+                raise ValueError(
+                    'sketches with a different precision cannot be merged')
+            self.registers = bytearray(
+                map(max, self.registers, iterable.registers))
+            return
+
+        # duplicates don't change the registers, so each unique string of
+        # a chunk is hashed once
+        it = iter(iterable)
+        while True:
+            chunk = set(islice(it, CHUNK_SIZE))
+            if not chunk:
+                return
+            self._add_hashes(map(_hash64, chunk))
+
+    def _add_hashes(self, hashes):
+
+        registers = self.registers
+        shift = 64 - self.precision
+        mask = (1 << shift) - 1
+
+        for h in hashes:
+            i = h >> shift
+            rank = shift - (h & mask).bit_length() + 1
+            if rank > registers[i]:
+                registers[i] = rank
+
+    def cardinality(self):
+        """Return the estimated number of distinct strings.
+
+        :return: The estimate.
+        :return_type: int
+        """
+
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum([2.0 ** -r for r in self.registers])
+
+        # linear counting for small cardinalities
+        zeros = self.registers.count(0)
+        if zeros and estimate <= 2.5 * m:
+            estimate = m * log(m / zeros)
+
+        return int(round(estimate))
+
+    def copy(self):
+        """Return a copy of the sketch."""
+
+        hll = HyperLogLog(precision=self.precision)
+        hll.registers = bytearray(self.registers)
+
+        return hll
+
+    def __or__(self, other):
+
+        hll = self.copy()
+        hll.update(other)
+
+        return hll
+
+    def __eq__(self, other):
+        return isinstance(other, HyperLogLog) and \
+            self.registers == other.registers
+
+    def __repr__(self):
+        return "HyperLogLog(precision={}, cardinality={})".format(
+            self.precision, self.cardinality())
@@ -1,26 +1,784 @@
 """String distance algorithms."""
 
-from path2insight.utils import _import_jellyfish
+from __future__ import division
 
+import os
 
-def levenshtein(list1_str, list2_str=None):
-    """Internal function to compute the Levenshtein distance."""
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from tempfile import TemporaryDirectory
+
+from path2insight.utils import _import_numpy
+
+# the number of rows and columns of the blocks of the distance matrix
+BLOCK_SIZE = 128
+
+# matrices with fewer unique strings in the rows are computed in the
+# current process
+PARALLEL_MIN_SIZE = 1000
+
+# strings up to this length are compared with the bit-parallel algorithm
+_WORD_SIZE = 64
+
+# the number of buckets of characters of the character count filter
+_N_BUCKETS = 64
 
-    lv = _import_jellyfish()
 
-    if list2_str is None:
-        list2_str = list1_str
+def levenshtein(list1_str, list2_str=None, n_jobs=1):
+    """Internal function to compute the Levenshtein distance."""
 
-    return [[lv(s1, s2) for s2 in list2_str] for s1 in list1_str]
+    return levenshtein_matrix(list1_str, list2_str, n_jobs=n_jobs)
 
 
-def levenshtein_normalised(list1_str, list2_str=None):
+def levenshtein_normalised(list1_str, list2_str=None, n_jobs=1):
     """Internal function to compute the Levenshtein distance."""
 
-    lv = _import_jellyfish()
+    return levenshtein_matrix(list1_str, list2_str, normalise=True,
+                              n_jobs=n_jobs)
+
+
+def levenshtein_matrix(list1_str, list2_str=None, normalise=False,
+                       block_size=BLOCK_SIZE, out=None, n_jobs=1):
+    """Compute the Levenshtein distance matrix of two lists of strings.
+
+    The distances of the unique strings are computed in blocks with the
+    bit-parallel algorithm of Myers (1999), vectorised with NumPy over all
+    pairs of a block. Without list2_str, the distances between the
+    strings of list1_str are computed and only half of the matrix is
+    computed.
+
+    :param list1_str: The strings of the rows.
+    :type list1_str: list of str
+    :param list2_str: The strings of the columns. Default None (the
+        strings of the rows).
+    :type list2_str: list of str
+    :param normalise: Divide the distances by the length of the longest
+        string of each pair. Default False.
+    :type normalise: bool
+    :param block_size: The number of rows and columns of a block.
+        Default 128.
+    :type block_size: int
+    :param out: Write the matrix to this array, or to a memory-mapped
+        .npy file with this name (open it with
+        :code:`numpy.load(out, mmap_mode='r')`). Default None (a new
+        array).
+    :type out: numpy.ndarray, str
+    :param n_jobs: The number of processes. The matrix is split into tiles
+        of rows, which the processes write into a memory-mapped file. Use
+        -1 for all cores. Matrices with less than PARALLEL_MIN_SIZE unique
+        strings in the rows are always computed in the current process.
+        Default 1.
+    :type n_jobs: int
+
+    :return: The distance matrix with a row for each string of list1_str
+        and a column for each string of list2_str (int32, or float64 if
+        normalised).
+    :return_type: numpy.ndarray, numpy.memmap
+    """
+
+    numpy = _import_numpy()
+
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+
+    if n_jobs < 1:
+        raise ValueError('n_jobs must be a positive integer or -1')
+
+    list1_str = list(list1_str)
+    symmetric = list2_str is None
+    list2_str = list1_str if symmetric else list(list2_str)
+
+    shape = (len(list1_str), len(list2_str))
+    dtype = 'float64' if normalise else 'int32'
+
+    if out is None:
+        out = numpy.empty(shape, dtype=dtype)
+    elif isinstance(out, str):
+        out = numpy.lib.format.open_memmap(
+            out, mode='w+', dtype=dtype, shape=shape)
+    elif out.shape != shape:
+        raise ValueError('out must have shape {}'.format(shape))
+
+    if normalise:
+        lengths1 = numpy.array([len(s) for s in list1_str], dtype='i8')
+        lengths2 = numpy.array([len(s) for s in list2_str], dtype='i8')
+
+    # the distances are computed once for each pair of unique strings
+    unique1, rows = _unique(list1_str, numpy)
+    if symmetric:
+        unique2, cols = None, rows
+    else:
+        unique2, cols = _unique(list2_str, numpy)
+
+    with TemporaryDirectory() as tmp_dir:
+        dist = _distances(unique1, unique2, block_size, n_jobs, tmp_dir,
+                          numpy)
+
+        for start in range(0, shape[0], block_size):
+            end = min(start + block_size, shape[0])
+            block = dist[rows[start:end, None], cols[None, :]]
+            if normalise:
+                longest = numpy.maximum(lengths1[start:end, None],
+                                        lengths2[None, :])
+                block = numpy.divide(block, longest, where=longest > 0,
+                                     out=numpy.zeros(block.shape))
+            out[start:end] = block
+
+        # close the memory-mapped file before it is removed
+        del dist
+
+    return out
+
+
+def _unique(strings, numpy):
+    """Return the unique strings (longest first) and the inverse index."""
+
+    unique = sorted(set(strings), key=len, reverse=True)
+    index = dict((s, i) for i, s in enumerate(unique))
+
+    return unique, numpy.array([index[s] for s in strings], dtype='i8')
+
+
+def _encode(strings, chars, numpy):
+    """Encode strings as rows of character ids, padded with zeros."""
+
+    lengths = numpy.array([len(s) for s in strings], dtype='i8')
+    width = int(lengths.max()) if len(strings) else 0
+    codes = numpy.zeros((len(strings), width), dtype='i8')
+
+    points = numpy.frombuffer(
+        ''.join(strings).encode('utf-32-le', 'surrogatepass'), dtype='<u4')
+    if len(points):
+        starts = numpy.repeat(numpy.cumsum(lengths) - lengths, lengths)
+        codes[numpy.repeat(numpy.arange(len(strings)), lengths),
+              numpy.arange(len(points)) - starts] = \
+            numpy.searchsorted(chars, points) + 1
+
+    return codes, lengths
+
+
+def _myers(pattern, text, numpy):
+    """Distances between patterns of at most 64 characters and texts.
+
+    The bit-parallel algorithm of Myers (1999), in the formulation of
+    Hyyro (2001), for all pairs at once. The bit vectors of the pairs are
+    the elements of uint64 arrays. The texts are sorted by length (longest
+    first), so the texts still being read are the first columns.
+    """
+
+    pattern_codes, pattern_lengths = pattern
+    text_codes, text_lengths = text
+
+    # the bit masks of the characters of each pattern, the characters
+    # that are not in any pattern have no bits
+    symbols = numpy.unique(pattern_codes[pattern_codes > 0])
+    lookup = numpy.zeros(
+        max(int(pattern_codes.max(initial=0)),
+            int(text_codes.max(initial=0))) + 1, dtype='i8')
+    lookup[symbols] = numpy.arange(1, len(symbols) + 1)
+
+    n_patterns = len(pattern_lengths)
+    peq = numpy.zeros((n_patterns, len(symbols) + 1), dtype='u8')
+    rows = numpy.arange(n_patterns)
+    for k in range(pattern_codes.shape[1]):
+        peq[rows, lookup[pattern_codes[:, k]]] |= numpy.uint64(1 << k)
+    peq[:, 0] = 0
+
+    text_codes = lookup[text_codes]
+
+    one = numpy.uint64(1)
+    high = numpy.where(
+        pattern_lengths > 0,
+        numpy.left_shift(one, numpy.maximum(pattern_lengths, 1)
+                         .astype('u8') - one), 0).astype('u8')[:, None]
+
+    shape = (n_patterns, len(text_lengths))
+    pv = numpy.full(shape, ~numpy.uint64(0))
+    mv = numpy.zeros(shape, dtype='u8')
+    xv, xh, ph, mh = [numpy.empty(shape, dtype='u8') for _ in range(4)]
+    score = numpy.repeat(pattern_lengths.astype('i8')[:, None], shape[1],
+                         axis=1)
+
+    # the number of texts with more than j characters
+    n_active = numpy.searchsorted(-text_lengths,
+                                  -numpy.arange(text_codes.shape[1]),
+                                  side='left')
+
+    for j in range(text_codes.shape[1]):
+        k = n_active[j]
+        pv_k, mv_k, xv_k, xh_k, ph_k, mh_k = \
+            pv[:, :k], mv[:, :k], xv[:, :k], xh[:, :k], ph[:, :k], mh[:, :k]
+
+        eq = peq[:, text_codes[:k, j]]
+        numpy.bitwise_or(eq, mv_k, out=xv_k)
+        numpy.bitwise_and(eq, pv_k, out=xh_k)
+        xh_k += pv_k
+        xh_k ^= pv_k
+        xh_k |= eq
+        numpy.bitwise_or(xh_k, pv_k, out=ph_k)
+        numpy.invert(ph_k, out=ph_k)
+        ph_k |= mv_k
+        numpy.bitwise_and(pv_k, xh_k, out=mh_k)
+
+        # the last row of the matrix changes by +1 or -1
+        score[:, :k] += ((ph_k & high) != 0).view('i1')
+        score[:, :k] -= ((mh_k & high) != 0).view('i1')
+
+        ph_k <<= one
+        ph_k |= one
+        mh_k <<= one
+        numpy.bitwise_or(xv_k, ph_k, out=pv_k)
+        numpy.invert(pv_k, out=pv_k)
+        pv_k |= mh_k
+        numpy.bitwise_and(ph_k, xv_k, out=mv_k)
+
+    # the distance of an empty pattern is the length of the text
+    score[pattern_lengths == 0] = text_lengths
+
+    return score
+
+
+def _myers_masks(pattern):
+    """Return the bit masks of the positions of each element of a pattern,
+    for _myers_distance."""
+
+    peq = {}
+    bit = 1
+    for c in pattern:
+        peq[c] = peq.get(c, 0) | bit
+        bit <<= 1
+
+    return peq
+
+
+def _myers_distance(peq, m, text):
+    """Distance between one pattern (as bit masks) and one text.
+
+    The recurrence of _myers, with Python integers as bit vectors of any
+    length. The pattern and the text are strings or tuples of tokens.
+    """
+
+    if m == 0:
+        return len(text)
+
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv = mask
+    mv = 0
+    score = m
+
+    for c in text:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = (ph << 1) | 1
+        mh <<= 1
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+
+    return score
+
+
+def _levenshtein_pairs(codes1, lengths1, codes2, lengths2, numpy):
+    """Distances between pairs of strings (dynamic programming).
+
+    The rows of the dynamic programming matrix are computed for all pairs
+    at once. The insertions within a row are resolved with a cumulative
+    minimum.
+    """
+
+    n_pairs, width = codes2.shape
+    steps = numpy.arange(width + 1)
+
+    row = numpy.repeat(steps[None, :], n_pairs, axis=0)
+    result = lengths2.copy()
+    for i in range(codes1.shape[1]):
+        cost = codes1[:, i, None] != codes2
+        current = numpy.empty_like(row)
+        current[:, 0] = i + 1
+        numpy.minimum(row[:, 1:] + 1, row[:, :-1] + cost,
+                      out=current[:, 1:])
+        row = numpy.minimum.accumulate(current - steps, axis=1) + steps
+
+        done = lengths1 == i + 1
+        result[done] = row[done, lengths2[done]]
+
+    return result
+
+
+def _distances(strings1, strings2, block_size, n_jobs, tmp_dir, numpy):
+    """Compute the distance matrix of unique strings, longest first.
+
+    The matrix is computed in tiles of rows. With n_jobs processes, the
+    tiles are computed by a pool of processes that write into a
+    memory-mapped file in tmp_dir.
+    """
+
+    symmetric = strings2 is None
+    shape = (len(strings1), len(strings1 if symmetric else strings2))
+
+    chars = numpy.unique(numpy.frombuffer(
+        ''.join(strings1 if symmetric else strings1 + strings2)
+        .encode('utf-32-le', 'surrogatepass'), dtype='<u4'))
+
+    if n_jobs == 1 or shape[0] < PARALLEL_MIN_SIZE:
+        dist = numpy.empty(shape, dtype='int32')
+        _distance_rows(strings1, strings2, chars, 0, shape[0], dist,
+                       block_size, numpy)
+        return dist
+
+    fn = os.path.join(tmp_dir, 'distances.npy')
+    dist = numpy.lib.format.open_memmap(fn, mode='w+', dtype='int32',
+                                        shape=shape)
+    dist.flush()
+
+    # a few tiles per process, the first tiles have the longest strings
+    size = -(-shape[0] // (4 * n_jobs))
+    size = -(-size // block_size) * block_size
+    tiles = [(start, min(start + size, shape[0]))
+             for start in range(0, shape[0], size)]
+
+    with ProcessPoolExecutor(
+            max_workers=n_jobs, initializer=_init_worker,
+            initargs=(strings1, strings2, chars, fn, block_size)) \
+            as executor:
+        list(executor.map(_distance_tile, tiles))
+
+    return dist
+
+
+# the input of the tiles, set once in each worker process
+_worker = {}
+
+
+def _init_worker(strings1, strings2, chars, fn, block_size):
+
+    _worker.update(strings1=strings1, strings2=strings2, chars=chars,
+                   fn=fn, block_size=block_size)
+
+
+def _distance_tile(tile):
+    """Compute a tile of rows in a worker process."""
+
+    numpy = _import_numpy()
+
+    dist = numpy.load(_worker['fn'], mmap_mode='r+')
+    _distance_rows(_worker['strings1'], _worker['strings2'],
+                   _worker['chars'], tile[0], tile[1], dist,
+                   _worker['block_size'], numpy)
+    dist.flush()
+
+
+def _distance_rows(strings1, strings2, chars, start, end, dist, block_size,
+                   numpy):
+    """Compute the rows start to end of the distance matrix.
+
+    The pairs with a string of at most 64 characters are computed in
+    blocks with the bit-parallel algorithm, the other pairs with dynamic
+    programming. Without strings2, only the blocks on and above the
+    diagonal are computed, and mirrored.
+    """
+
+    symmetric = strings2 is None
+    if symmetric:
+        strings2 = strings1
+
+    def encode(strings):
+        return _encode(strings, chars, numpy)
+
+    def blocks(start, end):
+        return [(i, min(i + block_size, end))
+                for i in range(start, end, block_size)]
+
+    n_long1 = sum([len(s) > _WORD_SIZE for s in strings1])
+    n_long2 = sum([len(s) > _WORD_SIZE for s in strings2])
+    long_end = min(end, n_long1)
+
+    # the short strings of the rows against all columns
+    for a0, a1 in blocks(max(start, n_long1), end):
+        pattern = encode(strings1[a0:a1])
+
+        if symmetric:
+            col_blocks = blocks(0, n_long2) + blocks(a0, len(strings2))
+        else:
+            col_blocks = blocks(0, len(strings2))
+
+        for b0, b1 in col_blocks:
+            d = _myers(pattern, encode(strings2[b0:b1]), numpy)
+            dist[a0:a1, b0:b1] = d
+            if symmetric:
+                dist[b0:b1, a0:a1] = d.T
+
+    # the long strings of the rows against the short columns (the short
+    # rows against the long columns when symmetric)
+    if not symmetric and start < long_end:
+        for b0, b1 in blocks(n_long2, len(strings2)):
+            pattern = encode(strings2[b0:b1])
+            for a0, a1 in blocks(start, long_end):
+                d = _myers(pattern, encode(strings1[a0:a1]), numpy)
+                dist[a0:a1, b0:b1] = d.T
+
+    # the pairs of long strings
+    if start < long_end and n_long2:
+        codes1, lengths1 = encode(strings1[start:long_end])
+        codes2, lengths2 = encode(strings2[:n_long2])
+        i, j = numpy.divmod(numpy.arange((long_end - start) * n_long2),
+                            n_long2)
+        if symmetric:
+            i, j = i[i + start <= j], j[i + start <= j]
+        for k in range(0, len(i), block_size):
+            pairs = slice(k, k + block_size)
+            d = _levenshtein_pairs(
+                codes1[i[pairs]], lengths1[i[pairs]],
+                codes2[j[pairs]], lengths2[j[pairs]], numpy)
+            dist[i[pairs] + start, j[pairs]] = d
+            if symmetric:
+                dist[j[pairs], i[pairs] + start] = d
+
+
+def _myers_pairs(pattern, text, numpy):
+    """Distances between pairs of a pattern (at most 64 characters) and a
+    text, with the bit-parallel algorithm (see _myers)."""
+
+    # the texts still being read are the first pairs
+    order = numpy.argsort(-text[1], kind='stable')
+    pattern_codes, pattern_lengths = pattern[0][order], pattern[1][order]
+    text_codes, text_lengths = text[0][order], text[1][order]
+
+    # the bit masks of the characters of each pattern, in a flat table
+    n_pairs = len(order)
+    n_symbols = max(int(pattern_codes.max(initial=0)),
+                    int(text_codes.max(initial=0))) + 1
+    offsets = numpy.arange(n_pairs)[:, None] * n_symbols
+    peq = numpy.zeros(n_pairs * n_symbols, dtype='u8')
+    for k in range(pattern_codes.shape[1]):
+        peq[offsets[:, 0] + pattern_codes[:, k]] |= numpy.uint64(1 << k)
+    peq[offsets[:, 0]] = 0
+    text_codes = text_codes + offsets
+
+    one = numpy.uint64(1)
+    high = numpy.where(
+        pattern_lengths > 0,
+        numpy.left_shift(one, numpy.maximum(pattern_lengths, 1)
+                         .astype('u8') - one), 0).astype('u8')
+
+    pv = numpy.full(n_pairs, ~numpy.uint64(0))
+    mv = numpy.zeros(n_pairs, dtype='u8')
+    score = pattern_lengths.copy()
+
+    n_active = numpy.searchsorted(-text_lengths,
+                                  -numpy.arange(text_codes.shape[1]),
+                                  side='left')
+
+    for j in range(text_codes.shape[1]):
+        k = n_active[j]
+        pv_k = pv[:k]
+        mv_k = mv[:k]
+
+        eq = peq.take(text_codes[:k, j])
+        xv = eq | mv_k
+        xh = (((eq & pv_k) + pv_k) ^ pv_k) | eq
+        ph = mv_k | ~(xh | pv_k)
+        mh = pv_k & xh
+
+        score[:k] += (ph & high[:k]) != 0
+        score[:k] -= (mh & high[:k]) != 0
+
+        ph = (ph << one) | one
+        mh <<= one
+        pv[:k] = mh | ~(xv | ph)
+        mv[:k] = ph & xv
+
+    score[pattern_lengths == 0] = text_lengths[pattern_lengths == 0]
+
+    result = numpy.empty_like(score)
+    result[order] = score
+
+    return result
+
+
+def _banded_pairs(codes1, lengths1, codes2, lengths2, max_distance,
+                  numpy):
+    """Distances between pairs of strings, if at most max_distance.
+
+    Only the band of the dynamic programming matrix within max_distance
+    of the diagonal is computed, for all pairs at once. The distances are
+    capped at max_distance + 1, and the computation stops when all pairs
+    exceed max_distance.
+    """
+
+    k = max_distance
+    n_pairs = len(lengths1)
+    cap = k + 1
+
+    # band[:, b] is the cell in column i + b - k of row i
+    offsets = numpy.arange(-k, k + 1)
+    band = numpy.minimum(numpy.abs(offsets), cap)
+    band = numpy.where(offsets < 0, cap, band)
+    band = numpy.repeat(band[None, :], n_pairs, axis=0)
+
+    width2 = codes2.shape[1]
+    padded2 = numpy.zeros((n_pairs, width2 + 2 * k + 1), dtype=codes2.dtype)
+    padded2[:, k:k + width2] = codes2
+
+    result = numpy.where(lengths1 == 0, numpy.minimum(lengths2, cap), cap)
+    for i in range(1, codes1.shape[1] + 1):
+        # the characters of the second string in the band of this row
+        window = padded2[:, i - 1:i + 2 * k]
+        cost = codes1[:, i - 1, None] != window
+
+        current = numpy.empty_like(band)
+        current[:, :-1] = band[:, 1:] + 1
+        current[:, -1] = cap
+        numpy.minimum(current, band + cost, out=current)
+        for b in range(1, 2 * k + 1):
+            numpy.minimum(current[:, b], current[:, b - 1] + 1,
+                          out=current[:, b])
+
+        # the cells before the first column
+        current[:, :max(k - i, 0)] = cap
+        band = numpy.minimum(current, cap)
+
+        done = lengths1 == i
+        if done.any():
+            result[done] = band[done, lengths2[done] - i + k]
+
+        if i % 8 == 0 and (band.min(axis=1) > k).all():
+            break
+
+    return result
+
+
+def _encode_all(strings, numpy):
+    """Encode all strings as one array of character ids (from 1)."""
+
+    lengths = numpy.array([len(s) for s in strings], dtype='i8')
+    points = numpy.frombuffer(
+        ''.join(strings).encode('utf-32-le', 'surrogatepass'), dtype='<u4')
+    chars, ids = numpy.unique(points, return_inverse=True)
+
+    return ids.astype('i8') + 1, numpy.cumsum(lengths) - lengths, lengths
+
+
+def _gather(encoded, ids, numpy):
+    """Return the codes of the strings ids, padded with zeros."""
+
+    codes, offsets, lengths = encoded
+    lengths = lengths[ids]
+    width = int(lengths.max(initial=0))
+
+    positions = numpy.arange(width)
+    valid = positions < lengths[:, None]
+    index = numpy.where(valid, offsets[ids][:, None] + positions, 0)
+
+    return numpy.where(valid, codes.take(index) if len(codes) else 0,
+                       0), lengths
+
+
+def _histograms(encoded, numpy):
+    """Count the characters of each string in 64 buckets of characters."""
+
+    codes, _, lengths = encoded
+    rows = numpy.repeat(numpy.arange(len(lengths)), lengths)
+    hist = numpy.bincount(rows * _N_BUCKETS + codes % _N_BUCKETS,
+                          minlength=len(lengths) * _N_BUCKETS)
+
+    return numpy.minimum(hist, 255).astype('u1').reshape(-1, _N_BUCKETS)
+
+
+def _bag_distances(hist, i, j, numpy):
+    """A lower bound of the distances between the pairs (i, j).
+
+    An edit changes the count of at most one character up and one down,
+    so the distance is at least the number of characters in excess of
+    each string. This holds for buckets of characters too.
+    """
+
+    diff = hist[i].astype('i2') - hist[j]
+
+    return numpy.maximum(numpy.maximum(diff, 0).sum(axis=1),
+                         numpy.maximum(-diff, 0).sum(axis=1))
+
+
+def _pair_distances(encoded, i, j, max_distance, numpy):
+    """Distances between the pairs (i, j) of encoded strings.
+
+    The distances larger than max_distance are larger than max_distance,
+    but not exact.
+    """
+
+    lengths = encoded[2]
+
+    # the shorter string of each pair is the pattern
+    swap = lengths[i] > lengths[j]
+    patterns = numpy.where(swap, j, i)
+    texts = numpy.where(swap, i, j)
+
+    short = lengths[patterns] <= _WORD_SIZE
+    result = numpy.empty(len(i), dtype='i8')
+
+    k = numpy.flatnonzero(short)
+    if len(k):
+        result[k] = _myers_pairs(_gather(encoded, patterns[k], numpy),
+                                 _gather(encoded, texts[k], numpy), numpy)
+
+    k = numpy.flatnonzero(~short)
+    if len(k):
+        codes1, lengths1 = _gather(encoded, patterns[k], numpy)
+        codes2, lengths2 = _gather(encoded, texts[k], numpy)
+        result[k] = _banded_pairs(codes1, lengths1, codes2, lengths2,
+                                  max_distance, numpy)
+
+    return result
+
+
+def _deletions(s, k):
+    """The strings made from s by deleting up to k characters."""
+
+    result = set([s])
+    level = result
+    for _ in range(k):
+        level = set([t[:m] + t[m + 1:] for t in level for m in range(len(t))])
+        result |= level
+
+    return result
+
+
+def _candidate_pairs(strings, max_distance, q):
+    """Return the pairs of strings that may be within max_distance.
+
+    The strings with fewer than q * (max_distance + 1) q-grams are indexed
+    on their deletion neighbourhood: two strings within distance k have a
+    common string with at most k deletions from each. The other strings
+    are indexed on the prefix of their q-grams (the rarest first): two
+    strings within distance k share a q-gram in their first k * q + 1
+    q-grams. Only pairs of strings with a length difference of at most k
+    are candidates.
+    """
+
+    k = max_distance
+    lengths = [len(s) for s in strings]
+    min_gram_length = q * (k + 1)
+
+    index = {}
+
+    # the deletion neighbourhood of the short strings (and of the strings
+    # that are within k characters of a short string)
+    for sid, s in enumerate(strings):
+        if lengths[sid] < min_gram_length + k:
+            for t in _deletions(s, k):
+                index.setdefault(t, []).append(sid)
+
+    # the q-gram prefixes of the long strings, the repeated q-grams are
+    # numbered
+    def grams(s):
+        g = [s[p:p + q] for p in range(len(s) - q + 1)]
+        if len(set(g)) == len(g):
+            return g
+
+        seen = {}
+        for p, gram in enumerate(g):
+            n = seen.get(gram, 0)
+            if n:
+                g[p] = gram + '\x00' * n
+            seen[gram] = n + 1
+
+        return g
+
+    long_ids = [sid for sid, n in enumerate(lengths) if n >= min_gram_length]
+    frequency = Counter(chain.from_iterable(
+        grams(strings[sid]) for sid in long_ids))
+
+    # the global order of the q-grams, the rarest first
+    rank = dict((g, r) for r, (g, _) in enumerate(
+        sorted(frequency.items(), key=lambda item: (item[1], item[0]))))
+    del frequency
+
+    prefix_length = k * q + 1
+    for sid in long_ids:
+        for gram in sorted(grams(strings[sid]),
+                           key=rank.__getitem__)[:prefix_length]:
+            index.setdefault((gram,), []).append(sid)
+
+    pairs = set()
+    for ids in index.values():
+        if len(ids) < 2:
+            continue
+        ids.sort(key=lengths.__getitem__)
+        for a, sid in enumerate(ids):
+            n = lengths[sid] + k
+            for other in ids[a + 1:]:
+                if lengths[other] > n:
+                    break
+                pairs.add((sid, other) if sid < other else (other, sid))
+
+    return pairs
+
+
+def near_duplicate_pairs(strings, max_distance=1, q=3, batch_size=100000):
+    """Find the pairs of unique strings within a Levenshtein distance.
+
+    The candidate pairs are found with an index of q-grams and deletions
+    (see _candidate_pairs). The candidates are filtered on their
+    character counts and verified in batches with the vectorised
+    bit-parallel algorithm (strings up to 64 characters) or a banded
+    dynamic program that stops early.
+
+    :param strings: Unique strings.
+    :type strings: list of str
+    :param max_distance: The maximum distance of a pair. Default 1.
+    :type max_distance: int
+    :param q: The length of the q-grams. Default 3.
+    :type q: int
+    :param batch_size: The number of pairs to verify at once. Default
+        100000.
+    :type batch_size: int
+
+    :return: The pairs (i, j, distance) with i < j the positions of the
+        strings.
+    :return_type: list of tuple
+    """
+
+    numpy = _import_numpy()
+
+    if max_distance < 0:
+        raise ValueError('max_distance must be a non-negative integer')
+
+    pairs = _candidate_pairs(strings, max_distance, q)
+    if not pairs:
+        return []
+
+    pairs = numpy.fromiter(chain.from_iterable(pairs), dtype='i8',
+                           count=2 * len(pairs)).reshape(-1, 2)
+    pairs = pairs[numpy.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+    encoded = _encode_all(strings, numpy)
+    hist = _histograms(encoded, numpy)
+
+    # the number of pairs per batch is limited by the size of the table
+    # of bit masks
+    n_symbols = int(encoded[0].max(initial=0)) + 1
+    batch_size = max(1, min(batch_size, (1 << 22) // n_symbols))
+
+    result = []
+    for start in range(0, len(pairs), batch_size):
+        i = pairs[start:start + batch_size, 0]
+        j = pairs[start:start + batch_size, 1]
+
+        # the pairs that differ in too many characters
+        close = _bag_distances(hist, i, j, numpy) <= max_distance
+        i, j = i[close], j[close]
 
-    if list2_str is None:
-        list2_str = list1_str
+        d = _pair_distances(encoded, i, j, max_distance, numpy)
+        found = d <= max_distance
+        result.extend(zip(i[found].tolist(), j[found].tolist(),
+                          d[found].tolist()))
 
-    return [[lv(s1, s2) / max(len(s1), len(s2)) for s2 in list2_str]
-            for s1 in list1_str]
+    return result
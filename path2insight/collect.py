@@ -1,12 +1,258 @@
 from __future__ import division
 
+import json
 import time
 import os
+import sys
+import tempfile
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 from path2insight.core import WindowsFilePath, PosixFilePath
+from path2insight.utils import gc_paused
+
+
+def _dir_paths(FilePath, root, names, pool=None):
+    """Create the paths of the entries of a directory.
+
+    The directory is parsed once. The result is the same as
+    FilePath(root, name) for each name (the names of directory entries
+    contain no separators).
+    """
+
+    if not names:
+        return []
+
+    drv, root_, parts = FilePath._parse_args((root,))
+
+    if pool is not None:
+        drv = pool.intern(drv)
+        root_ = pool.intern(root_)
+        parts = [pool.intern(part) for part in parts]
+        intern = pool.intern
+    else:
+        intern = sys.intern
+
+    with gc_paused():
+        return [FilePath._from_parsed_args((root, name), drv, root_,
+                                           parts + [intern(name)])
+                for name in names]
+
+
+class _RateLimiter(object):
+    """Rate limit shared by the threads of the parallel crawler."""
+
+    def __init__(self, delay=None):
+
+        self.interval = delay / 1000 if delay else 0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        """Block until the next request is allowed."""
+
+        if not self.interval:
+            return
+
+        with self._lock:
+            now = time.time()
+            sleep = self._next - now
+            self._next = max(now, self._next) + self.interval
+
+        if sleep > 0:
+            time.sleep(sleep)
+
+
+def _scan_dir(root, followlinks, limiter, snapshot=None, errors=None):
+    """List a directory like one step of os.walk.
+
+    Returns a tuple (mtime, dirs, files, walk_into) with the names of the
+    folders and files, and the folders to walk into. The modification
+    time is only determined when a snapshot is given. If the directory
+    did not change since the snapshot, the listing of the snapshot is
+    returned without listing the directory again.
+
+    An entry of which the type can't be determined is handled like
+    os.walk does (not a folder, not a symlink). The OSError is appended
+    to the errors list (if given), to report it with onerror.
+    """
+
+    mtime = None
+
+    if snapshot is not None:
+        mtime = os.stat(root).st_mtime_ns
+
+        previous = snapshot.get(root)
+        if previous is not None and previous[0] == mtime:
+            return previous
+
+    limiter.wait()
+
+    dirs = []
+    files = []
+    walk_into = []
+
+    with os.scandir(root) as entries:
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError as err:
+                if errors is not None:
+                    errors.append(err)
+                is_dir = False
+
+            if is_dir:
+                dirs.append(entry.name)
+
+                if not followlinks:
+                    try:
+                        is_symlink = entry.is_symlink()
+                    except OSError as err:
+                        if errors is not None:
+                            errors.append(err)
+                        is_symlink = False
+
+                if followlinks or not is_symlink:
+                    walk_into.append(entry.name)
+            else:
+                files.append(entry.name)
+
+    return mtime, dirs, files, walk_into
+
+
+def _crawl(d, n_jobs=1, delay=None, onerror=None, followlinks=False,
+           snapshot=None):
+    """List all directories with a pool of threads.
+
+    Sibling directories are listed concurrently. Returns a dict with the
+    listing of each directory (see _scan_dir). When a directory can't be
+    listed, the listings of the directory and its subdirectories in the
+    snapshot are kept, so a temporary error is not seen as a change.
+    The errors are passed to onerror in the calling thread.
+    """
+
+    limiter = _RateLimiter(delay)
+    listings = {}
+
+    with ThreadPoolExecutor(
+            max_workers=None if n_jobs == -1 else n_jobs) as executor:
+
+        pending = {}
+
+        def submit(root):
+            errors = []
+            pending[executor.submit(
+                _scan_dir, root, followlinks, limiter, snapshot,
+                errors)] = root, errors
+
+        submit(d)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                root, errors = pending.pop(future)
+
+                try:
+                    listing = future.result()
+                except OSError as err:
+                    errors.append(err)
+                    listing = None
+                    if snapshot:
+                        for sub_root, _, _ in _walk_order(root, snapshot):
+                            listings[sub_root] = snapshot[sub_root]
+
+                if onerror is not None:
+                    for err in errors:
+                        onerror(err)
+
+                if listing is None:
+                    continue
+
+                listings[root] = listing
+                for name in listing[3]:
+                    submit(os.path.join(root, name))
+
+    return listings
+
+
+def _walk_order(d, listings, topdown=True):
+    """Yield the listings in the order of os.walk."""
+
+    stack = [(d, False)]
+
+    while stack:
+        root, visited = stack.pop()
+
+        if root not in listings:
+            continue
+
+        mtime, dirs, files, walk_into = listings[root]
+
+        if topdown or visited:
+            yield root, dirs, files
+
+        if not visited:
+            if not topdown:
+                stack.append((root, True))
+            for name in reversed(walk_into):
+                stack.append((os.path.join(root, name), False))
+
+
+def _parallel_walk(d, n_jobs, delay=None, topdown=True, **kwargs):
+    """Walk the file system with a pool of threads.
+
+    The result is yielded in the same order as os.walk with the same
+    arguments.
+    """
+
+    listings = _crawl(d, n_jobs, delay=delay, **kwargs)
+
+    return _walk_order(d, listings, topdown=topdown)
+
+
+def _load_snapshot(snapshot, d):
+    """Load the directory listings of a snapshot file."""
+
+    try:
+        with open(snapshot, 'r') as f:
+            data = json.load(f)
+    except (IOError, OSError):
+        return {}
+
+    # the snapshot of another directory is of no use
+    if data.get('root') != d:
+        return {}
+
+    return dict((root, tuple(listing))
+                for root, listing in data['directories'].items())
+
+
+def _save_snapshot(snapshot, d, listings):
+    """Write the directory listings to a snapshot file."""
 
+    data = {
+        'root': d,
+        'directories': dict((root, list(listing))
+                            for root, listing in listings.items())
+    }
 
-def walk(d, delay=None, **kwargs):
+    # write to a unique temporary file first, to keep the old snapshot
+    # intact in case of an error or a concurrent walk
+    fd, tmp_snapshot = tempfile.mkstemp(
+        prefix=os.path.basename(snapshot) + '.', suffix='.tmp',
+        dir=os.path.dirname(os.path.abspath(snapshot)))
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_snapshot, snapshot)
+    except BaseException:
+        os.remove(tmp_snapshot)
+        raise
+
+
+def walk(d, delay=None, n_jobs=1, snapshot=None, pool=None, **kwargs):
     """Walk the file system like os.walk.
 
     Function to collect file paths from the file system. This function
@@ -15,8 +261,25 @@ def walk(d, delay=None, **kwargs):
 
     :param d: The path to the directory.
     :type d: str
-    :param delay: Time delay between requesting paths.
-    :type delay: (list of) str
+    :param delay: Time delay (in milliseconds) between requesting paths.
+        With multiple jobs, the delay is a global rate limit on the
+        directory listings of all threads.
+    :type delay: float
+    :param n_jobs: The number of threads that list directories
+        concurrently. This is useful on network file systems with a high
+        latency. Use -1 for the default number of threads of
+        :py:class:`concurrent.futures.ThreadPoolExecutor`. The result is
+        the same as with one job. Default 1.
+    :type n_jobs: int
+    :param snapshot: Path to a snapshot file. The directory listings of
+        this walk are stored in the snapshot file. If the file exists, only
+        the directories that were modified since the previous walk are
+        listed again. See also :py:func:`walk_changes`. Default None.
+    :type snapshot: str
+    :param pool: Intern the drive, root and parts of the paths with this
+        :py:class:`path2insight.InternPool`, to share equal strings with
+        other paths in the pool. Default None.
+    :type pool: InternPool
     :param kwargs: Additional kwargs for os.walk.
 
     :return: Return the file paths and folder paths. The function
@@ -39,7 +302,24 @@ def walk(d, delay=None, **kwargs):
     else:
         FilePath = PosixFilePath
 
-    walk_gen = os.walk(d, **kwargs)
+    if snapshot is not None:
+        topdown = kwargs.pop('topdown', True)
+
+        listings = _crawl(d, n_jobs, delay=delay,
+                          snapshot=_load_snapshot(snapshot, d), **kwargs)
+        _save_snapshot(snapshot, d, listings)
+
+        walk_gen = _walk_order(d, listings, topdown=topdown)
+
+        # throttling is done by the crawler
+        delay = None
+    elif n_jobs == 1:
+        walk_gen = os.walk(d, **kwargs)
+    else:
+        walk_gen = _parallel_walk(d, n_jobs, delay=delay, **kwargs)
+
+        # throttling is done by the crawler
+        delay = None
 
     files = []
     folders = []
@@ -50,12 +330,10 @@ def walk(d, delay=None, **kwargs):
             root, fld, fls = next(walk_gen)
 
             # iter files
-            for f in fls:
-                files.append(FilePath(root, f))
+            files.extend(_dir_paths(FilePath, root, fls, pool))
 
             # iter folders
-            for folder in fld:
-                folders.append(FilePath(root, folder))
+            folders.extend(_dir_paths(FilePath, root, fld, pool))
 
             if delay:
                 time.sleep(delay / 1000)
@@ -64,3 +342,200 @@ def walk(d, delay=None, **kwargs):
             break
 
     return files, folders
+
+
+def iwalk(d, delay=None, batch_size=1000, followlinks=False, onerror=None,
+          pool=None):
+    """Walk the file system and yield the paths in batches.
+
+    Generator version of :py:func:`path2insight.walk`. The file and
+    folder paths are yielded in batches while walking, so the memory
+    usage does not grow with the size of the file system. The walk is
+    based on :py:func:`os.scandir` and uses the type information of the
+    directory entries (no additional stat calls on most platforms).
+    The paths are yielded in the same order as :py:func:`walk`.
+
+    :param d: The path to the directory.
+    :type d: str
+    :param delay: Time delay (in milliseconds) between requesting paths.
+    :type delay: float
+    :param batch_size: The (approximate) number of paths in each batch.
+        Default 1000.
+    :type batch_size: int
+    :param followlinks: Visit directories pointed to by symlinks.
+        Default False.
+    :type followlinks: bool
+    :param onerror: Function that is called with the OSError when a
+        directory can't be listed. Default None (errors are ignored).
+    :type onerror: callable
+    :param pool: Intern the drive, root and parts of the paths with this
+        :py:class:`path2insight.InternPool`, to share equal strings with
+        other paths in the pool. Default None.
+    :type pool: InternPool
+
+    :return: Yields the file paths and folder paths in tuples with
+        structure (files, folders).
+    :return_type: generator
+
+    :Example:
+
+    Count the extensions on a large share without holding all paths in
+    memory.
+
+    >>> from collections import Counter
+    >>> import path2insight
+    >>> counts = Counter()
+    >>> for files, folders in path2insight.iwalk('/mnt/share'):
+    ...     counts.update(path2insight.extension_counts(files))
+
+    """
+
+    if os.name == 'nt':
+        FilePath = WindowsFilePath
+    else:
+        FilePath = PosixFilePath
+
+    limiter = _RateLimiter(delay)
+
+    files = []
+    folders = []
+
+    # directories to visit, the last item is visited first
+    stack = [d]
+
+    while stack:
+
+        root = stack.pop()
+        errors = []
+
+        try:
+            _, dirs, fls, walk_into = _scan_dir(
+                root, followlinks, limiter, errors=errors)
+        except OSError as err:
+            errors.append(err)
+            dirs = None
+
+        if onerror is not None:
+            for err in errors:
+                onerror(err)
+
+        if dirs is None:
+            continue
+
+        files.extend(_dir_paths(FilePath, root, fls, pool))
+        folders.extend(_dir_paths(FilePath, root, dirs, pool))
+
+        stack.extend([os.path.join(root, name)
+                      for name in reversed(walk_into)])
+
+        if len(files) + len(folders) >= batch_size:
+            yield files, folders
+            files = []
+            folders = []
+
+    if files or folders:
+        yield files, folders
+
+
+def walk_changes(d, snapshot, delay=None, n_jobs=1, followlinks=False,
+                 onerror=None, pool=None):
+    """Walk the file system and yield the changes since the last walk.
+
+    The directory listings of the previous walk are read from the
+    snapshot file. Only the directories that were modified since then
+    are listed again (the other directories are only checked for their
+    modification time). For each modified directory, the added and
+    removed file and folder paths are yielded. When the generator is
+    exhausted, the snapshot file is updated. If the snapshot file does
+    not exist, all paths are yielded as added. A directory that can't be
+    listed keeps the listing of the previous walk (no changes are yielded
+    for it and its subdirectories).
+
+    :param d: The path to the directory.
+    :type d: str
+    :param snapshot: Path to the snapshot file (see :py:func:`walk`).
+    :type snapshot: str
+    :param delay: Time delay (in milliseconds) between requesting paths.
+    :type delay: float
+    :param n_jobs: The number of threads that list directories
+        concurrently. Default 1.
+    :type n_jobs: int
+    :param followlinks: Visit directories pointed to by symlinks.
+        Default False.
+    :type followlinks: bool
+    :param onerror: Function that is called with the OSError when a
+        directory can't be listed. Default None (errors are ignored).
+    :type onerror: callable
+    :param pool: Intern the drive, root and parts of the paths with this
+        :py:class:`path2insight.InternPool`, to share equal strings with
+        other paths in the pool. Default None.
+    :type pool: InternPool
+
+    :return: Yields tuples with structure ((added_files, added_folders),
+        (removed_files, removed_folders)).
+    :return_type: generator
+
+    :Example:
+
+    Update the extension counts of a previous run.
+
+    >>> import path2insight
+    >>> for added, removed in path2insight.walk_changes(
+    ...         '/mnt/archive', 'archive.snapshot'):
+    ...     counts.update(path2insight.extension_counts(added[0]))
+    ...     counts.subtract(path2insight.extension_counts(removed[0]))
+
+    """
+
+    if os.name == 'nt':
+        FilePath = WindowsFilePath
+    else:
+        FilePath = PosixFilePath
+
+    previous = _load_snapshot(snapshot, d)
+    listings = _crawl(d, n_jobs, delay=delay, onerror=onerror,
+                      followlinks=followlinks, snapshot=previous)
+
+    for root, dirs, files in _walk_order(d, listings):
+
+        old = previous.get(root)
+
+        # unchanged directories are not listed again
+        if old is listings[root]:
+            continue
+
+        if old is None:
+            old = (None, [], [], [])
+
+        old_files = set(old[2])
+        old_dirs = set(old[1])
+        new_files = set(files)
+        new_dirs = set(dirs)
+        new_walk_into = set(listings[root][3])
+
+        added_files = _dir_paths(
+            FilePath, root, [f for f in files if f not in old_files], pool)
+        added_folders = _dir_paths(
+            FilePath, root, [fd for fd in dirs if fd not in old_dirs], pool)
+        removed_files = _dir_paths(
+            FilePath, root, [f for f in old[2] if f not in new_files], pool)
+        removed_folders = _dir_paths(
+            FilePath, root, [fd for fd in old[1] if fd not in new_dirs], pool)
+
+        # the content of removed folders is removed as well
+        for name in old[3]:
+            if name in new_walk_into:
+                continue
+
+            for sub_root, sub_dirs, sub_files in _walk_order(
+                    os.path.join(root, name), previous):
+                removed_files.extend(
+                    _dir_paths(FilePath, sub_root, sub_files, pool))
+                removed_folders.extend(
+                    _dir_paths(FilePath, sub_root, sub_dirs, pool))
+
+        if added_files or added_folders or removed_files or removed_folders:
+            yield (added_files, added_folders), (removed_files,
+                                                 removed_folders)
+
+    _save_snapshot(snapshot, d, listings)
@@ -1,6 +1,6 @@
 import re
+import sys
 from functools import partial
-from itertools import chain
 
 try:
     # python 3
@@ -12,22 +12,16 @@ except ImportError:
     from pathlib2 import _windows_flavour, _posix_flavour
 
 from path2insight.tokenizers import tokenizer, DEFAULT_TOKENIZE_PATTERN
+from path2insight.tokenizers.tokenizers import _cached_tokenize_parts
 
 
-class _FilePath(_PurePath):
-    """Base object to analyse file or folder path.
-    """
+class _AnalysisMixin(object):
+    """The analysis methods shared by all file path types.
 
-    _flavour = None
-
-    def __init__(self, *args):
-        super(_FilePath, self).__init__()
+    The methods only use the _drv, _root and _parts attributes.
+    """
 
-        # the raw argument or arguments
-        if len(args) == 1:
-            self.args = args[0]
-        else:
-            self.args = args
+    __slots__ = ()
 
     @property
     def extension(self):
@@ -41,34 +35,84 @@ class _FilePath(_PurePath):
 
         return self.suffixes
 
+    # the memo with the tokens of the path, None if the path type
+    # does not memoise tokens
+    _token_memo = None
+
+    def _tokens(self, kind, token_pattern=DEFAULT_TOKENIZE_PATTERN,
+                lower=False):
+        """Return the tokens of the stem, name, path or full path.
+
+        The tokens are memoised per path for each kind, pattern and
+        lower. The parent parts are tokenised with the shared token
+        cache.
+
+        :param kind: 'stem', 'name', 'path' (all parts, the last part
+            without extension) or 'full' (all parts).
+        :type kind: str
+
+        :return: The tokens.
+        :return_type: tuple
+        """
+
+        memo = self._token_memo
+        key = (kind, token_pattern, lower)
+
+        if memo is not None:
+            try:
+                return memo[key]
+            except KeyError:
+                pass
+
+        if kind == 'stem':
+            parents, last_part = [], self.stem
+        elif kind == 'name':
+            parents, last_part = [], self.name
+        elif kind == 'path':
+            parents = self._parts[:-1]
+            i = self._parts[-1].find('.')
+            if 0 < i < len(self._parts[-1]) - 1:
+                last_part = self._parts[-1][:i]
+            else:
+                last_part = ''
+        elif kind == 'full':
+            parents, last_part = self._parts[:-1], self._parts[-1]
+        else:
+            raise ValueError("unknown kind {!r}".format(kind))
+
+        if lower:
+            last_part = last_part.lower()
+
+        # the parent parts repeat over many paths and go through the
+        # shared token cache, the (mostly unique) last part does not
+        tokens = tuple(tokenizer(last_part, token_pattern))
+        if parents:
+            tokens = _cached_tokenize_parts(
+                parents, token_pattern, lower) + tokens
+
+        if memo is not None:
+            memo[key] = tokens
+
+        return tokens
+
     def tokenize_stem(self, token_pattern=DEFAULT_TOKENIZE_PATTERN):
         """Tokenise the name"""
 
-        return tokenizer(self.stem, token_pattern)
+        return list(self._tokens('stem', token_pattern))
 
     def tokenize_name(self, token_pattern=DEFAULT_TOKENIZE_PATTERN):
         """Tokenise the name"""
 
-        return tokenizer(self.name, token_pattern)
+        return list(self._tokens('name', token_pattern))
 
     def tokenize(self, token_pattern=DEFAULT_TOKENIZE_PATTERN,
                  exclude_extension=True):
         """Tokenise the name (without extension)"""
 
         if exclude_extension:
-            i = self._parts[-1].find('.')
-            if 0 < i < len(self._parts[-1]) - 1:
-                last_part = self._parts[-1][:i]
-            else:
-                last_part = ''
+            return list(self._tokens('path', token_pattern))
         else:
-            last_part = self._parts[-1]
-
-        parts = self._parts[:-1] + [last_part]
-
-        return list(chain.from_iterable(
-            [tokenizer(part, token_pattern) for part in parts]
-        ))
+            return list(self._tokens('full', token_pattern))
 
     @property
     def depth(self):
@@ -92,6 +136,243 @@ class _FilePath(_PurePath):
         raise NotImplementedError()
 
 
+class _FilePath(_AnalysisMixin, _PurePath):
+    """Base object to analyse file or folder path.
+    """
+
+    _flavour = None
+
+    def __init__(self, *args):
+        super(_FilePath, self).__init__()
+
+        # the raw argument or arguments
+        if len(args) == 1:
+            self.args = args[0]
+        else:
+            self.args = args
+
+    @classmethod
+    def _from_parsed_args(cls, args, drv, root, parts):
+        """Create a path from already parsed parts (skips parsing)."""
+
+        self = cls._from_parsed_parts(drv, root, parts)
+        self.args = args
+
+        return self
+
+    @property
+    def _token_memo(self):
+        try:
+            return self.__dict__['_tokens_memo']
+        except KeyError:
+            memo = self.__dict__['_tokens_memo'] = {}
+            return memo
+
+
+class _CompactFilePath(_AnalysisMixin):
+    """Base object of the compact file path types.
+
+    A compact path stores only the drive, root, the parts of the parent
+    directory and the name in __slots__. The tuple with the parent parts
+    is shared by the paths in the same directory when parsed with
+    :py:func:`path2insight.parse`. It has no instance __dict__, no args
+    attribute and no cached values, which makes it several times smaller
+    than a WindowsFilePath or PosixFilePath. It provides the same
+    analysis API.
+    """
+
+    __slots__ = ('_drv', '_root', '_head', '_name')
+
+    _flavour = None
+
+    # the (full) path type used for parsing and formatting
+    _path_type = None
+
+    def __init__(self, *args):
+
+        drv, root, parts = self._parse_args(args)
+        self._set_parts(drv, root, tuple(parts))
+
+    def _set_parts(self, drv, root, parts):
+
+        self._drv = drv
+        self._root = root
+        if parts:
+            self._head = parts[:-1]
+            self._name = parts[-1]
+        else:
+            self._head = ()
+            self._name = None
+
+    @classmethod
+    def _parse_args(cls, args):
+        return cls._path_type._parse_args(args)
+
+    @classmethod
+    def _format_parsed_parts(cls, drv, root, parts):
+        return cls._path_type._format_parsed_parts(drv, root, parts)
+
+    @classmethod
+    def _from_parsed_parts(cls, drv, root, parts):
+
+        self = object.__new__(cls)
+        self._set_parts(drv, root, tuple(parts))
+
+        return self
+
+    @classmethod
+    def _from_parsed_args(cls, args, drv, root, parts):
+        """Create a path from already parsed parts (skips parsing)."""
+
+        return cls._from_parsed_parts(drv, root, parts)
+
+    @classmethod
+    def _from_head(cls, drv, root, head, name):
+        """Create a path from the (shared) parent parts and the name."""
+
+        self = object.__new__(cls)
+        self._drv = drv
+        self._root = root
+        self._head = head
+        self._name = name
+
+        return self
+
+    @property
+    def _parts(self):
+        if self._name is None:
+            return self._head
+        return self._head + (self._name,)
+
+    def __reduce__(self):
+        return (self._from_head,
+                (self._drv, self._root, self._head, self._name))
+
+    def __str__(self):
+        return self._format_parsed_parts(self._drv, self._root,
+                                         self._parts) or '.'
+
+    def __fspath__(self):
+        return str(self)
+
+    def __repr__(self):
+        return "{}({!r})".format(type(self).__name__, self.as_posix())
+
+    def as_posix(self):
+        """Return the string representation with forward slashes."""
+
+        return str(self).replace(self._flavour.sep, '/')
+
+    def to_path(self):
+        """Return the path as a WindowsFilePath or PosixFilePath."""
+
+        return self._path_type._from_parsed_args(
+            str(self), self._drv, self._root, list(self._parts))
+
+    @property
+    def _cparts(self):
+        return tuple(self._flavour.casefold_parts(self._parts))
+
+    def _comparable(self, other):
+        return (isinstance(other, _CompactFilePath) and
+                self._flavour is other._flavour)
+
+    def __eq__(self, other):
+        if not self._comparable(other):
+            return NotImplemented
+        return self._cparts == other._cparts
+
+    def __hash__(self):
+        return hash(self._cparts)
+
+    def __lt__(self, other):
+        if not self._comparable(other):
+            return NotImplemented
+        return self._cparts < other._cparts
+
+    def __le__(self, other):
+        if not self._comparable(other):
+            return NotImplemented
+        return self._cparts <= other._cparts
+
+    def __gt__(self, other):
+        if not self._comparable(other):
+            return NotImplemented
+        return self._cparts > other._cparts
+
+    def __ge__(self, other):
+        if not self._comparable(other):
+            return NotImplemented
+        return self._cparts >= other._cparts
+
+    @property
+    def drive(self):
+        return self._drv
+
+    @property
+    def root(self):
+        return self._root
+
+    @property
+    def anchor(self):
+        return self._drv + self._root
+
+    @property
+    def parts(self):
+        return self._parts
+
+    @property
+    def name(self):
+        if self._name is None or \
+                (not self._head and (self._drv or self._root)):
+            return ''
+        return self._name
+
+    @property
+    def suffix(self):
+        name = self.name
+        i = name.rfind('.')
+        if 0 < i < len(name) - 1:
+            return name[i:]
+        return ''
+
+    @property
+    def suffixes(self):
+        name = self.name
+        if name.endswith('.'):
+            return []
+        name = name.lstrip('.')
+        return ['.' + suffix for suffix in name.split('.')[1:]]
+
+    @property
+    def stem(self):
+        name = self.name
+        i = name.rfind('.')
+        if 0 < i < len(name) - 1:
+            return name[:i]
+        return name
+
+    @property
+    def parent(self):
+        if not self._head and (self._drv or self._root):
+            return self
+        return self._from_parsed_parts(self._drv, self._root, self._head)
+
+    @property
+    def parents(self):
+        parents = []
+        path = self
+        while path.name:
+            path = path.parent
+            parents.append(path)
+        return tuple(parents)
+
+    def is_absolute(self):
+        if not self._root:
+            return False
+        return not self._flavour.has_drv or bool(self._drv)
+
+
 def apply_str_method_to_filepath(str_method):
 
     def _string_filepath(self, *args, **kwargs):
@@ -134,7 +415,7 @@ def apply_str_method_to_name(str_method):
                 self._root,
 
                 # parts and file extension
-                self._parts[:-1] + [new_name]
+                list(self._parts[:-1]) + [new_name]
             )
         else:
             return new_name
@@ -162,7 +443,7 @@ def apply_str_method_to_stem(str_method):
                 self._root,
 
                 # parts and file extension
-                self._parts[:-1] + [new_stem + self.suffix]
+                list(self._parts[:-1]) + [new_stem + self.suffix]
             )
         else:
             return new_stem
@@ -178,18 +459,19 @@ str_methods = [method_name for method_name in dir(str)
                if not method_name.startswith("_")]
 
 for str_method in str_methods:
+    for path_class in [_FilePath, _CompactFilePath]:
 
-    # file path string operations
-    setattr(_FilePath, str_method,
-            apply_str_method_to_filepath(str_method))
+        # file path string operations
+        setattr(path_class, str_method,
+                apply_str_method_to_filepath(str_method))
 
-    # file name string operations
-    setattr(_FilePath, "{}_name".format(str_method),
-            apply_str_method_to_name(str_method))
+        # file name string operations
+        setattr(path_class, "{}_name".format(str_method),
+                apply_str_method_to_name(str_method))
 
-    # file name string operations
-    setattr(_FilePath, "{}_stem".format(str_method),
-            apply_str_method_to_stem(str_method))
+        # file name string operations
+        setattr(path_class, "{}_stem".format(str_method),
+                apply_str_method_to_stem(str_method))
 
 
 class WindowsFilePath(_FilePath):
@@ -227,3 +509,113 @@ class PosixFilePath(_FilePath):
     """
 
     _flavour = _posix_flavour
+
+
+class CompactWindowsFilePath(_CompactFilePath):
+    """Compact object to analyse Windows file or folder path.
+
+    Same analysis API as :py:class:`path2insight.WindowsFilePath`, but
+    with a much smaller memory footprint. Only the drive, root and parts
+    are stored. Use :py:meth:`to_path` to get a WindowsFilePath with all
+    methods of :py:class:`pathlib.PureWindowsPath`.
+
+    >>> p = CompactWindowsFilePath("D://Documents/ProjectX/DEMO code.py")
+    >>> p.lower_name().tokenize_stem()
+    ['demo', 'code']
+    >>> p.depth
+    3
+
+    """
+
+    __slots__ = ()
+
+    _flavour = _windows_flavour
+    _path_type = WindowsFilePath
+
+
+class CompactPosixFilePath(_CompactFilePath):
+    """Compact object to analyse Posix file or folder path.
+
+    Same analysis API as :py:class:`path2insight.PosixFilePath`, but with
+    a much smaller memory footprint. Only the drive, root and parts are
+    stored. Use :py:meth:`to_path` to get a PosixFilePath with all
+    methods of :py:class:`pathlib.PurePosixPath`.
+
+    """
+
+    __slots__ = ()
+
+    _flavour = _posix_flavour
+    _path_type = PosixFilePath
+
+
+class _CachedParser(object):
+    """Parse file paths (strings) into (drive, root, parts).
+
+    The result is the same as the parsing of WindowsFilePath and
+    PosixFilePath, but the parent directory of each path is parsed only
+    once. Only the name of the path is split off for each path. This is
+    much faster for collections with many paths in the same folders.
+
+    :param path_type: WindowsFilePath or PosixFilePath.
+    :type path_type: type
+    :param maxsize: The maximum number of parent directories to cache.
+    :type maxsize: int
+    """
+
+    def __init__(self, path_type, maxsize=100000):
+
+        self.path_type = path_type
+        self.maxsize = maxsize
+
+        self._sep = path_type._flavour.sep
+        self._altsep = path_type._flavour.altsep
+        self._cache = {}
+
+    def __call__(self, args):
+        """Parse a path (string) or tuple of path arguments."""
+
+        (drv, root, parts), name = self.split(args)
+
+        if name is None:
+            return drv, root, parts
+
+        return drv, root, parts + [name]
+
+    def split(self, args):
+        """Parse a path into its parsed parent directory and its name.
+
+        The parsed parent directory (drive, root, parts) is shared by all
+        paths in the same directory. The name is None if the path is
+        parsed at once.
+        """
+
+        if isinstance(args, tuple):
+            return self.path_type._parse_args(args), None
+
+        if not isinstance(args, str):
+            return self.path_type._parse_args((args,)), None
+
+        sep = self._sep
+        path = args.replace(self._altsep, sep) if self._altsep else args
+
+        i = path.rfind(sep)
+        name = path[i + 1:]
+
+        # paths without parent, names that pathlib drops and (Windows)
+        # UNC paths are parsed at once
+        if (i < 0 or name == '' or name == '.' or
+                (self._altsep and path.startswith(sep + sep))):
+            return self.path_type._parse_args((args,)), None
+
+        head = path[:i + 1]
+
+        try:
+            parsed = self._cache[head]
+        except KeyError:
+            if len(self._cache) >= self.maxsize:
+                self._cache.clear()
+            parsed = self._cache[head] = \
+                self.path_type._parse_args((head,))
+
+        return parsed, sys.intern(name)
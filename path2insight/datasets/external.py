@@ -1,9 +1,181 @@
+import hashlib
 import os
+import pickle
+import re
+import tempfile
 
+from path2insight.frame import PathFrame
 from path2insight.parse import parse_from_pandas
 
+# environment variable with the directory of the dataset cache
+CACHE_DIR_ENV = 'PATH2INSIGHT_CACHE_DIR'
 
-def load_pride(nrows=None, skiprows=None):
+# version of the cache files, change it when the PathFrame layout changes
+_CACHE_VERSION = 1
+
+# the names of the cache files (and their temporary files) written by
+# _cache_path, other files in the cache directory are never removed
+_CACHE_FILE_RE = re.compile(
+    r'^(pride|ensembl90)-v{}-[0-9a-f]{{16}}\.pkl(\.[a-z0-9_]+)?\.tmp$|'
+    r'^(pride|ensembl90)-v{}-[0-9a-f]{{16}}\.pkl$'.format(
+        _CACHE_VERSION, _CACHE_VERSION))
+
+
+def _data_path(filename):
+    """Return the path of a data file bundled with path2insight."""
+
+    return os.path.join(os.path.dirname(__file__), 'data', filename)
+
+
+def get_cache_dir(cache_dir=None):
+    """Return the directory of the dataset cache.
+
+    The directory is the given cache_dir, else the value of the
+    environment variable PATH2INSIGHT_CACHE_DIR, else
+    ~/.path2insight/cache.
+
+    :Note:
+
+    The cache files are pickle files and are unpickled on load. Unpickling
+    a file can run arbitrary code, so only use a cache directory that is
+    writable by trusted users only.
+
+    :param cache_dir: The cache directory.
+    :type cache_dir: str
+
+    :return: The path of the cache directory.
+    :return_type: str
+    """
+
+    if cache_dir is None:
+        cache_dir = os.environ.get(CACHE_DIR_ENV) or os.path.join(
+            os.path.expanduser('~'), '.path2insight', 'cache')
+
+    return cache_dir
+
+
+def clear_cache(cache_dir=None):
+    """Remove the cached datasets.
+
+    Only the cache files of the bundled datasets are removed, other files
+    in the cache directory are left alone.
+
+    :param cache_dir: The cache directory. See
+        :py:func:`path2insight.datasets.get_cache_dir`.
+    :type cache_dir: str
+
+    :return: The number of removed cache files.
+    :return_type: int
+    """
+
+    cache_dir = get_cache_dir(cache_dir)
+
+    try:
+        filenames = os.listdir(cache_dir)
+    except (IOError, OSError):
+        return 0
+
+    n_removed = 0
+    for filename in filenames:
+        if _CACHE_FILE_RE.match(filename):
+            os.remove(os.path.join(cache_dir, filename))
+            n_removed += 1
+
+    return n_removed
+
+
+def _cache_path(filename, cache_dir):
+    """Return the path of the cache file of a bundled dataset.
+
+    The name contains the hash of the dataset file, a changed dataset
+    never uses an outdated cache file.
+    """
+
+    with open(_data_path(filename), 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()[:16]
+
+    return os.path.join(
+        get_cache_dir(cache_dir),
+        '{}-v{}-{}.pkl'.format(filename.split('.')[0], _CACHE_VERSION,
+                               digest))
+
+
+def _load_dataset(filename, encoding, nrows, skiprows, columnar, cache,
+                  cache_dir, pool=None):
+    """Read and parse a bundled dataset, optionally via the cache.
+
+    The cache holds the complete dataset as a pickled PathFrame. A
+    selection with nrows is taken from the cached dataset. A load with
+    skiprows does not use the cache.
+    """
+
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError('pandas is required for this function')
+
+    if not cache or skiprows is not None:
+        data = pd.read_csv(_data_path(filename), nrows=nrows,
+                           skiprows=skiprows, encoding=encoding,
+                           compression='gzip')
+        return parse_from_pandas(data, os_name='posix', columnar=columnar,
+                                 pool=pool)
+
+    cache_path = _cache_path(filename, cache_dir)
+
+    try:
+        with open(cache_path, 'rb') as f:
+            frame = pickle.load(f)
+    except (IOError, OSError, EOFError, pickle.UnpicklingError):
+        frame = None
+
+    if not isinstance(frame, PathFrame):
+        data = pd.read_csv(_data_path(filename), encoding=encoding,
+                           compression='gzip')
+        frame = parse_from_pandas(data, os_name='posix', columnar=True)
+
+        # write to a unique temporary file first, an interrupted write or
+        # a concurrent load never leaves a broken cache file
+        if not os.path.isdir(os.path.dirname(cache_path)):
+            os.makedirs(os.path.dirname(cache_path))
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=os.path.basename(cache_path) + '.', suffix='.tmp',
+            dir=os.path.dirname(cache_path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(frame, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    if nrows is not None:
+        frame = frame[:nrows]
+
+    return frame if columnar else frame.to_list()
+
+
+def _iter_dataset(filename, encoding, chunksize, nrows, skiprows,
+                  columnar, pool=None):
+    """Read and parse a bundled dataset in chunks."""
+
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError('pandas is required for this function')
+
+    reader = pd.read_csv(_data_path(filename), nrows=nrows,
+                         skiprows=skiprows, encoding=encoding,
+                         compression='gzip', chunksize=chunksize)
+
+    with reader:
+        for data in reader:
+            yield parse_from_pandas(data, os_name='posix', columnar=columnar,
+                                    pool=pool)
+
+
+def load_pride(nrows=None, skiprows=None, columnar=False, cache=False,
+               cache_dir=None, pool=None):
     """Load the filepaths of the PRIDE proteomics archive.
 
     "The PRIDE PRoteomics IDEntifications (PRIDE) database is a
@@ -32,29 +204,36 @@ def load_pride(nrows=None, skiprows=None):
         pandas.read_csv() for more information about this parameter.
     :type skiprows: list-like or integer or callable, default None
 
-    :return: A list of PosixFilePaths of the PRIDE dataset.
-    :return_type: list
+    :param columnar: Return a :py:class:`path2insight.PathFrame` instead
+        of a list. Default False.
+    :type columnar: bool
 
-    """
+    :param cache: Store the parsed dataset in a binary cache file and
+        load it from there next time. The cache is not used when
+        skiprows is given. The cache file is unpickled, only use a
+        trusted cache directory. Default False.
+    :type cache: bool
 
-    try:
-        import pandas as pd
-    except ImportError:
-        raise ImportError('pandas is required for this function')
+    :param cache_dir: The cache directory. See
+        :py:func:`path2insight.datasets.get_cache_dir`.
+    :type cache_dir: str
+
+    :param pool: Intern the parts of the paths with this
+        :py:class:`path2insight.InternPool`. Not used with columnar or a
+        cached load. Default None.
+    :type pool: InternPool
 
-    data_path = os.path.join(
-        os.path.dirname(__file__),
-        'data',
-        'pride.csv.gzip'
-    )
+    :return: A list of PosixFilePaths of the PRIDE dataset.
+    :return_type: list
 
-    data = pd.read_csv(data_path, nrows=nrows, skiprows=skiprows,
-                       encoding='utf-8', compression='gzip')
+    """
 
-    return parse_from_pandas(data, os_name='posix')
+    return _load_dataset('pride.csv.gzip', 'utf-8', nrows, skiprows,
+                         columnar, cache, cache_dir, pool)
 
 
-def load_ensembl(nrows=None, skiprows=None):
+def load_ensembl(nrows=None, skiprows=None, columnar=False, cache=False,
+                 cache_dir=None, pool=None):
     """Load the filepaths of the Ensembl dataset (release 90).
 
     "Ensembl is a genome browser for vertebrate genomes that supports
@@ -81,23 +260,104 @@ def load_ensembl(nrows=None, skiprows=None):
         pandas.read_csv() for more information about this parameter.
     :type skiprows: list-like or integer or callable, default None
 
+    :param columnar: Return a :py:class:`path2insight.PathFrame` instead
+        of a list. Default False.
+    :type columnar: bool
+
+    :param cache: Store the parsed dataset in a binary cache file and
+        load it from there next time. The cache is not used when
+        skiprows is given. The cache file is unpickled, only use a
+        trusted cache directory. Default False.
+    :type cache: bool
+
+    :param cache_dir: The cache directory. See
+        :py:func:`path2insight.datasets.get_cache_dir`.
+    :type cache_dir: str
+
+    :param pool: Intern the parts of the paths with this
+        :py:class:`path2insight.InternPool`. Not used with columnar or a
+        cached load. Default None.
+    :type pool: InternPool
+
     :return: A list of PosixFilePaths of the PRIDE dataset.
     :return_type: list
 
     """
 
-    try:
-        import pandas as pd
-    except ImportError:
-        raise ImportError('pandas is required for this function')
+    return _load_dataset('ensembl90.csv.gzip', 'ascii', nrows, skiprows,
+                         columnar, cache, cache_dir, pool)
+
+
+def iter_pride(chunksize=100000, nrows=None, skiprows=None, columnar=False,
+               pool=None):
+    """Iterate over the filepaths of the PRIDE dataset in chunks.
 
-    data_path = os.path.join(
-        os.path.dirname(__file__),
-        'data',
-        'ensembl90.csv.gzip'
-    )
+    The dataset is decompressed and parsed chunk by chunk, so the full
+    dataset is never held in memory. The chunks together contain the
+    same filepaths as :py:func:`path2insight.datasets.load_pride`. See
+    load_pride for more information about the dataset.
 
-    data = pd.read_csv(data_path, nrows=nrows, skiprows=skiprows,
-                       encoding='ascii', compression='gzip')
+    :Example:
+
+    >>> from collections import Counter
+    >>> counts = Counter()
+    >>> for chunk in iter_pride(chunksize=50000):
+    ...     counts.update(path2insight.extension_counts(chunk))
+
+    :param chunksize: Number of filepaths in each chunk. Default 100000.
+    :type chunksize: int
+    :param nrows: Number of rows of file to read.
+    :type nrows: int
+    :param skiprows: Line numbers to skip (0-indexed) or number of
+        lines to skip (int) at the start of the file. See
+        pandas.read_csv() for more information about this parameter.
+    :type skiprows: list-like or integer or callable, default None
+    :param columnar: Yield a :py:class:`path2insight.PathFrame` for each
+        chunk instead of a list. Default False.
+    :type columnar: bool
+    :param pool: Intern the parts of the paths with this
+        :py:class:`path2insight.InternPool`, to share the strings between
+        the chunks. Not used with columnar. Default None.
+    :type pool: InternPool
+
+    :return: A generator with lists of PosixFilePaths (or PathFrames).
+    :return_type: generator
+
+    """
+
+    return _iter_dataset('pride.csv.gzip', 'utf-8', chunksize, nrows,
+                         skiprows, columnar, pool)
+
+
+def iter_ensembl(chunksize=100000, nrows=None, skiprows=None,
+                 columnar=False, pool=None):
+    """Iterate over the filepaths of the Ensembl dataset in chunks.
+
+    The dataset is decompressed and parsed chunk by chunk, so the full
+    dataset is never held in memory. The chunks together contain the
+    same filepaths as :py:func:`path2insight.datasets.load_ensembl`. See
+    load_ensembl for more information about the dataset.
+
+    :param chunksize: Number of filepaths in each chunk. Default 100000.
+    :type chunksize: int
+    :param nrows: Number of rows of file to read.
+    :type nrows: int
+    :param skiprows: Line numbers to skip (0-indexed) or number of
+        lines to skip (int) at the start of the file. See
+        pandas.read_csv() for more information about this parameter.
+    :type skiprows: list-like or integer or callable, default None
+    :param columnar: Yield a :py:class:`path2insight.PathFrame` for each
+        chunk instead of a list. Default False.
+    :type columnar: bool
+    :param pool: Intern the parts of the paths with this
+        :py:class:`path2insight.InternPool`, to share the strings between
+        the chunks. Not used with columnar. Default None.
+    :type pool: InternPool
+
+    :return: A generator with lists of PosixFilePaths (or PathFrames).
+    :return_type: generator
+
+    """
 
-    return parse_from_pandas(data, os_name='posix')
+    return _iter_dataset('ensembl90.csv.gzip', 'ascii', chunksize, nrows,
+                         skiprows, columnar, pool)
@@ -6,11 +6,15 @@ from path2insight.utils import PATH_OBJECT_TYPES
 from path2insight.decorators import iter_advanced_2d
 from path2insight.algorithms.stringdist import levenshtein as _levenshtein
 from path2insight.algorithms.stringdist import levenshtein_normalised as _ln
+from path2insight.algorithms.stringdist import levenshtein_matrix
+from path2insight.algorithms.stringdist import near_duplicate_pairs
+from path2insight.frame import PathFrame
 from path2insight.tokenizers import DEFAULT_TOKENIZE_PATTERN
 
 
 @iter_advanced_2d
-def levenshtein_distance_stem(path1, path2=None, normalise=False):
+def levenshtein_distance_stem(path1, path2=None, normalise=False, out=None,
+                              n_jobs=1):
     """String distance measure with Levenshtein.
 
     The Levenshtein distance between the stem of file paths. This function
@@ -24,6 +28,17 @@ def levenshtein_distance_stem(path1, path2=None, normalise=False):
     :type path2: list
     :param normalise: Normalise the Levenshtein distance. Default False.
     :type normalise: bool
+    :param out: Write the distances to this array, or to a memory-mapped
+        .npy file with this name. Default None.
+    :type out: numpy.ndarray, str
+    :param n_jobs: The number of processes to compute the matrix with (see
+        :py:func:`path2insight.levenshtein_matrix`). Default 1.
+    :type n_jobs: int
+
+    :return: The distance matrix. The distances of identical stems are
+        computed once, and only half of the matrix is computed when path2
+        is None.
+    :return_type: numpy.ndarray
 
     :Example:
 
@@ -48,17 +63,59 @@ def levenshtein_distance_stem(path1, path2=None, normalise=False):
     else:
         list2_str = None
 
-    if normalise:
-        result = _ln(list1_str, list2_str)
+    return levenshtein_matrix(list1_str, list2_str, normalise=normalise,
+                              out=out, n_jobs=n_jobs)
+
+
+def near_duplicates(paths, max_distance=1, lower=False):
+    """Find the pairs of stems within a Levenshtein distance.
+
+    Unlike :py:func:`levenshtein_distance_stem`, the full distance matrix
+    is not computed. The candidate pairs are found with an index of the
+    q-grams (and of the deletions of the short stems), pruned on their
+    lengths and character counts, and the remaining pairs are verified.
+    The time depends on the number of similar stems, not on the square of
+    the number of stems.
+
+    :param paths: The paths to compare the stems of.
+    :type paths: list of WindowsFilePath or PosixFilePath objects,
+        PathFrame
+    :param max_distance: The maximum Levenshtein distance of a pair.
+        Default 1.
+    :type max_distance: int
+    :param lower: Convert the stems to lower before comparing. Default
+        False.
+    :type lower: bool
+
+    :return: The pairs (stem1, stem2, distance) of unique stems with
+        stem1 < stem2, sorted by distance and stems. Paths with equal
+        stems are not listed (see :py:func:`path2insight.stem_counts`).
+    :return_type: list of tuple
+
+    :Example:
+
+    >>> path2insight.near_duplicates(paths, max_distance=1)[:2]
+    [('F01_run1', 'F01_run2', 1), ('F01_run1', 'F02_run1', 1)]
+
+    """
+
+    if isinstance(paths, PathFrame):
+        stems = list(paths.counts('stem', lower=lower))
+    elif lower:
+        stems = list(set([fp.stem.lower() for fp in paths]))
     else:
-        result = _levenshtein(list1_str, list2_str)
+        stems = list(set([fp.stem for fp in paths]))
+
+    stems.sort()
 
-    return result
+    return sorted([(stems[i], stems[j], d) for i, j, d in
+                   near_duplicate_pairs(stems, max_distance=max_distance)],
+                  key=lambda pair: (pair[2], pair[0], pair[1]))
 
 
 def levenshtein_distance_tokens(path1, path2,
                                 token_pattern=DEFAULT_TOKENIZE_PATTERN,
-                                normalise=True, tagger=None):
+                                normalise=True, tagger=None, n_jobs=1):
     """Distance between path and list of tokens.
 
     :param path1: A WindowsFilePath or PosixFilePath or list of tokens.
@@ -74,8 +131,11 @@ def levenshtein_distance_tokens(path1, path2,
         The minimum requirements for this tagger is a method named 'tag'
         that returns a list of tuples with structure (token, tag).
     :type tagger: object
+    :param n_jobs: The number of processes to compute the matrix with (see
+        :py:func:`path2insight.levenshtein_matrix`). Default 1.
+    :type n_jobs: int
 
-    :returns: This function returns a tuple with structure: (list of lists,
+    :returns: This function returns a tuple with structure: (array,
         tokens_path, tokens_list). The first position is a matrix with all
         levenshtein distances.
     :return_type: tuple
@@ -124,9 +184,9 @@ def levenshtein_distance_tokens(path1, path2,
 
     # compute the distance matrix
     if normalise:
-        lv = _ln(path_tokens1, path_tokens2)
+        lv = _ln(path_tokens1, path_tokens2, n_jobs=n_jobs)
     else:
-        lv = _levenshtein(path_tokens1, path_tokens2)
+        lv = _levenshtein(path_tokens1, path_tokens2, n_jobs=n_jobs)
 
     # return tuple with result
     return (lv, path_tokens2_labels, path_tokens1_labels)
@@ -1,10 +1,87 @@
 from collections import Counter
 
 from path2insight.explore import token_counts
-from path2insight.utils import MissingDependencyError
+from path2insight.utils import MissingDependencyError, _import_numpy
 
 
-def distance_on_token(x, y=None, tokenizer=None, metric='l2', n_jobs=1):
+def _distances(x, y, metric, n_jobs, top_k, radius, working_memory):
+    """Dense distance matrix, or the nearest neighbours in a CSR matrix.
+
+    The sparse neighbours are selected from row chunks of the distance
+    matrix, with at most working_memory MiB of distances at a time. The
+    dense matrix is never allocated.
+    """
+
+    try:
+        from sklearn.metrics import pairwise_distances
+        from sklearn.metrics import pairwise_distances_chunked
+    except ModuleNotFoundError:
+        raise MissingDependencyError(
+            "Install the module 'sklearn' to compute distances.")
+
+    if top_k is None and radius is None:
+        return pairwise_distances(x, y, metric=metric, n_jobs=n_jobs)
+
+    if top_k is not None and top_k < 1:
+        raise ValueError('top_k must be a positive integer')
+    if radius is not None and radius < 0:
+        raise ValueError('radius must be zero or positive')
+
+    from scipy.sparse import csr_matrix
+
+    numpy = _import_numpy()
+
+    # the distance of each path to itself is left out
+    diagonal = y is None
+    n_columns = x.shape[0] if diagonal else y.shape[0]
+
+    def reduce_func(d_chunk, start):
+
+        d_chunk = numpy.array(d_chunk, dtype='float64')
+        rows = numpy.arange(d_chunk.shape[0])
+        if diagonal:
+            d_chunk[rows, start + rows] = numpy.inf
+
+        if top_k is not None and top_k < n_columns:
+            columns = numpy.argpartition(d_chunk, top_k - 1, axis=1)
+            columns = columns[:, :top_k]
+        else:
+            columns = numpy.broadcast_to(
+                numpy.arange(n_columns), d_chunk.shape)
+        d_chunk = d_chunk[rows[:, None], columns]
+
+        # sort the neighbours of each row on distance and column
+        order = numpy.lexsort((columns, d_chunk), axis=1)
+        columns = columns[rows[:, None], order]
+        d_chunk = d_chunk[rows[:, None], order]
+
+        keep = numpy.isfinite(d_chunk)
+        if radius is not None:
+            keep &= d_chunk <= radius
+
+        return ([c[k] for c, k in zip(columns, keep)],
+                [d[k] for d, k in zip(d_chunk, keep)])
+
+    indices = []
+    data = []
+    for chunk_indices, chunk_data in pairwise_distances_chunked(
+            x, y, reduce_func=reduce_func, metric=metric, n_jobs=n_jobs,
+            working_memory=working_memory):
+        indices.extend(chunk_indices)
+        data.extend(chunk_data)
+
+    indptr = numpy.zeros(len(indices) + 1, dtype='int64')
+    numpy.cumsum([len(i) for i in indices], out=indptr[1:])
+
+    return csr_matrix(
+        (numpy.concatenate(data) if data else numpy.zeros(0),
+         numpy.concatenate(indices) if indices else numpy.zeros(0, 'int64'),
+         indptr),
+        shape=(x.shape[0], n_columns))
+
+
+def distance_on_token(x, y=None, tokenizer=None, metric='l2', n_jobs=1,
+                      top_k=None, radius=None, working_memory=None):
     """Compute the distance between filenames based on tokens.
 
     The distance between filenames is computed based on the number of tokens
@@ -24,6 +101,25 @@ def distance_on_token(x, y=None, tokenizer=None, metric='l2', n_jobs=1):
     :param n_jobs: The number of cores to use during the computation of the
         metric. Default 1.
     :type n_jobs: int
+    :param top_k: Return the top_k nearest paths of each path in a sparse
+        matrix, instead of the full distance matrix. Default None.
+    :type top_k: int
+    :param radius: Return the paths within this distance of each path in
+        a sparse matrix, instead of the full distance matrix. Combined
+        with top_k, the top_k nearest paths within the radius. Default
+        None.
+    :type radius: float
+    :param working_memory: The maximum size in MiB of the row chunks of
+        the distance matrix in the sparse mode. Default None (the
+        scikit-learn setting, 1024 MiB).
+    :type working_memory: int
+
+    :return: The distance matrix, or with top_k or radius, a
+        scipy.sparse.csr_matrix with the distances of the neighbours of
+        each path in x (sorted by distance within a row). The distances
+        are stored explicitly, also when they are zero. When y is None,
+        the distance of a path to itself is left out.
+    :return_type: numpy.ndarray, scipy.sparse.csr_matrix
 
     :Example:
 
@@ -40,7 +136,6 @@ def distance_on_token(x, y=None, tokenizer=None, metric='l2', n_jobs=1):
     """
 
     try:
-        from sklearn.metrics import pairwise_distances
         from sklearn.feature_extraction import DictVectorizer
     except ModuleNotFoundError:
         raise MissingDependencyError(
@@ -57,13 +152,14 @@ def distance_on_token(x, y=None, tokenizer=None, metric='l2', n_jobs=1):
     if y:
         matrix_y_sparse = dv.transform(dict_y)
     else:
-        matrix_y_sparse = matrix_x_sparse
+        matrix_y_sparse = None
 
-    return pairwise_distances(matrix_x_sparse, matrix_y_sparse,
-                              metric=metric, n_jobs=n_jobs)
+    return _distances(matrix_x_sparse, matrix_y_sparse, metric, n_jobs,
+                      top_k, radius, working_memory)
 
 
-def distance_on_extension(x, y=None, tokenizer=None, metric='l2', n_jobs=1):
+def distance_on_extension(x, y=None, tokenizer=None, metric='l2', n_jobs=1,
+                          top_k=None, radius=None, working_memory=None):
     """Compute the distance between filenames based on the extension.
 
     The distance between filenames is computed based on the number of
@@ -81,6 +177,25 @@ def distance_on_extension(x, y=None, tokenizer=None, metric='l2', n_jobs=1):
     :param n_jobs: The number of cores to use during the computation of the
         metric. Default 1.
     :type n_jobs: int
+    :param top_k: Return the top_k nearest paths of each path in a sparse
+        matrix, instead of the full distance matrix. Default None.
+    :type top_k: int
+    :param radius: Return the paths within this distance of each path in
+        a sparse matrix, instead of the full distance matrix. Combined
+        with top_k, the top_k nearest paths within the radius. Default
+        None.
+    :type radius: float
+    :param working_memory: The maximum size in MiB of the row chunks of
+        the distance matrix in the sparse mode. Default None (the
+        scikit-learn setting, 1024 MiB).
+    :type working_memory: int
+
+    :return: The distance matrix, or with top_k or radius, a
+        scipy.sparse.csr_matrix with the distances of the neighbours of
+        each path in x (sorted by distance within a row). The distances
+        are stored explicitly, also when they are zero. When y is None,
+        the distance of a path to itself is left out.
+    :return_type: numpy.ndarray, scipy.sparse.csr_matrix
 
     :Example:
 
@@ -97,7 +212,6 @@ def distance_on_extension(x, y=None, tokenizer=None, metric='l2', n_jobs=1):
     """
 
     try:
-        from sklearn.metrics import pairwise_distances
         from sklearn.feature_extraction import DictVectorizer
     except ModuleNotFoundError:
         raise MissingDependencyError(
@@ -114,12 +228,14 @@ def distance_on_extension(x, y=None, tokenizer=None, metric='l2', n_jobs=1):
     if y:
         matrix_y_sparse = dv.transform(dict_y)
     else:
-        matrix_y_sparse = matrix_x_sparse
+        matrix_y_sparse = None
 
-    return pairwise_distances(matrix_x_sparse, matrix_y_sparse, metric=metric)
+    return _distances(matrix_x_sparse, matrix_y_sparse, metric, n_jobs,
+                      top_k, radius, working_memory)
 
 
-def distance_on_depth(x, y=None, metric='l2', n_jobs=1):
+def distance_on_depth(x, y=None, metric='l2', n_jobs=1, top_k=None,
+                      radius=None, working_memory=None):
     """Compute the distance between filenames based on the depth.
 
     The distance between filenames is computed based on the difference
@@ -137,6 +253,25 @@ def distance_on_depth(x, y=None, metric='l2', n_jobs=1):
     :param n_jobs: The number of cores to use during the computation of the
         metric. Default 1.
     :type n_jobs: int
+    :param top_k: Return the top_k nearest paths of each path in a sparse
+        matrix, instead of the full distance matrix. Default None.
+    :type top_k: int
+    :param radius: Return the paths within this distance of each path in
+        a sparse matrix, instead of the full distance matrix. Combined
+        with top_k, the top_k nearest paths within the radius. Default
+        None.
+    :type radius: float
+    :param working_memory: The maximum size in MiB of the row chunks of
+        the distance matrix in the sparse mode. Default None (the
+        scikit-learn setting, 1024 MiB).
+    :type working_memory: int
+
+    :return: The distance matrix, or with top_k or radius, a
+        scipy.sparse.csr_matrix with the distances of the neighbours of
+        each path in x (sorted by distance within a row). The distances
+        are stored explicitly, also when they are zero. When y is None,
+        the distance of a path to itself is left out.
+    :return_type: numpy.ndarray, scipy.sparse.csr_matrix
 
     :Example:
 
@@ -152,17 +287,13 @@ def distance_on_depth(x, y=None, metric='l2', n_jobs=1):
 
     """
 
-    try:
-        from sklearn.metrics import pairwise_distances
-        import numpy
-    except ModuleNotFoundError:
-        raise MissingDependencyError(
-            "Install the module 'sklearn' to compute distances.")
+    numpy = _import_numpy()
 
     arr_x = numpy.array([len(path.parts) for path in x], ndmin=2).T
     if y:
         arr_y = numpy.array([len(path.parts) for path in y], ndmin=2).T
     else:
-        arr_y = arr_x
+        arr_y = None
 
-    return pairwise_distances(arr_x, arr_y, metric=metric)
+    return _distances(arr_x, arr_y, metric, n_jobs, top_k, radius,
+                      working_memory)
@@ -1,13 +1,28 @@
 from __future__ import division
 
-from collections import Counter
-from itertools import chain
+import os
 
-from path2insight.utils import is_list_like, MissingDependencyError
-from path2insight.tokenizers import default_tokenizer
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice, repeat
+
+from path2insight.algorithms.sketches import HeavyHitters, HyperLogLog
+from path2insight.frame import PathFrame
+from path2insight.parse import _pack_paths, _unpack_paths
+from path2insight.utils import (is_list_like, MissingDependencyError,
+                                gc_paused)
+from path2insight.tokenizers import (default_tokenizer,
+                                     tokenizer as _tokenizer,
+                                     DEFAULT_TOKENIZE_PATTERN)
 
 """Module to count observations and do statistics."""
 
+# inputs with fewer paths are counted in the current process
+PARALLEL_MIN_SIZE = 100000
+
+# the number of paths per shard of an iterable without length
+SHARD_SIZE = 25000
+
 
 def similar_records(record, ref_set):
     raise NotImplementedError()
@@ -16,14 +31,187 @@ def similar_records(record, ref_set):
 def _normalize_counter(c):
     """Normalize the values of a counter"""
 
-    total = sum(c.values())
+    # the approximate counts are normalized by the number of counted items
+    total = c.n if isinstance(c, HeavyHitters) else sum(c.values())
     for key in c:
         c[key] /= total
 
     return c
 
 
-def depth_counts(x, normalize=False, center=None):
+def _n_suffixes(name):
+    """Number of suffixes of a name (based on pathlib.py)."""
+
+    if name.endswith('.'):
+        return 0
+
+    return name.lstrip('.').count('.')
+
+
+def _truncate_extension(name):
+    """Strip everything from the first dot (like _FilePath.tokenize)."""
+
+    i = name.find('.')
+    if 0 < i < len(name) - 1:
+        return name[:i]
+    else:
+        return ''
+
+
+def merge_counts(counts, normalize=False):
+    """Merge the counts of several collections of paths.
+
+    Counts of separate shares, walks or dataset chunks can be merged
+    without counting the paths again. The counts are added up.
+
+    :param counts: The counts to merge, like the results of
+        :py:func:`path2insight.extension_counts`, or the dicts with counts
+        of :py:func:`path2insight.profile`. Approximate counts
+        (:py:class:`path2insight.HeavyHitters`) are merged into a summary
+        with the capacity of the first one. Cardinality sketches
+        (:py:class:`path2insight.HyperLogLog`) are merged too. Don't merge
+        normalized counts.
+    :type counts: iterable of collections.Counter or dict
+    :param normalize: Normalize the merged result. Default False.
+    :type normalize: bool
+
+    :return: The merged counts (a dict with a Counter for each statistic
+        if the counts are dicts).
+    :return_type: collections.Counter, dict, path2insight.HyperLogLog
+
+    :Example:
+
+    >>> path2insight.merge_counts(
+            path2insight.extension_counts(chunk)
+            for chunk in path2insight.datasets.iter_pride())
+    Counter({'.raw': 157331, '.mgf': 33049, ...})
+
+    """
+
+    result = None
+
+    for c in counts:
+        if isinstance(c, HyperLogLog):
+            if result is None:
+                result = HyperLogLog(precision=c.precision)
+            result.update(c)
+        elif isinstance(c, HeavyHitters):
+            if result is None:
+                result = HeavyHitters(capacity=c.capacity)
+            result.update(c)
+        elif isinstance(c, Counter):
+            if result is None:
+                result = Counter()
+            result.update(c)
+        else:
+            if result is None:
+                result = dict((stat, Counter()) for stat in c)
+            for stat, stat_counts in c.items():
+                result.setdefault(stat, Counter()).update(stat_counts)
+
+    if result is None:
+        result = Counter()
+
+    if normalize and not isinstance(result, HyperLogLog):
+        if isinstance(result, Counter):
+            result = _normalize_counter(result)
+        else:
+            for stat in result:
+                result[stat] = _normalize_counter(result[stat])
+
+    return result
+
+
+def _count_shard(func, packed, kwargs):
+    """Count a shard of paths in a worker process."""
+
+    return func(_unpack_paths(packed), **kwargs)
+
+
+def _shards(x, n_jobs):
+    """Split the paths into packed shards, a few shards per process."""
+
+    if hasattr(x, '__len__'):
+        size = max(-(-len(x) // (4 * n_jobs)), 1)
+    else:
+        size = SHARD_SIZE
+
+    it = iter(x)
+    while True:
+        shard = list(islice(it, size))
+        if not shard:
+            return
+        yield _pack_paths(shard)
+
+
+def _parallel_counts(func, x, n_jobs, executor, **kwargs):
+    """Count the paths in shards with a pool of processes.
+
+    Returns None if the paths should be counted in the current process:
+    for n_jobs=1 without executor, small inputs and PathFrames (which are
+    counted on the unique strings).
+    """
+
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+
+    if n_jobs < 1:
+        raise ValueError('n_jobs must be a positive integer or -1')
+
+    if isinstance(x, PathFrame):
+        return None
+
+    if executor is None and (n_jobs == 1 or (
+            hasattr(x, '__len__') and len(x) < PARALLEL_MIN_SIZE)):
+        return None
+
+    shards = list(_shards(x, n_jobs))
+    args = ([func] * len(shards), shards, [kwargs] * len(shards))
+
+    if executor is not None:
+        return merge_counts(executor.map(_count_shard, *args))
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        return merge_counts(pool.map(_count_shard, *args))
+
+
+def _token_kind(parents, stem, extension):
+    """Return the part of the paths to tokenize."""
+
+    if not parents and stem and not extension:
+        return 'stem'
+    elif parents and stem and extension:
+        return 'path'
+    elif not parents and stem and extension:
+        return 'name'
+
+    raise NotImplementedError('this combination is not implemented yet')
+
+
+def _frame_token_counts(x, lower, parents, stem, extension):
+    """Count the tokens in a PathFrame on the unique strings."""
+
+    if not parents and stem and not extension:
+        counts = x.counts('stem', lower=lower)
+    elif parents and stem and extension:
+        counts = x.counts('parent', lower=lower)
+        for name, n in x.counts('last', lower=lower).items():
+            counts[_truncate_extension(name)] += n
+    elif not parents and stem and extension:
+        counts = x.counts('name', lower=lower)
+    else:
+        raise NotImplementedError('this combination is not implemented yet')
+
+    c = Counter()
+    for s, n in counts.items():
+        for token in _tokenizer(s, DEFAULT_TOKENIZE_PATTERN):
+            c[token] += n
+
+    return c
+
+
+def depth_counts(x, normalize=False, center=None, n_jobs=1,
+                 executor=None):
     """Count the filepath-depths.
 
     This function counts the filepath depths of a list of filepaths. The
@@ -32,12 +220,22 @@ def depth_counts(x, normalize=False, center=None):
     other Counter objects. For all options, see the Python documentation.
 
     :param x: Paths to determine the depth of.
-    :type x: list, tuple, array of WindowsFilePath or PosixFilePath objects
+    :type x: list, tuple, array of WindowsFilePath or PosixFilePath objects,
+        PathFrame
     :param normalize: Normalize the Counter result. Default False.
     :type normalize: bool
     :param center: Method to correct the offset of the data. Options are
         'mean' or callable. Default None.
     :type center: str, NoneType, callable
+    :param n_jobs: The number of processes. The paths are split into
+        shards, each shard is counted in a worker process and the counts
+        are merged. -1 means the number of CPUs. Not used with center.
+        Default 1.
+    :type n_jobs: int
+    :param executor: Count the shards with this
+        :py:class:`concurrent.futures.Executor` instead of a new pool of
+        processes. Default None.
+    :type executor: concurrent.futures.Executor
 
     :return: filepath depths counted
     :rtype: collections.Counter
@@ -57,7 +255,23 @@ def depth_counts(x, normalize=False, center=None):
     if not is_list_like(x):
         raise TypeError('expected list-like object')
 
-    data_depth = [fp.depth for fp in x]
+    c = None if center else _parallel_counts(depth_counts, x, n_jobs,
+                                             executor)
+    if c is not None:
+        return _normalize_counter(c) if normalize else c
+
+    if isinstance(x, PathFrame) and not center:
+        c = x.counts('depth')
+
+        if normalize:
+            c = _normalize_counter(c)
+
+        return c
+
+    if isinstance(x, PathFrame):
+        data_depth = x.depths()
+    else:
+        data_depth = [fp.depth for fp in x]
 
     # start correction for center
     if center == 'mean':
@@ -80,13 +294,24 @@ def depth_counts(x, normalize=False, center=None):
     return c
 
 
-def n_extension_counts(x):
+def n_extension_counts(x, n_jobs=1, executor=None):
     """[CHANGE FUNCTION NAME]Count the number of extensions."""
 
+    c = _parallel_counts(n_extension_counts, x, n_jobs, executor)
+    if c is not None:
+        return c
+
+    if isinstance(x, PathFrame):
+        c = Counter()
+        for name, n in x.counts('name').items():
+            c[_n_suffixes(name)] += n
+        return c
+
     return Counter([len(fp.suffixes) for fp in x])
 
 
-def extension_counts(x, lower=False, normalize=False):
+def extension_counts(x, lower=False, normalize=False, n_jobs=1,
+                     executor=None):
     """Count the extensions of the filenames.
 
     This function counts the name extensions of a list of filepaths. The
@@ -96,11 +321,20 @@ def extension_counts(x, lower=False, normalize=False):
     documentation.
 
     :param x: Paths to determine the extension count of.
-    :type x: list, tuple, array of WindowsFilePath or PosixFilePath objects
+    :type x: list, tuple, array of WindowsFilePath or PosixFilePath objects,
+        PathFrame
     :param lower: Convert the extensions to lower before counting.
     :type lower: boolean
     :param normalize: Normalize the Counter result. Default False.
     :type normalize: bool
+    :param n_jobs: The number of processes. The paths are split into
+        shards, each shard is counted in a worker process and the counts
+        are merged. -1 means the number of CPUs. Default 1.
+    :type n_jobs: int
+    :param executor: Count the shards with this
+        :py:class:`concurrent.futures.Executor` instead of a new pool of
+        processes. Default None.
+    :type executor: concurrent.futures.Executor
 
     :return: extensions counted
     :rtype: collections.Counter
@@ -119,12 +353,16 @@ def extension_counts(x, lower=False, normalize=False):
 
     """
 
-    if lower:
-        res = [fp.suffix.lower() for fp in x]
-    else:
-        res = [fp.suffix for fp in x]
+    c = _parallel_counts(extension_counts, x, n_jobs, executor, lower=lower)
+    if c is not None:
+        return _normalize_counter(c) if normalize else c
 
-    c = Counter(res)
+    if isinstance(x, PathFrame):
+        c = x.counts('suffix', lower=lower)
+    elif lower:
+        c = Counter([fp.suffix.lower() for fp in x])
+    else:
+        c = Counter([fp.suffix for fp in x])
 
     if normalize:
         c = _normalize_counter(c)
@@ -132,7 +370,8 @@ def extension_counts(x, lower=False, normalize=False):
     return c
 
 
-def name_counts(x, lower=False, normalize=False):
+def name_counts(x, lower=False, normalize=False, n_jobs=1,
+                executor=None, capacity=None):
     """Count the names.
 
     This function counts the names of a list of filepaths. The function
@@ -141,14 +380,29 @@ def name_counts(x, lower=False, normalize=False):
     Counter objects. For all options, see the Python documentation.
 
     :param x: Paths to count the names of.
-    :type x: list, tuple, array of WindowsFilePath or PosixFilePath objects
+    :type x: list, tuple, array of WindowsFilePath or PosixFilePath objects,
+        PathFrame
     :param lower: Convert the filenames to lower before counting.
     :type lower: boolean
     :param normalize: Normalize the Counter result. Default False.
     :type normalize: bool
+    :param n_jobs: The number of processes. The paths are split into
+        shards, each shard is counted in a worker process and the counts
+        are merged. -1 means the number of CPUs. Default 1.
+    :type n_jobs: int
+    :param executor: Count the shards with this
+        :py:class:`concurrent.futures.Executor` instead of a new pool of
+        processes. Default None.
+    :type executor: concurrent.futures.Executor
+    :param capacity: Count the names approximately and keep at most
+        capacity names (see :py:class:`path2insight.HeavyHitters`). Use
+        this when the number of unique names is too large to count
+        exactly and only the most common names are needed. Default None
+        (exact counts).
+    :type capacity: int
 
     :return: names counted
-    :rtype: collections.Counter
+    :rtype: collections.Counter, path2insight.HeavyHitters
 
     :Note:
 
@@ -157,12 +411,23 @@ def name_counts(x, lower=False, normalize=False):
 
     """
 
-    if lower:
-        res = [fp.name.lower() for fp in x]
+    c = _parallel_counts(name_counts, x, n_jobs, executor, lower=lower,
+                         capacity=capacity)
+    if c is not None:
+        return _normalize_counter(c) if normalize else c
+
+    if isinstance(x, PathFrame):
+        c = x.counts('name', lower=lower)
+        if capacity is not None:
+            c = HeavyHitters(c, capacity=capacity)
+    elif capacity is not None:
+        c = HeavyHitters(
+            (fp.name.lower() if lower else fp.name for fp in x),
+            capacity=capacity)
+    elif lower:
+        c = Counter([fp.name.lower() for fp in x])
     else:
-        res = [fp.name for fp in x]
-
-    c = Counter(res)
+        c = Counter([fp.name for fp in x])
 
     if normalize:
         c = _normalize_counter(c)
@@ -170,7 +435,8 @@ def name_counts(x, lower=False, normalize=False):
     return c
 
 
-def stem_counts(x, lower=False, normalize=False):
+def stem_counts(x, lower=False, normalize=False, n_jobs=1,
+                executor=None, capacity=None):
     """Count the stems.
 
     This function counts the stems of a list of filepaths. The function
@@ -179,14 +445,29 @@ def stem_counts(x, lower=False, normalize=False):
     Counter objects. For all options, see the Python documentation.
 
     :param x: Paths to count the stems of.
-    :type x: list, tuple, array of WindowsFilePath or PosixFilePath objects
+    :type x: list, tuple, array of WindowsFilePath or PosixFilePath objects,
+        PathFrame
     :param lower: Convert the stems to lower before counting.
     :type lower: boolean
     :param normalize: Normalize the Counter result. Default False.
     :type normalize: bool
+    :param n_jobs: The number of processes. The paths are split into
+        shards, each shard is counted in a worker process and the counts
+        are merged. -1 means the number of CPUs. Default 1.
+    :type n_jobs: int
+    :param executor: Count the shards with this
+        :py:class:`concurrent.futures.Executor` instead of a new pool of
+        processes. Default None.
+    :type executor: concurrent.futures.Executor
+    :param capacity: Count the stems approximately and keep at most
+        capacity stems (see :py:class:`path2insight.HeavyHitters`). Use
+        this when the number of unique stems is too large to count
+        exactly and only the most common stems are needed. Default None
+        (exact counts).
+    :type capacity: int
 
     :return: stems counted
-    :rtype: collections.Counter
+    :rtype: collections.Counter, path2insight.HeavyHitters
 
     :Note:
 
@@ -195,12 +476,23 @@ def stem_counts(x, lower=False, normalize=False):
 
     """
 
-    if lower:
-        res = [fp.stem.lower() for fp in x]
+    c = _parallel_counts(stem_counts, x, n_jobs, executor, lower=lower,
+                         capacity=capacity)
+    if c is not None:
+        return _normalize_counter(c) if normalize else c
+
+    if isinstance(x, PathFrame):
+        c = x.counts('stem', lower=lower)
+        if capacity is not None:
+            c = HeavyHitters(c, capacity=capacity)
+    elif capacity is not None:
+        c = HeavyHitters(
+            (fp.stem.lower() if lower else fp.stem for fp in x),
+            capacity=capacity)
+    elif lower:
+        c = Counter([fp.stem.lower() for fp in x])
     else:
-        res = [fp.stem for fp in x]
-
-    c = Counter(res)
+        c = Counter([fp.stem for fp in x])
 
     if normalize:
         c = _normalize_counter(c)
@@ -208,7 +500,8 @@ def stem_counts(x, lower=False, normalize=False):
     return c
 
 
-def drive_counts(x, lower=False, normalize=False):
+def drive_counts(x, lower=False, normalize=False, n_jobs=1,
+                 executor=None):
     """Count the drives of the paths.
 
     This function counts the drives of a list of filepaths. The function
@@ -217,11 +510,20 @@ def drive_counts(x, lower=False, normalize=False):
     Counter objects. For all options, see the Python documentation.
 
     :param x: Paths to count the stems of.
-    :type x: list, tuple, array of WindowsFilePath or PosixFilePath objects
+    :type x: list, tuple, array of WindowsFilePath or PosixFilePath objects,
+        PathFrame
     :param lower: Convert the drive to lower before counting.
     :type lower: boolean
     :param normalize: Normalize the Counter result. Default False.
     :type normalize: bool
+    :param n_jobs: The number of processes. The paths are split into
+        shards, each shard is counted in a worker process and the counts
+        are merged. -1 means the number of CPUs. Default 1.
+    :type n_jobs: int
+    :param executor: Count the shards with this
+        :py:class:`concurrent.futures.Executor` instead of a new pool of
+        processes. Default None.
+    :type executor: concurrent.futures.Executor
 
     :return: drives counted
     :rtype: collections.Counter
@@ -233,12 +535,16 @@ def drive_counts(x, lower=False, normalize=False):
 
     """
 
-    if lower:
-        res = [fp.drive.lower() for fp in x]
-    else:
-        res = [fp.drive for fp in x]
+    c = _parallel_counts(drive_counts, x, n_jobs, executor, lower=lower)
+    if c is not None:
+        return _normalize_counter(c) if normalize else c
 
-    c = Counter(res)
+    if isinstance(x, PathFrame):
+        c = x.counts('drive', lower=lower)
+    elif lower:
+        c = Counter([fp.drive.lower() for fp in x])
+    else:
+        c = Counter([fp.drive for fp in x])
 
     if normalize:
         c = _normalize_counter(c)
@@ -247,7 +553,8 @@ def drive_counts(x, lower=False, normalize=False):
 
 
 def token_counts(x, tokenizer=default_tokenizer, lower=False,
-                 parents=False, stem=True, extension=False, normalize=False):
+                 parents=False, stem=True, extension=False, normalize=False,
+                 n_jobs=1, executor=None, capacity=None):
     """Count the tokens in the paths.
 
     This function counts the tokens of a list of filepaths. Use boolean
@@ -257,7 +564,8 @@ def token_counts(x, tokenizer=default_tokenizer, lower=False,
     objects. For all options, see the Python documentation.
 
     :param x: Paths to count the stems of.
-    :type x: list, tuple, array of WindowsFilePath or PosixFilePath objects
+    :type x: list, tuple, array of WindowsFilePath or PosixFilePath objects,
+        PathFrame
     :param parents: tokenize the parents
     :type parents: bool
     :param stem: tokenize the stem
@@ -268,14 +576,31 @@ def token_counts(x, tokenizer=default_tokenizer, lower=False,
     :type lower: boolean
     :param normalize: Normalize the Counter result. Default False.
     :type normalize: bool
-
-    :return: drives counted
-    :rtype: collections.Counter
+    :param n_jobs: The number of processes. The paths are split into
+        shards, each shard is counted in a worker process and the counts
+        are merged. -1 means the number of CPUs. Default 1.
+    :type n_jobs: int
+    :param executor: Count the shards with this
+        :py:class:`concurrent.futures.Executor` instead of a new pool of
+        processes. Default None.
+    :type executor: concurrent.futures.Executor
+    :param capacity: Count the tokens approximately and keep at most
+        capacity tokens (see :py:class:`path2insight.HeavyHitters`). Use
+        this when the number of unique tokens is too large to count
+        exactly and only the most common tokens are needed. Default None
+        (exact counts).
+    :type capacity: int
+
+    :return: tokens counted
+    :rtype: collections.Counter, path2insight.HeavyHitters
 
     :Example:
 
     >>> path2insight.token_counts(data).most_common(3)
     [('FUNC001', 288), ('LTQ', 173), ('FUNCTNS', 96)]
+    >>> c = path2insight.token_counts(data, capacity=1000)
+    >>> c.most_common(3), c.error
+    ([('FUNC001', 288), ('LTQ', 173), ('FUNCTNS', 96)], 0)
 
     :Note:
 
@@ -284,27 +609,447 @@ def token_counts(x, tokenizer=default_tokenizer, lower=False,
 
     """
 
-    res = [fp.lower() for fp in x] if lower else [fp for fp in x]
+    # the tokenizer is not used, so it is not sent to the processes (it
+    # can be a lambda, which can't be pickled)
+    c = _parallel_counts(token_counts, x, n_jobs, executor,
+                         lower=lower, parents=parents, stem=stem,
+                         extension=extension, capacity=capacity)
+    if c is not None:
+        return _normalize_counter(c) if normalize else c
+
+    if isinstance(x, PathFrame):
+        c = _frame_token_counts(x, lower, parents, stem, extension)
+        if capacity is not None:
+            c = HeavyHitters(c, capacity=capacity)
+
+        if normalize:
+            c = _normalize_counter(c)
+
+        return c
+
+    kind = _token_kind(parents, stem, extension)
+
+    # the tokens are memoised on the paths, lowering the parts is the
+    # same as tokenising fp.lower()
+    with gc_paused():
+        if capacity is not None:
+            c = HeavyHitters(chain.from_iterable(
+                fp._tokens(kind, DEFAULT_TOKENIZE_PATTERN, lower)
+                for fp in x), capacity=capacity)
+        else:
+            c = Counter(chain.from_iterable(
+                [fp._tokens(kind, DEFAULT_TOKENIZE_PATTERN, lower)
+                 for fp in x]))
 
-    if not parents and stem and not extension:
-        res = [fp.tokenize_stem() for fp in res]
-    elif parents and stem and extension:
-        res = [fp.tokenize() for fp in res]
-    elif not parents and stem and extension:
-        res = [fp.tokenize_name() for fp in res]
-    else:
-        raise NotImplementedError('this combination is not implemented yet')
+    if normalize:
+        c = _normalize_counter(c)
 
-    flat_res = list(chain.from_iterable(res))
+    return c
 
-    c = Counter(flat_res)
 
-    if normalize:
-        c = _normalize_counter(c)
+PROFILE_STATS = ('depth', 'extension', 'n_extension', 'name', 'stem',
+                 'drive', 'token')
+
+
+def _weighted_counts(keys, weights):
+    """Count keys that occur a number of times (weights)."""
+
+    c = Counter(keys)
+    for key, n in zip(keys, weights):
+        if n > 1:
+            c[key] += n - 1
 
     return c
 
 
+def _lower_counter(c):
+    """Merge the counts of keys that are equal in lower case."""
+
+    result = Counter()
+    for key, n in c.items():
+        result[key.lower()] += n
+
+    return result
+
+
+def profile(x, stats=None, lower=False, normalize=False, parents=False,
+            stem=True, extension=False, n_jobs=1, executor=None):
+    """Compute several counts of the paths in one pass.
+
+    This function computes the same Counter objects as
+    :py:func:`path2insight.depth_counts`,
+    :py:func:`path2insight.extension_counts`,
+    :py:func:`path2insight.n_extension_counts`,
+    :py:func:`path2insight.name_counts`,
+    :py:func:`path2insight.stem_counts`,
+    :py:func:`path2insight.drive_counts` and
+    :py:func:`path2insight.token_counts`, with one pass over the paths.
+    The name, depth, drive and tokens are evaluated once per path. The
+    extensions, stems and numbers of extensions are derived from the
+    unique names. The paths can be a generator.
+
+    :param x: Paths to profile.
+    :type x: list, tuple, array, iterable of WindowsFilePath or
+        PosixFilePath objects, PathFrame
+    :param stats: The statistics to compute, a subset of 'depth',
+        'extension', 'n_extension', 'name', 'stem', 'drive' and 'token'.
+        Default None (all).
+    :type stats: list of str
+    :param lower: Convert the extensions, names, stems, drives and tokens
+        to lower before counting.
+    :type lower: bool
+    :param normalize: Normalize the Counter results. Default False.
+    :type normalize: bool
+    :param parents: tokenize the parents (see token_counts)
+    :type parents: bool
+    :param stem: tokenize the stem (see token_counts)
+    :type stem: bool
+    :param extension: tokenize the extension (see token_counts)
+    :type extension: bool
+    :param n_jobs: The number of processes. The paths are split into
+        shards, each shard is counted in a worker process and the counts
+        are merged. -1 means the number of CPUs. Default 1.
+    :type n_jobs: int
+    :param executor: Count the shards with this
+        :py:class:`concurrent.futures.Executor` instead of a new pool of
+        processes. Default None.
+    :type executor: concurrent.futures.Executor
+
+    :return: A dict with a Counter for each statistic.
+    :rtype: dict
+
+    :Example:
+
+    >>> report = path2insight.profile(data, stats=['depth', 'extension'])
+    >>> report['extension'].most_common(2)
+    [('.raw', 157331), ('.mgf', 33049)]
+
+    """
+
+    stats = PROFILE_STATS if stats is None else list(stats)
+    for stat in stats:
+        if stat not in PROFILE_STATS:
+            raise ValueError("Unknown statistic '{}'".format(stat))
+
+    result = _parallel_counts(profile, x, n_jobs, executor, stats=stats,
+                              lower=lower, parents=parents, stem=stem,
+                              extension=extension)
+
+    if result is None and isinstance(x, PathFrame):
+        funcs = {
+            'depth': lambda: depth_counts(x),
+            'extension': lambda: extension_counts(x, lower=lower),
+            'n_extension': lambda: n_extension_counts(x),
+            'name': lambda: name_counts(x, lower=lower),
+            'stem': lambda: stem_counts(x, lower=lower),
+            'drive': lambda: drive_counts(x, lower=lower),
+            'token': lambda: token_counts(
+                x, lower=lower, parents=parents, stem=stem,
+                extension=extension),
+        }
+        result = dict((stat, funcs[stat]()) for stat in stats)
+
+    elif result is None:
+        result = _profile_paths(x, stats, lower, parents, stem, extension)
+
+    if normalize:
+        for stat in result:
+            result[stat] = _normalize_counter(result[stat])
+
+    return result
+
+
+def _profile_paths(x, stats, lower, parents, stem, extension):
+    """Compute the counts of a list or iterable of paths in one pass."""
+
+    use_names = bool(set(stats) & set(['extension', 'n_extension', 'name',
+                                        'stem']))
+    use_depths = 'depth' in stats
+    use_drives = 'drive' in stats
+    use_tokens = 'token' in stats
+
+    if use_tokens:
+        kind = _token_kind(parents, stem, extension)
+
+    names = []
+    n_parts = []
+    drives = []
+    tokens = []
+
+    with gc_paused():
+        for fp in x:
+            if use_names:
+                names.append(fp.name)
+            if use_depths:
+                n_parts.append(len(fp._parts))
+            if use_drives:
+                drives.append(fp.drive)
+            if use_tokens:
+                tokens.append(fp._tokens(kind, DEFAULT_TOKENIZE_PATTERN,
+                                         lower))
+
+        result = {}
+
+        if use_names:
+            # the stem and extension of a name in lower case are the
+            # stem and extension in lower case
+            name_c = Counter(names)
+            if lower:
+                name_c = _lower_counter(name_c)
+            del names
+
+            if 'name' in stats:
+                result['name'] = Counter(name_c)
+
+            # the stem, extension and number of extensions of each
+            # unique name
+            unique_names = list(name_c)
+            weights = list(name_c.values())
+
+            if 'extension' in stats or 'stem' in stats:
+                # the same split as pathlib: a suffix needs a non-empty
+                # stem and a non-empty extension
+                splits = list(map(str.rpartition, unique_names, repeat('.')))
+
+            if 'extension' in stats:
+                c = _weighted_counts(
+                    [head and tail and '.' + tail or ''
+                     for head, _, tail in splits], weights)
+                result['extension'] = c
+            if 'stem' in stats:
+                c = _weighted_counts(
+                    [head if head and tail else name
+                     for name, (head, _, tail) in zip(unique_names, splits)],
+                    weights)
+                result['stem'] = c
+            if 'n_extension' in stats:
+                result['n_extension'] = _weighted_counts(
+                    [0 if name.endswith('.') else
+                     name.lstrip('.').count('.') for name in unique_names],
+                    weights)
+
+        if use_depths:
+            result['depth'] = Counter()
+            for k, n in Counter(n_parts).items():
+                result['depth'][k - 1 if k > 1 else 0] += n
+
+        if use_drives:
+            drive_c = Counter(drives)
+            result['drive'] = _lower_counter(drive_c) if lower else drive_c
+
+        if use_tokens:
+            result['token'] = Counter(chain.from_iterable(tokens))
+
+    return dict((stat, result[stat]) for stat in stats)
+
+
+def name_cardinality(x, lower=False, precision=14, n_jobs=1, executor=None):
+    """Estimate the number of distinct names.
+
+    The names are added to a :py:class:`path2insight.HyperLogLog`
+    sketch, which uses 2 ** precision bytes for any number of names.
+    Sketches of chunks or subtrees can be merged with
+    :py:func:`path2insight.merge_counts`.
+
+    :param x: Paths to count the distinct names of.
+    :type x: list, tuple, array, iterable of WindowsFilePath or
+        PosixFilePath objects, PathFrame
+    :param lower: Convert the names to lower before counting.
+    :type lower: boolean
+    :param precision: The precision of the sketch. The relative standard
+        error of the estimate is 1.04 / sqrt(2 ** precision). Default 14
+        (0.8%).
+    :type precision: int
+    :param n_jobs: The number of processes (see
+        :py:func:`path2insight.extension_counts`). Default 1.
+    :type n_jobs: int
+    :param executor: Add the shards with this
+        :py:class:`concurrent.futures.Executor`. Default None.
+    :type executor: concurrent.futures.Executor
+
+    :return: The sketch, call its cardinality method for the estimate.
+    :rtype: path2insight.HyperLogLog
+
+    :Example:
+
+    >>> path2insight.name_cardinality(data).cardinality()
+    361122
+    >>> path2insight.merge_counts(
+            path2insight.name_cardinality(files)
+            for files, folders in path2insight.iwalk('/mnt/archive'))
+    HyperLogLog(precision=14, cardinality=1251003)
+
+    """
+
+    hll = _parallel_counts(name_cardinality, x, n_jobs, executor,
+                           lower=lower, precision=precision)
+    if hll is not None:
+        return hll
+
+    if isinstance(x, PathFrame):
+        return HyperLogLog(x.counts('name', lower=lower), precision)
+    elif lower:
+        return HyperLogLog((fp.name.lower() for fp in x), precision)
+    else:
+        return HyperLogLog((fp.name for fp in x), precision)
+
+
+def stem_cardinality(x, lower=False, precision=14, n_jobs=1, executor=None):
+    """Estimate the number of distinct stems.
+
+    The stems are added to a :py:class:`path2insight.HyperLogLog`
+    sketch, which uses 2 ** precision bytes for any number of stems.
+    Sketches of chunks or subtrees can be merged with
+    :py:func:`path2insight.merge_counts`.
+
+    :param x: Paths to count the distinct stems of.
+    :type x: list, tuple, array, iterable of WindowsFilePath or
+        PosixFilePath objects, PathFrame
+    :param lower: Convert the stems to lower before counting.
+    :type lower: boolean
+    :param precision: The precision of the sketch. The relative standard
+        error of the estimate is 1.04 / sqrt(2 ** precision). Default 14
+        (0.8%).
+    :type precision: int
+    :param n_jobs: The number of processes (see
+        :py:func:`path2insight.extension_counts`). Default 1.
+    :type n_jobs: int
+    :param executor: Add the shards with this
+        :py:class:`concurrent.futures.Executor`. Default None.
+    :type executor: concurrent.futures.Executor
+
+    :return: The sketch, call its cardinality method for the estimate.
+    :rtype: path2insight.HyperLogLog
+
+    """
+
+    hll = _parallel_counts(stem_cardinality, x, n_jobs, executor,
+                           lower=lower, precision=precision)
+    if hll is not None:
+        return hll
+
+    if isinstance(x, PathFrame):
+        return HyperLogLog(x.counts('stem', lower=lower), precision)
+    elif lower:
+        return HyperLogLog((fp.stem.lower() for fp in x), precision)
+    else:
+        return HyperLogLog((fp.stem for fp in x), precision)
+
+
+def token_cardinality(x, lower=False, parents=False, stem=True,
+                      extension=False, precision=14, n_jobs=1,
+                      executor=None):
+    """Estimate the number of distinct tokens.
+
+    The tokens are added to a :py:class:`path2insight.HyperLogLog`
+    sketch, which uses 2 ** precision bytes for any number of tokens.
+    The tokens are the same as the tokens of
+    :py:func:`path2insight.token_counts`.
+    Sketches of chunks or subtrees can be merged with
+    :py:func:`path2insight.merge_counts`.
+
+    :param x: Paths to count the distinct tokens of.
+    :type x: list, tuple, array, iterable of WindowsFilePath or
+        PosixFilePath objects, PathFrame
+    :param lower: Convert the paths to lower before counting.
+    :type lower: boolean
+    :param parents: tokenize the parents (see token_counts)
+    :type parents: bool
+    :param stem: tokenize the stem (see token_counts)
+    :type stem: bool
+    :param extension: tokenize the extension (see token_counts)
+    :type extension: bool
+    :param precision: The precision of the sketch. The relative standard
+        error of the estimate is 1.04 / sqrt(2 ** precision). Default 14
+        (0.8%).
+    :type precision: int
+    :param n_jobs: The number of processes (see
+        :py:func:`path2insight.extension_counts`). Default 1.
+    :type n_jobs: int
+    :param executor: Add the shards with this
+        :py:class:`concurrent.futures.Executor`. Default None.
+    :type executor: concurrent.futures.Executor
+
+    :return: The sketch, call its cardinality method for the estimate.
+    :rtype: path2insight.HyperLogLog
+
+    """
+
+    hll = _parallel_counts(token_cardinality, x, n_jobs, executor,
+                           lower=lower, parents=parents, stem=stem,
+                           extension=extension, precision=precision)
+    if hll is not None:
+        return hll
+
+    if isinstance(x, PathFrame):
+        return HyperLogLog(
+            _frame_token_counts(x, lower, parents, stem, extension),
+            precision)
+
+    kind = _token_kind(parents, stem, extension)
+
+    return HyperLogLog(chain.from_iterable(
+        fp._tokens(kind, DEFAULT_TOKENIZE_PATTERN, lower) for fp in x),
+        precision)
+
+
+def folder_cardinality(x, lower=False, precision=14, n_jobs=1,
+                       executor=None):
+    """Estimate the number of distinct folders.
+
+    The folders are the parents of the paths. Paths without a parent (like
+    'C:/' and 'file.txt') are not counted.
+
+    The folders are added to a :py:class:`path2insight.HyperLogLog`
+    sketch, which uses 2 ** precision bytes for any number of folders.
+    Sketches of chunks or subtrees can be merged with
+    :py:func:`path2insight.merge_counts`.
+
+    :param x: Paths to count the distinct folders of.
+    :type x: list, tuple, array, iterable of WindowsFilePath or
+        PosixFilePath objects, PathFrame
+    :param lower: Convert the folders to lower before counting.
+    :type lower: boolean
+    :param precision: The precision of the sketch. The relative standard
+        error of the estimate is 1.04 / sqrt(2 ** precision). Default 14
+        (0.8%).
+    :type precision: int
+    :param n_jobs: The number of processes (see
+        :py:func:`path2insight.extension_counts`). Default 1.
+    :type n_jobs: int
+    :param executor: Add the shards with this
+        :py:class:`concurrent.futures.Executor`. Default None.
+    :type executor: concurrent.futures.Executor
+
+    :return: The sketch, call its cardinality method for the estimate.
+    :rtype: path2insight.HyperLogLog
+
+    :Example:
+
+    >>> subtree = path2insight.select(data, level1='data')
+    >>> path2insight.folder_cardinality(subtree).cardinality()
+    5718
+
+    """
+
+    hll = _parallel_counts(folder_cardinality, x, n_jobs, executor,
+                           lower=lower, precision=precision)
+    if hll is not None:
+        return hll
+
+    if isinstance(x, PathFrame):
+        rows = (parts for _, _, parts in x.iterparts())
+    else:
+        rows = (fp._parts for fp in x)
+
+    # the parts of the folders are joined into one string to hash
+    folders = ('/'.join(parts[:-1]) for parts in rows if len(parts) > 1)
+    if lower:
+        folders = (folder.lower() for folder in folders)
+
+    return HyperLogLog(folders, precision)
+
+
 def extension_chisquare(x, y=None, lower=True):
     """Calculates a one-way chi square test for file extensions.
 
@@ -8,6 +8,7 @@ import fnmatch
 from collections import OrderedDict, Counter
 
 from path2insight.decorators import iter_advanced_method
+from path2insight.frame import PathFrame
 from path2insight.tokenizers import default_tokenizer
 from path2insight.utils import (string_and_binary_types,
                                 unique,
@@ -76,8 +77,9 @@ class BaseTypeTagger(Tagger):
         """
         Return a list with the parts/tokens and their tags.
 
-        :param x: A list with WindowsFilePath and PosixFilePath objects.
-        :type x: list
+        :param x: A list with WindowsFilePath and PosixFilePath objects or
+            a PathFrame.
+        :type x: list, PathFrame
 
         :return: A list of lists for which each nested list is a 2-tuple of
             name and tag.
@@ -85,20 +87,24 @@ class BaseTypeTagger(Tagger):
 
         """
 
+        if isinstance(x, PathFrame):
+            rows = x.iterparts()
+        else:
+            rows = ((fp.drive, fp.root, fp.parts) for fp in x)
+
         result = []
 
-        for fp in x:
+        for drive, root, parts in rows:
 
             tagged_path = []
 
-            parts = fp.parts
             part_i = 0
 
             if len(parts) == 0:
                 continue
 
             # check drive
-            if parts[part_i] == (fp.drive + fp.root):
+            if parts[part_i] == (drive + root):
                 tagged_tokens = self._part_tokenizer(
                     parts[0], self.tag_names[0])
                 tagged_path = tagged_path + tagged_tokens
@@ -219,6 +225,12 @@ class ExtensionTagger(object):
 
     def _get_extensions(self, x):
 
+        if isinstance(x, PathFrame):
+            extensions = x.column('suffix')
+            if self.ignore_case:
+                return [ext.lower() for ext in extensions]
+            return extensions
+
         if self.ignore_case:
             return [path.extension.lower() for path in x]
         else:
@@ -260,8 +272,9 @@ class ExtensionTagger(object):
     def tag(self, x):
         """Return a list with the extension tag for each file path.
 
-        :param x: A list with WindowsFilePath and PosixFilePath objects.
-        :type x: list
+        :param x: A list with WindowsFilePath and PosixFilePath objects or
+            a PathFrame.
+        :type x: list, PathFrame
 
         :return: A list with the tag(s) for each filepath.
         :return_type: list
@@ -0,0 +1,744 @@
+"""Columnar container for large collections of file paths."""
+
+import sys
+
+from array import array
+from collections import Counter
+
+from path2insight.core import WindowsFilePath, PosixFilePath, _CachedParser
+from path2insight.core import CompactWindowsFilePath, CompactPosixFilePath
+from path2insight.utils import gc_paused
+
+# typecodes of the interned string-id columns and the offset index
+_ID_TYPECODE = 'i'
+_OFFSET_TYPECODE = 'q'
+
+STRING_COLUMNS = ('drive', 'root', 'name', 'stem', 'suffix',
+                  'part', 'parent', 'last')
+
+
+def _count_ids(ids):
+    """Count the values in an integer array. Uses numpy when available."""
+
+    try:
+        import numpy
+    except ImportError:
+        return Counter(ids)
+
+    if len(ids) == 0:
+        return Counter()
+
+    counts = numpy.bincount(
+        numpy.frombuffer(ids, dtype='i{}'.format(ids.itemsize)))
+    nonzero = numpy.flatnonzero(counts)
+
+    return Counter(dict(zip(nonzero.tolist(), counts[nonzero].tolist())))
+
+
+def _to_array(values, typecode):
+    """Convert a numpy array of integers into an array.array."""
+
+    result = array(typecode)
+    result.frombytes(values.astype('i{}'.format(result.itemsize)).tobytes())
+
+    return result
+
+
+def _split_name(name):
+    """Split a name into stem and suffix (based on pathlib.py)."""
+
+    i = name.rfind('.')
+    if 0 < i < len(name) - 1:
+        return name[:i], name[i:]
+    else:
+        return name, ''
+
+
+class PathFrame(object):
+    """Columnar container for file paths.
+
+    A PathFrame stores the drive, root, parts, name and suffix of each
+    path as integer ids into a pool of unique strings. The stem is derived
+    from the name (once per unique name), so it does not add a second
+    string per file to the pool. The parts of
+    all paths are stored in one flat array with an offset index. This
+    makes the container much smaller than a list of WindowsFilePath or
+    PosixFilePath objects, and allows counting without creating a path
+    object for each row.
+
+    Functions like :py:func:`path2insight.depth_counts`,
+    :py:func:`path2insight.extension_counts`,
+    :py:func:`path2insight.token_counts`, :py:func:`path2insight.select`
+    and the taggers accept a PathFrame directly. Indexing or iterating a
+    PathFrame returns objects of its path type.
+
+    :param path_type: The type of the paths in this frame.
+        Default PosixFilePath.
+    :type path_type: WindowsFilePath, PosixFilePath, CompactWindowsFilePath,
+        CompactPosixFilePath
+
+    :Example:
+
+    >>> frame = path2insight.parse(data, os_name='posix', columnar=True)
+    >>> path2insight.extension_counts(frame).most_common(3)
+    [('.raw', 1245), ('.xml', 321), ('.txt', 12)]
+    >>> frame[0]
+    PosixFilePath('/pride/data/archive/2015/12/PXD003381/README.txt')
+
+    """
+
+    def __init__(self, path_type=PosixFilePath):
+
+        if path_type not in (WindowsFilePath, PosixFilePath,
+                             CompactWindowsFilePath, CompactPosixFilePath):
+            raise ValueError('expected a path2insight path type')
+
+        self.path_type = path_type
+
+        # the pool with unique strings, id 0 is the empty string
+        self._strings = ['']
+        self._string_ids = {'': 0}
+
+        self._drive = array(_ID_TYPECODE)
+        self._root = array(_ID_TYPECODE)
+        self._name = array(_ID_TYPECODE)
+        self._suffix = array(_ID_TYPECODE)
+        self._parts = array(_ID_TYPECODE)
+        self._offsets = array(_OFFSET_TYPECODE, [0])
+
+    @classmethod
+    def from_strings(cls, data, path_type=PosixFilePath):
+        """Create a PathFrame from file paths in the form of strings.
+
+        :param data: An iterable with strings or tuples of strings (one
+            path in multiple arguments).
+        :type data: iterable
+        :param path_type: The type of the paths. Default PosixFilePath.
+        :type path_type: WindowsFilePath, PosixFilePath
+
+        :return: The paths in a PathFrame.
+        :return_type: PathFrame
+        """
+
+        data = list(data)
+
+        if all([type(fp) is str for fp in data]):
+            try:
+                return cls._from_str_list(data, path_type)
+            except ImportError:
+                pass
+
+        frame = cls(path_type)
+        parser = _CachedParser(path_type)
+
+        for fp in data:
+            if isinstance(fp, list):
+                fp = tuple(fp)
+            frame._append_parsed(*parser(fp))
+
+        return frame
+
+    @classmethod
+    def _from_str_list(cls, paths, path_type):
+        """Create a PathFrame from a list of strings.
+
+        Each path is split once into parent directory and name. Each
+        unique parent directory is parsed once, and the columns are
+        assembled with numpy.
+        """
+
+        import numpy
+
+        frame = cls(path_type)
+        pool_ids = frame._string_ids
+        intern = frame._intern
+
+        flavour = path_type._flavour
+        sep = flavour.sep
+        altsep = flavour.altsep
+        unc = sep + sep
+
+        heads = {}
+        head_list = []
+        head_codes = []
+        name_ids = []
+        suffix_ids = []
+
+        # the suffix id of each name id
+        suffix_of = {}
+
+        for path in paths:
+            split_path = path.replace(altsep, sep) if altsep else path
+            head, found, name = split_path.rpartition(sep)
+
+            # split off the name, except for paths without parent, names
+            # that pathlib drops and (Windows) UNC paths
+            if found and name and name != '.' and \
+                    not (altsep and split_path.startswith(unc)):
+                head = head + sep
+
+                name_id = pool_ids.get(name)
+                if name_id is None:
+                    name_id = intern(name)
+
+                suffix_id = suffix_of.get(name_id)
+                if suffix_id is None:
+                    suffix_id = suffix_of[name_id] = \
+                        intern(_split_name(name)[1])
+            else:
+                head = path
+                name_id = -1
+                suffix_id = -1
+
+            code = heads.get(head)
+            if code is None:
+                code = heads[head] = len(head_list)
+                head_list.append(head)
+
+            head_codes.append(code)
+            name_ids.append(name_id)
+            suffix_ids.append(suffix_id)
+
+        # parse each unique parent directory (or complete path) once
+        n_heads = len(head_list)
+        head_drive = numpy.empty(n_heads, dtype='i8')
+        head_root = numpy.empty(n_heads, dtype='i8')
+        head_name = numpy.empty(n_heads, dtype='i8')
+        head_suffix = numpy.empty(n_heads, dtype='i8')
+        head_len = numpy.empty(n_heads, dtype='i8')
+        head_parts = []
+
+        for k, head in enumerate(head_list):
+            drv, root, parts = path_type._parse_args((head,))
+
+            if len(parts) == (1 if (drv or root) else 0):
+                name = ''
+            else:
+                name = parts[-1]
+
+            head_drive[k] = intern(drv)
+            head_root[k] = intern(root)
+            head_name[k] = intern(name)
+            head_suffix[k] = intern(_split_name(name)[1])
+            head_len[k] = len(parts)
+            head_parts.extend([intern(part) for part in parts])
+
+        head_parts = numpy.array(head_parts, dtype='i8')
+        head_start = numpy.cumsum(head_len) - head_len
+        head_codes = numpy.array(head_codes, dtype='i8')
+        name_ids = numpy.array(name_ids, dtype='i8')
+        suffix_ids = numpy.array(suffix_ids, dtype='i8')
+        simple = name_ids >= 0
+
+        # copy the parts of the parent directory for each path and append
+        # the name
+        row_head_len = head_len[head_codes]
+        offsets = numpy.zeros(len(head_codes) + 1, dtype='i8')
+        offsets[1:] = numpy.cumsum(row_head_len + simple)
+
+        rows = numpy.repeat(numpy.arange(len(head_codes)), row_head_len)
+        within = numpy.arange(len(rows)) - numpy.repeat(
+            numpy.cumsum(row_head_len) - row_head_len, row_head_len)
+
+        parts = numpy.empty(offsets[-1], dtype='i8')
+        parts[offsets[:-1][rows] + within] = \
+            head_parts[head_start[head_codes][rows] + within]
+        parts[offsets[1:][simple] - 1] = name_ids[simple]
+
+        name = head_name[head_codes]
+        name[simple] = name_ids[simple]
+        suffix = head_suffix[head_codes]
+        suffix[simple] = suffix_ids[simple]
+
+        frame._drive = _to_array(head_drive[head_codes], _ID_TYPECODE)
+        frame._root = _to_array(head_root[head_codes], _ID_TYPECODE)
+        frame._name = _to_array(name, _ID_TYPECODE)
+        frame._suffix = _to_array(suffix, _ID_TYPECODE)
+        frame._parts = _to_array(parts, _ID_TYPECODE)
+        frame._offsets = _to_array(offsets, _OFFSET_TYPECODE)
+
+        return frame
+
+    @classmethod
+    def from_paths(cls, paths):
+        """Create a PathFrame from WindowsFilePath or PosixFilePath objects.
+
+        :param paths: A list of filepath objects of the same type.
+        :type paths: list
+
+        :return: The paths in a PathFrame.
+        :return_type: PathFrame
+        """
+
+        paths = list(paths)
+        frame = cls(type(paths[0]) if paths else PosixFilePath)
+
+        for fp in paths:
+            if type(fp) is not frame.path_type:
+                raise TypeError('all paths must be of the same type')
+            frame._append_parsed(fp._drv, fp._root, fp._parts)
+
+        return frame
+
+    @classmethod
+    def concat(cls, frames):
+        """Concatenate PathFrames of the same path type into one PathFrame.
+
+        The string pools are merged, each string id is remapped once.
+
+        :param frames: The PathFrames to concatenate.
+        :type frames: list
+
+        :return: The paths of all frames in one PathFrame.
+        :return_type: PathFrame
+        """
+
+        frames = list(frames)
+        result = cls(frames[0].path_type if frames else PosixFilePath)
+
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+
+        for frame in frames:
+            if frame.path_type is not result.path_type:
+                raise TypeError('all frames must have the same path type')
+
+            remap = [result._intern(s) for s in frame._strings]
+            n_parts = len(result._parts)
+
+            for column in ('_drive', '_root', '_name', '_suffix', '_parts'):
+                ids = getattr(frame, column)
+                if numpy is not None:
+                    remapped = _to_array(numpy.asarray(remap)[numpy.frombuffer(
+                        ids, dtype='i{}'.format(ids.itemsize))], _ID_TYPECODE)
+                else:
+                    remapped = [remap[i] for i in ids]
+                getattr(result, column).extend(remapped)
+
+            if numpy is not None:
+                offsets = _to_array(numpy.frombuffer(
+                    frame._offsets, dtype='i8')[1:] + n_parts,
+                    _OFFSET_TYPECODE)
+            else:
+                offsets = [n_parts + offset for offset in frame._offsets[1:]]
+            result._offsets.extend(offsets)
+
+        return result
+
+    def _intern(self, s):
+        """Return the id of a string, add it to the pool if needed."""
+
+        try:
+            return self._string_ids[s]
+        except KeyError:
+            i = len(self._strings)
+            self._strings.append(s)
+            self._string_ids[s] = i
+            return i
+
+    def _append_parsed(self, drv, root, parts):
+        """Append a path that is already split in drive, root and parts."""
+
+        intern = self._intern
+
+        if len(parts) == (1 if (drv or root) else 0):
+            name = ''
+        else:
+            name = parts[-1]
+        suffix = _split_name(name)[1]
+
+        self._drive.append(intern(drv))
+        self._root.append(intern(root))
+        self._name.append(intern(name))
+        self._suffix.append(intern(suffix))
+        self._parts.extend([intern(part) for part in parts])
+        self._offsets.append(len(self._parts))
+
+    def __getstate__(self):
+
+        # the string ids are rebuilt from the pool when unpickling
+        state = self.__dict__.copy()
+        del state['_string_ids']
+
+        return state
+
+    def __setstate__(self, state):
+
+        self.__dict__.update(state)
+        self._string_ids = dict(
+            (s, i) for i, s in enumerate(self._strings))
+
+    def _empty_like(self):
+        """Return an empty PathFrame which shares the string pool."""
+
+        frame = type(self)(self.path_type)
+        frame._strings = self._strings
+        frame._string_ids = self._string_ids
+
+        return frame
+
+    def __len__(self):
+        return len(self._drive)
+
+    def __repr__(self):
+        return "PathFrame(n={}, path_type={})".format(
+            len(self), self.path_type.__name__)
+
+    def __getitem__(self, key):
+
+        if isinstance(key, slice):
+            return self.take(range(*key.indices(len(self))))
+
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError('PathFrame index out of range')
+
+        return self._materialize(key)
+
+    def __iter__(self):
+
+        for i in range(len(self)):
+            yield self._materialize(i)
+
+    def _materialize(self, i):
+        """Create the path object of row i."""
+
+        strings = self._strings
+        drv = strings[self._drive[i]]
+        root = strings[self._root[i]]
+        parts = [strings[j]
+                 for j in self._parts[self._offsets[i]:self._offsets[i + 1]]]
+        args = self.path_type._format_parsed_parts(drv, root, parts) or '.'
+
+        return self.path_type._from_parsed_args(args, drv, root, parts)
+
+    def to_list(self):
+        """Return the paths as a list of WindowsFilePath or PosixFilePath."""
+
+        strings = self._strings
+        offsets = self._offsets
+        parts = [strings[i] for i in self._parts]
+
+        format_parsed_parts = self.path_type._format_parsed_parts
+        from_parsed_args = self.path_type._from_parsed_args
+
+        result = []
+        with gc_paused():
+            for i, (drv_id, root_id) in enumerate(zip(self._drive,
+                                                      self._root)):
+                drv = strings[drv_id]
+                root = strings[root_id]
+                row_parts = parts[offsets[i]:offsets[i + 1]]
+                args = format_parsed_parts(drv, root, row_parts) or '.'
+                result.append(from_parsed_args(args, drv, root, row_parts))
+
+        return result
+
+    def take(self, indices):
+        """Return a new PathFrame with the rows at the given indices.
+
+        The new PathFrame shares the string pool with this PathFrame.
+
+        :param indices: The row numbers to take.
+        :type indices: iterable of int
+
+        :return: The selected paths.
+        :return_type: PathFrame
+        """
+
+        frame = self._empty_like()
+        offsets = self._offsets
+
+        for i in indices:
+            frame._drive.append(self._drive[i])
+            frame._root.append(self._root[i])
+            frame._name.append(self._name[i])
+            frame._suffix.append(self._suffix[i])
+            frame._parts.extend(self._parts[offsets[i]:offsets[i + 1]])
+            frame._offsets.append(len(frame._parts))
+
+        return frame
+
+    @property
+    def strings(self):
+        """The pool with unique strings. The position is the string id."""
+
+        return self._strings
+
+    def lookup(self, s):
+        """Return the id of string s in the pool, or -1 if it is absent."""
+
+        return self._string_ids.get(s, -1)
+
+    def iterparts(self):
+        """Iterate over the rows as (drive, root, parts) tuples.
+
+        The parts are the same as the parts of a WindowsFilePath or
+        PosixFilePath object.
+        """
+
+        strings = self._strings
+        offsets = self._offsets
+        parts = self._parts
+
+        for i in range(len(self)):
+            yield (strings[self._drive[i]],
+                   strings[self._root[i]],
+                   tuple([strings[j] for j in parts[offsets[i]:
+                                                    offsets[i + 1]]]))
+
+    def iterpart_ids(self):
+        """Iterate over the string ids of the parts of each row.
+
+        :return: An iterator with an array of part ids for each row.
+        :return_type: iterator
+        """
+
+        offsets = self._offsets
+        parts = self._parts
+
+        for i in range(len(self)):
+            yield parts[offsets[i]:offsets[i + 1]]
+
+    def level_ids(self, level):
+        """Return the string id of the part at a level for each row.
+
+        :param level: The position of the part (like level0 in select).
+        :type level: int
+
+        :return: The id of the part for each row, -1 if the path has no
+            part on this level.
+        :return_type: array.array
+        """
+
+        offsets = self._offsets
+        parts = self._parts
+        result = array(_ID_TYPECODE, [-1]) * len(self)
+
+        for i in range(len(self)):
+            j = offsets[i] + level
+            if j < offsets[i + 1]:
+                result[i] = parts[j]
+
+        return result
+
+    def depths(self):
+        """Return the depth of each path.
+
+        :return: The depth of each path.
+        :return_type: array.array
+        """
+
+        offsets = self._offsets
+
+        try:
+            import numpy
+        except ImportError:
+            return array(_ID_TYPECODE,
+                         [max(offsets[i + 1] - offsets[i] - 1, 0)
+                          for i in range(len(self))])
+
+        n_parts = numpy.diff(numpy.frombuffer(offsets, dtype='i8'))
+        return _to_array(numpy.maximum(n_parts - 1, 0), _ID_TYPECODE)
+
+    def _string_ranks(self, casefold=False):
+        """Return the rank of each string in the pool.
+
+        Equal strings (after casefolding, if casefold is True) have the
+        same rank.
+        """
+
+        strings = self._strings
+        if casefold:
+            fold = self.path_type._flavour.casefold
+            strings = [fold(s) for s in strings]
+
+        ranks = [0] * len(strings)
+        r = -1
+        previous = None
+        for j in sorted(range(len(strings)), key=strings.__getitem__):
+            if r < 0 or strings[j] != previous:
+                r += 1
+                previous = strings[j]
+            ranks[j] = r
+
+        return ranks
+
+    def argsort(self, level=None, reverse=False):
+        """Return the row order that sorts the paths.
+
+        The order is the same as :py:func:`path2insight.sort` on a list
+        of paths. The strings in the pool are ranked once, the rows are
+        compared on the ranks of their parts. With numpy, the rows are
+        sorted with a stable sort per level, from the last level to the
+        first.
+
+        :param level: List of positions of the parts to sort on. Default
+            None (sort on the paths).
+        :type level: list of int
+        :param reverse: Reverse the sort.
+        :type reverse: bool
+
+        :return: The row numbers in sorted order.
+        :return_type: list
+        """
+
+        ranks = self._string_ranks(casefold=level is None)
+
+        try:
+            import numpy
+        except ImportError:
+            return self._argsort_keys(ranks, level, reverse)
+
+        ranks = numpy.array(ranks, dtype='i8')
+        offsets = numpy.frombuffer(self._offsets, dtype='i8')
+        parts = numpy.frombuffer(
+            self._parts, dtype='i{}'.format(self._parts.itemsize))
+        lengths = numpy.diff(offsets)
+
+        def column(k):
+            """The rank of the part on level k, -1 if there is none."""
+
+            present = (k < lengths) & (k >= -lengths)
+            if not present.any():
+                return numpy.full(len(self), -1, dtype='i8')
+            index = offsets[:-1] + k if k >= 0 else offsets[1:] + k
+            return numpy.where(
+                present, ranks[parts[numpy.where(present, index, 0)]], -1)
+
+        if level is None:
+            columns = (column(k) for k in
+                       reversed(range(lengths.max() if len(self) else 0)))
+        else:
+            # a missing level is left out of the sort key, the next
+            # levels move up one position in the key
+            values = [column(k) for k in level]
+            positions = numpy.cumsum([v >= 0 for v in values], axis=0) - 1
+            columns = []
+            for c in range(len(values)):
+                col = numpy.full(len(self), -1, dtype='i8')
+                for v, pos in zip(values, positions):
+                    selection = (v >= 0) & (pos == c)
+                    col[selection] = v[selection]
+                columns.insert(0, col)
+
+        order = numpy.arange(len(self))
+        for col in columns:
+            col = col[order]
+            order = order[numpy.argsort(-col if reverse else col,
+                                        kind='stable')]
+
+        return order.tolist()
+
+    def _argsort_keys(self, ranks, level, reverse):
+        """Return the row order that sorts the paths (without numpy)."""
+
+        if level is None:
+            keys = [tuple([ranks[j] for j in ids])
+                    for ids in self.iterpart_ids()]
+        else:
+            keys = []
+            for ids in self.iterpart_ids():
+                n = len(ids)
+                keys.append(tuple([ranks[ids[k]] for k in level
+                                   if -n <= k < n]))
+
+        return sorted(range(len(self)), key=keys.__getitem__,
+                      reverse=reverse)
+
+    def _ids(self, column):
+        """Return the array with string ids of a column."""
+
+        if column in ('drive', 'root', 'name', 'suffix'):
+            return getattr(self, '_' + column)
+        elif column == 'part':
+            return self._parts
+
+        offsets = self._offsets
+        parts = self._parts
+
+        if column == 'last':
+            return array(_ID_TYPECODE,
+                         [parts[offsets[i + 1] - 1] for i in range(len(self))
+                          if offsets[i + 1] > offsets[i]])
+        elif column == 'parent':
+            ids = array(_ID_TYPECODE)
+            for i in range(len(self)):
+                if offsets[i + 1] > offsets[i]:
+                    ids.extend(parts[offsets[i]:offsets[i + 1] - 1])
+            return ids
+        else:
+            raise ValueError(
+                "unknown column {!r}, expected one of {}".format(
+                    column, ', '.join(STRING_COLUMNS + ('depth',))))
+
+    def column(self, column):
+        """Return the strings of a column.
+
+        :param column: One of 'drive', 'root', 'name', 'stem' or 'suffix'.
+        :type column: str
+
+        :return: The value of the column for each path.
+        :return_type: list
+        """
+
+        if column not in ('drive', 'root', 'name', 'stem', 'suffix'):
+            raise ValueError("unknown column {!r}".format(column))
+
+        strings = self._strings
+
+        if column == 'stem':
+            return [_split_name(strings[i])[0] for i in self._name]
+
+        return [strings[i] for i in self._ids(column)]
+
+    def counts(self, column, lower=False):
+        """Count the values of a column.
+
+        The values are counted on the string ids. Each unique string is
+        looked up (and lowered) only once. The stems are counted on the
+        names.
+
+        :param column: One of 'drive', 'root', 'name', 'stem', 'suffix',
+            'part' (all parts), 'parent' (all parts except the last),
+            'last' (the last part) or 'depth'.
+        :type column: str
+        :param lower: Convert the strings to lower before counting.
+        :type lower: bool
+
+        :return: the values counted
+        :return_type: collections.Counter
+        """
+
+        if column == 'depth':
+            return _count_ids(self.depths())
+
+        if column == 'stem':
+            counts = _count_ids(self._name)
+        else:
+            counts = _count_ids(self._ids(column))
+
+        c = Counter()
+        for i, n in counts.items():
+            s = self._strings[i]
+            if column == 'stem':
+                s = _split_name(s)[0]
+            if lower:
+                s = s.lower()
+            c[s] += n
+
+        return c
+
+    def memory_usage(self):
+        """Return the approximate memory usage in bytes."""
+
+        arrays = [self._drive, self._root, self._name, self._suffix,
+                  self._parts, self._offsets]
+
+        return (sum([a.itemsize * len(a) for a in arrays]) +
+                sum([sys.getsizeof(s) for s in self._strings]) +
+                sys.getsizeof(self._strings) +
+                sys.getsizeof(self._string_ids))
@@ -1,10 +1,21 @@
+import os
 import re
+import math
+import heapq
+import pickle
 import random
+import tempfile
 import warnings
 
+from collections import Counter
 from functools import partial
+from itertools import chain, count, islice
+from operator import itemgetter
 
-from path2insight.utils import VisibleDeprecationWarning
+from path2insight.frame import PathFrame
+from path2insight.parse import _pack_paths, _unpack_paths
+from path2insight.trie import PathTrie
+from path2insight.utils import VisibleDeprecationWarning, gc_paused
 
 
 def subset(*args, **kwargs):
@@ -18,29 +29,107 @@ def subset(*args, **kwargs):
     return filter(*args, **kwargs)
 
 
-def _match_file_path(path, level, v):
-    """Helper function to match part."""
+# the maximum number of part names per level with a cached match result
+MATCH_CACHE_SIZE = 100000
 
-    if v == "*" or v is True:
+# a backreference, a conditional group or global inline flags don't
+# survive merging several patterns into one alternation
+_UNMERGEABLE_RE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(|^\(\?[aiLmsux]+\)")
+
+
+class _MatchCache(dict):
+    """Cache with the match result of each part name of a level."""
+
+    def __init__(self, match):
+        self.match = match
+
+    def __missing__(self, part):
+
+        result = self.match(part) is not None
+        if len(self) < MATCH_CACHE_SIZE:
+            self[part] = result
+
+        return result
+
+
+def _compile_pattern(values):
+    """Compile the regexp patterns of a level into one match function."""
+
+    patterns = [re.compile(v) for v in values]
+
+    if len(patterns) == 1:
+        return patterns[0].match
+
+    # compiled patterns are only merged when their flags are equal, the
+    # merged pattern is compiled with these flags
+    flags = set([p.flags for p in patterns])
+    if len(flags) == 1 and \
+            not any([_UNMERGEABLE_RE.search(p.pattern) for p in patterns]):
         try:
-            path[level]
-            return True
-        except IndexError:
-            return False
-    else:
-        return path[level] == v
+            return re.compile(
+                "|".join(["(?:{})".format(p.pattern) for p in patterns]),
+                flags.pop()).match
+        except (re.error, ValueError):
+            pass
 
+    def match(part):
+        for p in patterns:
+            m = p.match(part)
+            if m is not None:
+                return m
 
-def _re_match_file_path(path, level, v):
-    """Helper function to match part with regexp pattern."""
+    return match
 
-    try:
-        if re.match(v, path[level]):
-            return True
+
+def _compile_level(value, use_re):
+    """Compile the value(s) of one level.
+
+    :return: None if any part name matches ("*" or True), a frozenset
+        with the names for an exact match, or a function that takes the
+        part name and returns True if it matches. An empty list of
+        values matches no part name.
+    """
+
+    if not isinstance(value, (list, tuple)):
+        value = [value]
+
+    if not value:
+        return frozenset()
+
+    if use_re:
+        return _MatchCache(_compile_pattern(value)).__getitem__
+
+    if any([v == "*" or v is True for v in value]):
+        return None
+
+    return frozenset(value)
+
+
+def _compile_levels(levels, use_re):
+    """Compile the level arguments into a query plan.
+
+    :return: The highest level (a path needs a part on this level) and a
+        list of (level, predicate) tuples, the exact matches first. The
+        predicate takes the part name and returns True if it matches.
+    """
+
+    max_level = -1
+    exact = []
+    patterns = []
+
+    for level, value in levels:
+        max_level = max(max_level, level)
+
+        match = _compile_level(value, use_re)
+        if match is None:
+            # only the existence of the part is checked (with max_level)
+            continue
+        elif isinstance(match, frozenset):
+            exact.append((level, match.__contains__))
         else:
-            return False
-    except IndexError:
-        return False
+            patterns.append((level, match))
+
+    return max_level, exact + patterns
 
 
 def select(paths, **kwargs):
@@ -50,8 +139,8 @@ def select(paths, **kwargs):
     part (like folder of file) names. This is done with the
     level arguments.
 
-    :param paths: A list of filepaths
-    :type paths: list
+    :param paths: A list of filepaths, a PathFrame or a PathTrie
+    :type paths: list, PathFrame, PathTrie
     :param level0: The value(s) of the first level (root).
     :type level0: (list of) str
     :param level1:  The value(s) of the second level.
@@ -59,8 +148,9 @@ def select(paths, **kwargs):
     :param level*:  The value(s) of the nth level.
     :type level*: (list of) str
 
-    :return: A list with the selection of matching filepath.
-    :return_type: list
+    :return: A list with the selection of matching filepath (or a
+        PathFrame if paths is a PathFrame).
+    :return_type: list, PathFrame
 
     :Note:
 
@@ -69,6 +159,9 @@ def select(paths, **kwargs):
     than the number of parts), then the path is excluded from the
     selection. One can also use `True` instead of "*".
 
+    The keyword arguments must be exactly "level" followed by a number.
+    Any other keyword argument (like "level1x") raises a TypeError.
+
     :Example:
 
     Selection based on the name of a level.
@@ -103,8 +196,8 @@ def select_re(paths, **kwargs):
     part (like folder of file) names. This is done with the
     level arguments.
 
-    :param paths: A list of filepaths
-    :type paths: list
+    :param paths: A list of filepaths, a PathFrame or a PathTrie
+    :type paths: list, PathFrame, PathTrie
     :param level0: The value(s) of the first level (root).
     :type level0: (list of) str
     :param level1:  The value(s) of the second level.
@@ -112,8 +205,14 @@ def select_re(paths, **kwargs):
     :param level*:  The value(s) of the nth level.
     :type level*: (list of) str
 
-    :return: A list with the selection of matching filepath.
-    :return_type: list
+    :return: A list with the selection of matching filepath (or a
+        PathFrame if paths is a PathFrame).
+    :return_type: list, PathFrame
+
+    :Note:
+
+    The keyword arguments must be exactly "level" followed by a number.
+    Any other keyword argument (like "level1x") raises a TypeError.
 
     :Example:
 
@@ -144,12 +243,27 @@ def _select(paths, **kwargs):
 
     use_re = kwargs.pop('regexp')
 
-    matcher = _re_match_file_path if use_re else _match_file_path
+    if isinstance(paths, PathTrie):
+        return paths._select(kwargs, use_re)
+
+    max_level, predicates = _compile_levels(_parse_levels(kwargs), use_re)
+
+    if isinstance(paths, PathFrame):
+        return _select_frame(paths, max_level, predicates)
+
+    return list(_iter_select(paths, max_level, predicates))
+
+
+def _parse_levels(kwargs):
+    """Return a list with the level and the value(s) of the arguments.
+
+    Only the keywords "level<n>" are valid, others raise TypeError.
+    """
 
     levels = []
 
     for level, value in kwargs.items():
-        match = re.match(r"level([0-9]+)", level)
+        match = re.match(r"level([0-9]+)$", level)
         if match:
             levels.append((int(match.group(1)), value))
         else:
@@ -157,22 +271,98 @@ def _select(paths, **kwargs):
                 "{} is an invalid keyword argument for this function"
                 .format(level))
 
-    data_selection = paths
-    for level, value in levels:
-        if not isinstance(value, (list, tuple)):
-            value = [value]
+    return levels
 
-        data_temp = []
-        for path in data_selection:
-            try:
-                if any([matcher(path.parts, level, v) for v in value]):
-                    data_temp.append(path)
-            except IndexError:
-                pass
-        data_selection = data_temp
-        data_temp = []
 
-    return data_selection
+def _iter_select(paths, max_level, predicates):
+    """Yield the paths that match all levels, in a single pass."""
+
+    for path in paths:
+        parts = path._parts
+        if len(parts) > max_level:
+            for level, predicate in predicates:
+                if not predicate(parts[level]):
+                    break
+            else:
+                yield path
+
+
+def _select_frame(frame, max_level, predicates):
+    """Select rows of a PathFrame. Each unique part is matched once."""
+
+    strings = frame.strings
+
+    if max_level < 0:
+        return frame.take(range(len(frame)))
+
+    rows = [i for i, n in enumerate(frame.depths()) if n >= max_level]
+    if max_level == 0:
+        # the depth of a path with one part is 0, as without parts
+        level_ids = frame.level_ids(0)
+        rows = [i for i in rows if level_ids[i] != -1]
+
+    for level, predicate in predicates:
+        level_ids = frame.level_ids(level)
+
+        candidates = set([level_ids[i] for i in rows])
+        match_ids = set([part_id for part_id in candidates
+                         if predicate(strings[part_id])])
+
+        rows = [i for i in rows if level_ids[i] in match_ids]
+
+    return frame.take(rows)
+
+
+# the number of paths per pickled block in a sorted run of isort
+_RUN_BLOCK_SIZE = 10000
+
+
+def _key_sort(x, level):
+    """Return the parts of a path on the levels (the sort key)."""
+
+    parts = x._parts
+    n = len(parts)
+
+    return [parts[k] for k in level if -n <= k < n]
+
+
+def _path_sort_key():
+    """Return the key function to sort paths in the order of comparing them.
+
+    The key is a tuple of the case-folded parts for all path types (full
+    and compact paths). Like comparing the paths, paths of a different
+    flavour (Windows and Posix) raise TypeError.
+    """
+
+    flavours = []
+
+    def key(fp):
+        flavour = fp._flavour
+        if not flavours:
+            flavours.append(flavour)
+        elif flavour is not flavours[0]:
+            raise TypeError(
+                "paths of a different flavour (Windows and Posix) can't "
+                "be sorted")
+
+        return tuple(fp._cparts)
+
+    return key
+
+
+def _sort_key(level):
+    """Return the key function to sort paths on levels (or on the path)."""
+
+    if level is None:
+        return _path_sort_key()
+
+    return partial(_key_sort, level=level)
+
+
+def _rank(strings):
+    """Return a dict with the rank of each unique string."""
+
+    return dict((s, i) for i, s in enumerate(sorted(set(strings))))
 
 
 def sort(paths, level=None, reverse=False):
@@ -182,16 +372,22 @@ def sort(paths, level=None, reverse=False):
     based on parts of the (like folder of file) names. This is done
     with the key arguments.
 
-    :param paths: A list of filepaths
-    :type paths: list
+    The sort key of each path is computed once. When sorting on levels,
+    the parts are replaced by their rank among the unique parts, so the
+    paths are compared on integers. See :py:func:`path2insight.isort` to
+    sort more paths than fit in memory.
+
+    :param paths: A list of filepaths, a PathFrame or an iterable of
+        filepaths.
+    :type paths: list, PathFrame, iterable
     :param level: List of positions which refer to the axis items.
         Default None.
     :type level: (list of) int
     :param reverse:  Reverse the sort.
     :type reverse: bool
 
-    :return: A sorted list.
-    :return_type: list
+    :return: A sorted list (or a PathFrame if paths is a PathFrame).
+    :return_type: list, PathFrame
 
     :Example:
 
@@ -202,46 +398,531 @@ def sort(paths, level=None, reverse=False):
 
     """
 
-    def _key_sort(x, level):
+    if level is not None and not isinstance(level, (list, tuple)):
+        level = [level]
+
+    if isinstance(paths, PathFrame):
+        return paths.take(paths.argsort(level, reverse))
+
+    with gc_paused():
+        if level is None:
+            return sorted(paths, key=_sort_key(None), reverse=reverse)
+
+        paths = list(paths)
+
+        keys = [_key_sort(fp, level) for fp in paths]
+        rank = _rank(chain.from_iterable(keys))
+        keys = [tuple([rank[s] for s in key]) for key in keys]
+
+        indices = sorted(range(len(paths)), key=keys.__getitem__,
+                         reverse=reverse)
+
+        return [paths[i] for i in indices]
+
+
+def _write_run(paths, tmp_dir):
+    """Pickle a sorted run to a temporary file in blocks."""
+
+    fd, filename = tempfile.mkstemp(prefix='path2insight-', suffix='.run',
+                                    dir=tmp_dir)
+    with os.fdopen(fd, 'wb') as f:
+        for i in range(0, len(paths), _RUN_BLOCK_SIZE):
+            pickle.dump(_pack_paths(paths[i:i + _RUN_BLOCK_SIZE]), f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+
+    return filename
+
+
+def _read_run(filename):
+    """Iterate over the paths of a sorted run, one block at a time."""
 
-        a = []
-        for k in level:
+    with open(filename, 'rb') as f:
+        while True:
             try:
-                a.append(x.parts[k])
-            except IndexError:
-                pass
+                block = _unpack_paths(pickle.load(f))
+            except EOFError:
+                return
 
-        return a
+            for fp in block:
+                yield fp
 
-    data_copy = paths.copy()
 
-    if level is not None:
-        if not isinstance(level, (list, tuple)):
-            level = [level]
-        data_copy.sort(key=partial(_key_sort, level=level), reverse=reverse)
-    else:
-        data_copy.sort(reverse=reverse)
+def isort(paths, level=None, reverse=False, buffer_size=1000000,
+          tmp_dir=None):
+    """Sort filepaths that don't fit in memory.
+
+    The paths are read in chunks of buffer_size paths. Each chunk is
+    sorted and written to a temporary file (a sorted run). The sorted
+    runs are merged while iterating over the result, so at most
+    buffer_size paths are kept in memory. The temporary files are removed
+    when the iteration stops. If all paths fit in one chunk, nothing is
+    written to disk.
+
+    :param paths: An iterable of filepaths, for example a generator.
+    :type paths: iterable
+    :param level: List of positions which refer to the axis items.
+        Default None.
+    :type level: (list of) int
+    :param reverse:  Reverse the sort.
+    :type reverse: bool
+    :param buffer_size: The number of paths to sort in memory.
+        Default 1000000.
+    :type buffer_size: int
+    :param tmp_dir: The directory for the sorted runs. Default None (the
+        temporary directory of the system).
+    :type tmp_dir: str
+
+    :return: A generator with the sorted paths, in the same order as
+        :py:func:`path2insight.sort`.
+    :return_type: generator
+
+    :Example:
+
+    >>> for files, folders in path2insight.iwalk('/mnt/archive'):
+    ...
+    >>> sorted_paths = path2insight.isort(
+            (fp for files, _ in path2insight.iwalk('/mnt/archive')
+             for fp in files), buffer_size=100000)
+
+    """
+
+    if buffer_size < 1:
+        raise ValueError("buffer_size should be at least 1")
+
+    if level is not None and not isinstance(level, (list, tuple)):
+        level = [level]
+
+    it = iter(paths)
+    runs = []
+    readers = []
+
+    try:
+        while True:
+            chunk = sort(islice(it, buffer_size), level, reverse)
+
+            if not runs and len(chunk) < buffer_size:
+                # all paths fit in memory
+                for fp in chunk:
+                    yield fp
+                return
+
+            if chunk:
+                runs.append(_write_run(chunk, tmp_dir))
+            if len(chunk) < buffer_size:
+                break
+            del chunk
+
+        readers = [_read_run(filename) for filename in runs]
+        for fp in heapq.merge(*readers, key=_sort_key(level),
+                              reverse=reverse):
+            yield fp
+
+    finally:
+        for reader in readers:
+            reader.close()
+        for filename in runs:
+            os.remove(filename)
+
+
+def _get_random(seed):
+    """Return a random generator for seed (the random module if None)."""
+
+    return random if seed is None else random.Random(seed)
+
 
-    return data_copy
+def _random_open(rng):
+    """Return a random float in the open interval (0, 1)."""
 
+    r = rng.random()
+    while r == 0.0:
+        r = rng.random()
 
-def sample(data, n=None):
+    return r
+
+
+def _reservoir_sample(iterable, n, rng):
+    """Take a sample of at most n items in one pass over an iterable.
+
+    Reservoir sampling with Algorithm L (Li, 1994): the number of items to
+    skip before the next replacement is drawn at once, so the number of
+    random numbers depends on n and log(N / n), not on N.
+    """
+
+    it = iter(iterable)
+    reservoir = list(islice(it, n))
+
+    if n == 0 or len(reservoir) < n:
+        return reservoir
+
+    w = math.exp(math.log(_random_open(rng)) / n)
+    while True:
+        skip = 0 if w >= 1.0 else \
+            int(math.log(_random_open(rng)) / math.log1p(-w))
+        for item in islice(it, skip, skip + 1):
+            reservoir[rng.randrange(n)] = item
+            break
+        else:
+            return reservoir
+
+        w *= math.exp(math.log(_random_open(rng)) / n)
+
+
+def _stratum_key(stratify):
+    """Return a function that returns the stratum of a path."""
+
+    if callable(stratify):
+        return stratify
+
+    if stratify == 'extension':
+        return lambda fp: fp.suffix.lower()
+
+    level = stratify
+    if not isinstance(level, int):
+        match = re.match(r"level([0-9]+)$", str(stratify))
+        if not match:
+            raise ValueError("Unknown value for 'stratify'")
+        level = int(match.group(1))
+
+    def key(fp):
+        parts = fp._parts
+        return parts[level] if len(parts) > level else None
+
+    return key
+
+
+def _stratified_sample(iterable, n, key, rng):
+    """Take a stratified sample in one pass over an iterable.
+
+    Each stratum keeps a reservoir of at most n items (Algorithm R). The
+    sample size of each stratum is proportional to the size of the
+    stratum (largest remainder method).
+    """
+
+    reservoirs = {}
+    counts = Counter()
+
+    for item in iterable:
+        stratum = key(item)
+        counts[stratum] += 1
+        count = counts[stratum]
+
+        if count <= n:
+            reservoirs.setdefault(stratum, []).append(item)
+        else:
+            j = int(rng.random() * count)
+            if j < n:
+                reservoirs[stratum][j] = item
+
+    total = sum(counts.values())
+    if n > total:
+        raise ValueError("Sample larger than population")
+
+    # strata in order of appearance, the quotas of the largest remainders
+    # are rounded up
+    quotas = dict((stratum, n * count // total)
+                  for stratum, count in counts.items())
+    remainders = sorted(counts, key=lambda s: -(n * counts[s] % total))
+    for stratum in remainders[:n - sum(quotas.values())]:
+        quotas[stratum] += 1
+
+    result = []
+    for stratum, reservoir in reservoirs.items():
+        result.extend(rng.sample(reservoir, quotas[stratum]))
+
+    return result
+
+
+def sample(data, n=None, seed=None, stratify=None):
     """Take a random sample of filepaths.
 
-    :param paths: A list of filepaths
-    :type paths: list
+    The filepaths can be any iterable, like a generator. An iterable
+    without length is sampled in one pass with reservoir sampling, so
+    only the sample is kept in memory.
+
+    :param paths: A list of filepaths, a PathFrame or an iterable of
+        filepaths.
+    :type paths: list, PathFrame, iterable
     :param n: The number of filepaths to return. If None, all filepaths are
         returned in a random order. Default None.
     :type n: int, optional
+    :param seed: The seed of the random generator. If None, the random
+        module is used. Default None.
+    :type seed: int, optional
+    :param stratify: Take a stratified sample: the number of filepaths of
+        each stratum in the sample is proportional to the number of
+        filepaths of the stratum. The stratum is 'extension' (lower
+        case), the part on a level (int or 'level2') or a callable that
+        takes a filepath. Each stratum keeps at most n filepaths in
+        memory. Requires n. Default None.
+    :type stratify: str, int, callable, optional
+
+    :return: A list with a sample of filepath (or a PathFrame if data is
+        a PathFrame).
+    :return_type: list, PathFrame
+
+    :Example:
 
-    :return: A list with a sample of filepath.
-    :return_type: list
+    >>> path2insight.sample(paths, 1000, seed=1)
+    >>> path2insight.sample(iter_paths(), 1000, stratify='extension')
+    >>> path2insight.sample(paths, 1000, stratify=2)
 
     """
 
-    if n is not None:
-        return random.sample(data, n)
+    if stratify is not None and n is None:
+        raise ValueError("A stratified sample requires the sample size n")
+
+    rng = _get_random(seed)
+
+    if stratify is not None:
+        key = _stratum_key(stratify)
+
+        # sample the positions of a PathFrame, the result is a PathFrame
+        # of the same path type
+        if isinstance(data, PathFrame):
+            indices = _stratified_sample(
+                range(len(data)), n, lambda i: key(data[i]), rng)
+            rng.shuffle(indices)
+            return data.take(indices)
+
+        result = _stratified_sample(data, n, key, rng)
+        rng.shuffle(result)
+
+        return result
+
+    if isinstance(data, PathFrame) or (hasattr(data, '__len__') and
+                                       hasattr(data, '__getitem__')):
+        # sample the positions, no copy of the data is needed
+        indices = list(range(len(data)))
+        if n is None:
+            rng.shuffle(indices)
+        else:
+            indices = rng.sample(indices, n)
+
+        if isinstance(data, PathFrame):
+            return data.take(indices)
+        return [data[i] for i in indices]
+
+    if n is None:
+        result = list(data)
     else:
-        data_copy = data.copy()
-        random.shuffle(data_copy)
-        return data_copy
+        result = _reservoir_sample(data, n, rng)
+        if len(result) < n:
+            raise ValueError("Sample larger than population")
+    rng.shuffle(result)
+
+    return result
+
+
+class Query(object):
+    """Lazy, chainable query over a collection of filepaths.
+
+    The steps of a query are not executed until the query is iterated
+    (or converted with :py:meth:`to_list`). Consecutive selections are
+    fused into one pass over the paths, selections after a sort are
+    moved before the sort, and a head after a sort, a shuffle (a sample
+    without n) or a sample limits the sort, the shuffle or the sample to
+    the first n paths. Samples are taken in one pass with reservoir
+    sampling. Without a sort or a sample, the paths are read until the
+    head is reached.
+
+    Each method returns a new Query, so a query can be reused and
+    extended.
+
+    Create a query with :py:func:`path2insight.query`.
+
+    :Example:
+
+    >>> q = path2insight.query(paths).select(level1='data') \\
+            .select_re(level3=r'^raw').sort(level=2).head(100)
+    >>> q.to_list()
+    [PosixFilePath('/data/2015/raw_01/file.raw'), ...]
+
+    """
+
+    def __init__(self, paths, steps=()):
+
+        self.paths = paths
+        self._steps = tuple(steps)
+
+    def __repr__(self):
+        return "Query(steps={})".format(
+            [step[0] for step in self._steps])
+
+    def _extend(self, step):
+        """Return a new query with step added to the plan."""
+
+        steps = list(self._steps)
+        kind = step[0]
+
+        if kind == 'filter':
+            # a filter commutes with a sort, filter before sorting
+            tail = []
+            while steps and steps[-1][0] == 'sort':
+                tail.insert(0, steps.pop())
+
+            if steps and steps[-1][0] == 'filter':
+                _, max_level, predicates = steps.pop()
+                step = ('filter', max(max_level, step[1]),
+                        predicates + step[2])
+
+            steps += [step] + tail
+
+        elif kind == 'head' and steps and steps[-1][0] == 'head':
+            steps.append(('head', min(steps.pop()[1], step[1])))
+
+        else:
+            steps.append(step)
+
+        return Query(self.paths, steps)
+
+    def select(self, **kwargs):
+        """Select paths based on their part names.
+
+        See :py:func:`path2insight.select` for the level arguments.
+
+        :return: A new query.
+        :return_type: Query
+        """
+
+        return self._extend(
+            ('filter',) + _compile_levels(_parse_levels(kwargs), False))
+
+    def select_re(self, **kwargs):
+        """Select paths based on their part names with regexp patterns.
+
+        See :py:func:`path2insight.select_re` for the level arguments.
+
+        :return: A new query.
+        :return_type: Query
+        """
+
+        return self._extend(
+            ('filter',) + _compile_levels(_parse_levels(kwargs), True))
+
+    def sort(self, level=None, reverse=False):
+        """Sort the paths.
+
+        See :py:func:`path2insight.sort` for the arguments.
+
+        :return: A new query.
+        :return_type: Query
+        """
+
+        if level is not None and not isinstance(level, (list, tuple)):
+            level = [level]
+
+        return self._extend(('sort', level, reverse))
+
+    def sample(self, n=None, seed=None, stratify=None):
+        """Take a random sample of the paths.
+
+        See :py:func:`path2insight.sample` for the arguments.
+
+        :return: A new query.
+        :return_type: Query
+        """
+
+        if stratify is not None and n is None:
+            raise ValueError(
+                "A stratified sample requires the sample size n")
+
+        return self._extend(('sample', n, seed, stratify))
+
+    def head(self, n):
+        """Take the first n paths.
+
+        :param n: The number of paths.
+        :type n: int
+
+        :return: A new query.
+        :return_type: Query
+        """
+
+        return self._extend(('head', n))
+
+    def __iter__(self):
+
+        result = iter(self.paths)
+        steps = list(self._steps)
+
+        while steps:
+            step = steps.pop(0)
+            kind = step[0]
+
+            # the number of paths taken after this step
+            limit = steps[0][1] if steps and steps[0][0] == 'head' \
+                else None
+
+            if kind == 'filter':
+                result = _iter_select(result, step[1], step[2])
+
+            elif kind == 'head':
+                result = islice(result, step[1])
+
+            elif kind == 'sort':
+                _, level, reverse = step
+
+                if limit is not None:
+                    steps.pop(0)
+                    select_n = heapq.nlargest if reverse \
+                        else heapq.nsmallest
+                    result = iter(
+                        select_n(limit, result, key=_sort_key(level)))
+                else:
+                    result = iter(sort(result, level, reverse))
+
+            elif kind == 'sample':
+                _, n, seed, stratify = step
+
+                # the first k paths of a shuffle (or of a sample of n
+                # paths) are a sample of k paths (or of min(n, k) paths)
+                if limit is not None and stratify is None:
+                    steps.pop(0)
+                    rng = _get_random(seed)
+
+                    # count the paths, a sample of n paths from fewer
+                    # paths is still an error
+                    counter = count()
+                    data = _reservoir_sample(
+                        map(itemgetter(0), zip(result, counter)),
+                        limit if n is None else min(n, limit), rng)
+                    if n is not None and next(counter) < n:
+                        raise ValueError("Sample larger than population")
+                    rng.shuffle(data)
+                else:
+                    data = sample(result, n, seed=seed, stratify=stratify)
+
+                result = iter(data)
+
+        return result
+
+    def to_list(self):
+        """Execute the query.
+
+        :return: A list with the paths.
+        :return_type: list
+        """
+
+        return list(self)
+
+
+def query(paths):
+    """Create a lazy query over a collection of filepaths.
+
+    The query is executed when it is iterated. See
+    :py:class:`path2insight.Query` for the steps.
+
+    :param paths: The filepaths.
+    :type paths: list, iterable of WindowsFilePath or PosixFilePath objects
+
+    :return: A query.
+    :return_type: Query
+
+    :Example:
+
+    >>> path2insight.query(paths).select(level1='data') \\
+            .sort(level=2).head(100).to_list()
+
+    """
+
+    return Query(paths)
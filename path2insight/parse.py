@@ -1,7 +1,180 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 from path2insight import WindowsFilePath, PosixFilePath
+from path2insight import CompactWindowsFilePath, CompactPosixFilePath
+from path2insight.core import _CachedParser, _CompactFilePath
+from path2insight.frame import PathFrame
+from path2insight.utils import gc_paused
+
+# inputs smaller than this are parsed in the current process
+PARALLEL_MIN_SIZE = 100000
+
+
+def _path_type(os_name, compact=False):
+    """Return the path type for an operating system."""
+
+    if os_name in ['windows', 'nt']:
+        return CompactWindowsFilePath if compact else WindowsFilePath
+    elif os_name in ['posix', 'linux']:
+        return CompactPosixFilePath if compact else PosixFilePath
+    else:
+        raise ValueError('incorrect os_name given')
+
+
+def _normalize_args(fp):
+    """Return a path string or a tuple of path arguments."""
+
+    if isinstance(fp, (tuple, list)):
+        return fp[0] if len(fp) == 1 else tuple(fp)
+    return fp
+
+
+def _paths_from_split(l, splits, FilePathObject, pool=None):
+    """Create path objects from parsed parent directories and names.
+
+    :param l: The raw arguments of the paths.
+    :param splits: The parsed parent directory and the name of each path
+        (see _CachedParser.split).
+    :param pool: InternPool for the drive, root, parts and names.
+    """
+
+    compact = issubclass(FilePathObject, _CompactFilePath)
+
+    # the (interned) parsed parent directories and their parts as tuple,
+    # the tuple is shared by the compact paths in a directory. Keyed on
+    # the id of the parsed parent, which is kept alive in the dict.
+    heads = {}
+
+    result = []
+    with gc_paused():
+        for fp, (parsed, name) in zip(l, splits):
+            fp = _normalize_args(fp)
+
+            try:
+                _, drv, root, parts, head = heads[id(parsed)]
+            except KeyError:
+                drv, root, parts = parsed
+                if pool is not None:
+                    drv = pool.intern(drv)
+                    root = pool.intern(root)
+                    parts = [pool.intern(part) for part in parts]
+                head = tuple(parts) if compact else None
+                heads[id(parsed)] = (parsed, drv, root, parts, head)
+
+            if name is None:
+                path = FilePathObject._from_parsed_args(fp, drv, root, parts)
+            elif compact:
+                path = FilePathObject._from_head(
+                    drv, root, head, pool.intern(name) if pool else name)
+            else:
+                path = FilePathObject._from_parsed_args(
+                    fp, drv, root,
+                    parts + [pool.intern(name) if pool else name])
+
+            result.append(path)
+
+    return result
+
+
+def _parse_args_list(l, FilePathObject, pool=None):
+    """Parse a list of strings (or tuples of strings) into path objects.
+
+    The parent directories are parsed once for all paths in the list.
+    The result is the same as calling FilePathObject(*fp) for each item.
+    """
+
+    parser = _CachedParser(FilePathObject)
+
+    return _paths_from_split(
+        l, [parser.split(_normalize_args(fp)) for fp in l], FilePathObject,
+        pool=pool)
+
+
+def _pack_paths(paths):
+    """Pack a list of path objects to pickle them.
+
+    A list of paths of one type is packed as strings, which are parsed
+    again (with the shared parent directories) faster than pickled path
+    objects are loaded.
+    """
+
+    path_types = set([type(fp) for fp in paths])
+    if len(path_types) == 1:
+        return path_types.pop(), [str(fp) for fp in paths]
+
+    return None, list(paths)
+
+
+def _unpack_paths(packed):
+    """Unpack a list of path objects packed with _pack_paths."""
+
+    path_type, paths = packed
+    if path_type is None:
+        return paths
+
+    return _parse_args_list(paths, path_type)
+
+
+def _parse_chunk(chunk, FilePathObject, columnar):
+    """Parse a chunk of paths in a worker process.
+
+    Returns a PathFrame if columnar is True, else a list with the parsed
+    parent directory and the name of each path. The parsed parent
+    directory is the same object for all paths in a directory, so it is
+    pickled only once. The path objects are created in the main process,
+    which is cheaper than pickling them.
+    """
+
+    if columnar:
+        return PathFrame.from_strings(chunk, FilePathObject)
 
+    parser = _CachedParser(FilePathObject)
 
-def parse(obj, os_name=None):
+    return [parser.split(_normalize_args(fp)) for fp in chunk]
+
+
+def _parse(l, FilePathObject, columnar=False, n_jobs=1, pool=None):
+    """Parse a list of paths, optionally in a pool of processes.
+
+    The list is split into chunks which are parsed by n_jobs processes.
+    The results are returned in the original order. Small inputs are
+    parsed in the current process.
+    """
+
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+
+    if n_jobs < 1:
+        raise ValueError('n_jobs must be a positive integer or -1')
+
+    if n_jobs == 1 or len(l) < PARALLEL_MIN_SIZE:
+        if columnar:
+            return PathFrame.from_strings(l, FilePathObject)
+        return _parse_args_list(l, FilePathObject, pool=pool)
+
+    # a few chunks per process to balance the load
+    chunksize = -(-len(l) // (4 * n_jobs))
+    chunks = [l[i:i + chunksize] for i in range(0, len(l), chunksize)]
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        results = executor.map(_parse_chunk, chunks,
+                               [FilePathObject] * len(chunks),
+                               [columnar] * len(chunks))
+
+        if columnar:
+            return PathFrame.concat(results)
+
+        paths = []
+        for chunk, splits in zip(chunks, results):
+            paths.extend(_paths_from_split(chunk, splits, FilePathObject,
+                                           pool=pool))
+
+    return paths
+
+
+def parse(obj, os_name=None, columnar=False, n_jobs=1, compact=False,
+          pool=None):
     """Parse (list of) file paths.
 
     Parse a list with file paths into list of WindowsFilePath
@@ -26,25 +199,44 @@ def parse(obj, os_name=None):
         The options are 'windows' or 'posix' for Windows and Posix system
         repectivily.
     :type os_name: str
-
-    :return: Returns a list with WindowsFilePaths and PosixFilePaths.
-    :return_type: list
+    :param columnar: Return a :py:class:`path2insight.PathFrame` instead
+        of a list. Default False.
+    :type columnar: bool
+    :param n_jobs: The number of processes to parse with. Use -1 for all
+        cores. Inputs with less than PARALLEL_MIN_SIZE paths are always
+        parsed in the current process. Default 1.
+    :type n_jobs: int
+    :param compact: Return CompactWindowsFilePath or CompactPosixFilePath
+        objects, which use much less memory but have no args attribute
+        and only the analysis methods. Default False.
+    :type compact: bool
+    :param pool: Intern the drive, root and parts of the paths with this
+        :py:class:`path2insight.InternPool`, to share equal strings with
+        other paths in the pool. Not used with columnar. Default None.
+    :type pool: InternPool
+
+    :return: Returns a list with WindowsFilePaths and PosixFilePaths
+        (or a PathFrame if columnar is True).
+    :return_type: list, PathFrame
 
     """
 
     # try for a list or tuple
     if isinstance(obj, (list, tuple)):
-        return parse_from_list(obj, os_name=os_name)
+        return parse_from_list(obj, os_name=os_name, columnar=columnar,
+                               n_jobs=n_jobs, compact=compact, pool=pool)
 
     # try for numpy object
     try:
-        return parse_from_numpy(obj, os_name=os_name)
+        return parse_from_numpy(obj, os_name=os_name, columnar=columnar,
+                                n_jobs=n_jobs, compact=compact, pool=pool)
     except (ImportError, TypeError):
         pass
 
     # try for pandas object
     try:
-        return parse_from_pandas(obj, os_name=os_name)
+        return parse_from_pandas(obj, os_name=os_name, columnar=columnar,
+                                 n_jobs=n_jobs, compact=compact, pool=pool)
     except (ImportError, TypeError):
         pass
 
@@ -52,7 +244,8 @@ def parse(obj, os_name=None):
     raise TypeError("failed to parse object")
 
 
-def parse_from_pandas(pandas_object, os_name=None):
+def parse_from_pandas(pandas_object, os_name=None, columnar=False, n_jobs=1,
+                      compact=False, pool=None):
     """Parse a series or dataframe with file paths.
 
     See :py:func:`path2insight.parse` for additional information.
@@ -64,9 +257,25 @@ def parse_from_pandas(pandas_object, os_name=None):
         The options are 'windows' or 'posix' for Windows and Posix system
         repectivily.
     :type os_name: str
-
-    :return: Returns a list with WindowsFilePaths and PosixFilePaths.
-    :return_type: list
+    :param columnar: Return a :py:class:`path2insight.PathFrame` instead
+        of a list. Default False.
+    :type columnar: bool
+    :param n_jobs: The number of processes to parse with. Use -1 for all
+        cores. Inputs with less than PARALLEL_MIN_SIZE paths are always
+        parsed in the current process. Default 1.
+    :type n_jobs: int
+    :param compact: Return CompactWindowsFilePath or CompactPosixFilePath
+        objects, which use much less memory but have no args attribute
+        and only the analysis methods. Default False.
+    :type compact: bool
+    :param pool: Intern the drive, root and parts of the paths with this
+        :py:class:`path2insight.InternPool`, to share equal strings with
+        other paths in the pool. Not used with columnar. Default None.
+    :type pool: InternPool
+
+    :return: Returns a list with WindowsFilePaths and PosixFilePaths
+        (or a PathFrame if columnar is True).
+    :return_type: list, PathFrame
     """
 
     try:
@@ -77,22 +286,24 @@ def parse_from_pandas(pandas_object, os_name=None):
     if not isinstance(pandas_object, (pd.Series, pd.DataFrame)):
         raise TypeError('expected pandas.DataFrame of pandas.Series object')
 
-    if os_name in ['windows', 'nt']:
-        FilePathObject = WindowsFilePath
-    elif os_name in ['posix', 'linux']:
-        FilePathObject = PosixFilePath
-    else:
-        raise ValueError('incorrect os_name given')
+    FilePathObject = _path_type(os_name, compact)
+
+    # a dataframe with one column is parsed like a series
+    if isinstance(pandas_object, pd.DataFrame) and \
+            len(pandas_object.columns) == 1:
+        pandas_object = pandas_object.iloc[:, 0]
 
     if isinstance(pandas_object, pd.DataFrame):
         pandas_list = list(pandas_object.itertuples(index=False, name=None))
-        return [FilePathObject(*fp) for fp in pandas_list]
     else:
         pandas_list = pandas_object.tolist()
-        return [FilePathObject(fp) for fp in pandas_list]
+
+    return _parse(pandas_list, FilePathObject, columnar=columnar,
+                  n_jobs=n_jobs, pool=pool)
 
 
-def parse_from_numpy(np_object, os_name=None):
+def parse_from_numpy(np_object, os_name=None, columnar=False, n_jobs=1,
+                     compact=False, pool=None):
     """Parse a numpy array with file paths.
 
     See :py:func:`path2insight.parse` for additional information.
@@ -103,9 +314,25 @@ def parse_from_numpy(np_object, os_name=None):
         The options are 'windows' or 'posix' for Windows and Posix system
         repectivily.
     :type os_name: str
-
-    :return: Returns a list with WindowsFilePaths and PosixFilePaths.
-    :return_type: list
+    :param columnar: Return a :py:class:`path2insight.PathFrame` instead
+        of a list. Default False.
+    :type columnar: bool
+    :param n_jobs: The number of processes to parse with. Use -1 for all
+        cores. Inputs with less than PARALLEL_MIN_SIZE paths are always
+        parsed in the current process. Default 1.
+    :type n_jobs: int
+    :param compact: Return CompactWindowsFilePath or CompactPosixFilePath
+        objects, which use much less memory but have no args attribute
+        and only the analysis methods. Default False.
+    :type compact: bool
+    :param pool: Intern the drive, root and parts of the paths with this
+        :py:class:`path2insight.InternPool`, to share equal strings with
+        other paths in the pool. Not used with columnar. Default None.
+    :type pool: InternPool
+
+    :return: Returns a list with WindowsFilePaths and PosixFilePaths
+        (or a PathFrame if columnar is True).
+    :return_type: list, PathFrame
     """
 
     try:
@@ -116,20 +343,14 @@ def parse_from_numpy(np_object, os_name=None):
     if not isinstance(np_object, (np.ndarray)):
         raise TypeError('expected np.ndarray object')
 
-    if os_name in ['windows', 'nt']:
-        FilePathObject = WindowsFilePath
-    elif os_name in ['posix', 'linux']:
-        FilePathObject = PosixFilePath
-    else:
-        raise ValueError('incorrect os_name given')
+    FilePathObject = _path_type(os_name, compact)
 
-    if isinstance(np_object, np.ndarray) and len(np_object.shape) > 1:
-        return [FilePathObject(*tuple(fp)) for fp in np_object.tolist()]
-    else:
-        return [FilePathObject(fp) for fp in np_object.tolist()]
+    return _parse(np_object.tolist(), FilePathObject, columnar=columnar,
+                  n_jobs=n_jobs, pool=pool)
 
 
-def parse_from_list(l, os_name=None):
+def parse_from_list(l, os_name=None, columnar=False, n_jobs=1,
+                    compact=False, pool=None):
     """Parse a list with file paths.
 
     See :py:func:`path2insight.parse` for additional information.
@@ -140,22 +361,31 @@ def parse_from_list(l, os_name=None):
         The options are 'windows' or 'posix' for Windows and Posix system
         repectivily.
     :type os_name: str
-
-    :return: Returns a list with WindowsFilePaths and PosixFilePaths.
-    :return_type: list
+    :param columnar: Return a :py:class:`path2insight.PathFrame` instead
+        of a list. Default False.
+    :type columnar: bool
+    :param n_jobs: The number of processes to parse with. Use -1 for all
+        cores. Inputs with less than PARALLEL_MIN_SIZE paths are always
+        parsed in the current process. Default 1.
+    :type n_jobs: int
+    :param compact: Return CompactWindowsFilePath or CompactPosixFilePath
+        objects, which use much less memory but have no args attribute
+        and only the analysis methods. Default False.
+    :type compact: bool
+    :param pool: Intern the drive, root and parts of the paths with this
+        :py:class:`path2insight.InternPool`, to share equal strings with
+        other paths in the pool. Not used with columnar. Default None.
+    :type pool: InternPool
+
+    :return: Returns a list with WindowsFilePaths and PosixFilePaths
+        (or a PathFrame if columnar is True).
+    :return_type: list, PathFrame
     """
 
-    if os_name in ['windows', 'nt']:
-        FilePathObject = WindowsFilePath
-    elif os_name in ['posix', 'linux']:
-        FilePathObject = PosixFilePath
-    else:
-        raise ValueError('incorrect os_name given')
+    FilePathObject = _path_type(os_name, compact)
 
     if not isinstance(l, (list, tuple)):
         raise ValueError('expect a list with filepaths')
 
-    l_args = map(lambda x: tuple(x) if isinstance(
-        x, (tuple, list)) else tuple([x]), l)
-
-    return [FilePathObject(*fp) for fp in l_args]
+    return _parse(l, FilePathObject, columnar=columnar, n_jobs=n_jobs,
+                  pool=pool)
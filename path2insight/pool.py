@@ -0,0 +1,119 @@
+"""Pool to share equal strings between file paths."""
+
+from __future__ import division
+
+import sys
+
+
+class InternPool(object):
+    """Pool of unique strings, shared by the parts of many file paths.
+
+    Interning a string returns the pooled string that is equal to it, so
+    equal folder and file names in different paths are stored once. Pass
+    the same pool to :py:func:`path2insight.parse`,
+    :py:func:`path2insight.walk` or the dataset loaders to share the
+    strings between all their paths. Unlike :py:func:`sys.intern`, the
+    pool can be bounded and reports statistics.
+
+    :param maxsize: The maximum number of strings in the pool. When the
+        pool is full, new strings are returned as they are (and counted as
+        a miss). Default None (unbounded).
+    :type maxsize: int
+
+    :Example:
+
+    >>> pool = path2insight.InternPool()
+    >>> files, folders = path2insight.walk('/mnt/archive', pool=pool)
+    >>> pool.stats()
+    {'size': 2301, 'maxsize': None, 'hits': 96712, 'misses': 2301,
+     'hit_rate': 0.976..., 'bytes_saved': 1401344, 'memory_usage': 278106}
+
+    """
+
+    def __init__(self, maxsize=None):
+
+        self.maxsize = maxsize
+
+        self._strings = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def intern(self, s):
+        """Return the pooled string equal to s.
+
+        :param s: The string to intern.
+        :type s: str
+
+        :return: The pooled string (or s if it is not in a full pool).
+        :return_type: str
+        """
+
+        try:
+            pooled = self._strings[s]
+        except KeyError:
+            self.misses += 1
+            if self.maxsize is None or len(self._strings) < self.maxsize:
+                self._strings[s] = s
+            return s
+
+        self.hits += 1
+        if pooled is not s:
+            self.bytes_saved += sys.getsizeof(s)
+
+        return pooled
+
+    def __len__(self):
+        return len(self._strings)
+
+    def __contains__(self, s):
+        return s in self._strings
+
+    def __repr__(self):
+        return "InternPool(size={}, maxsize={})".format(
+            len(self), self.maxsize)
+
+    @property
+    def hit_rate(self):
+        """The fraction of interned strings that were in the pool."""
+
+        n = self.hits + self.misses
+
+        return self.hits / n if n else 0.0
+
+    def memory_usage(self):
+        """Return the approximate memory usage of the pool in bytes."""
+
+        return (sys.getsizeof(self._strings) +
+                sum([sys.getsizeof(s) for s in self._strings]))
+
+    def stats(self):
+        """Return the statistics of the pool.
+
+        The statistics are the size of the pool, the number of hits and
+        misses, the hit rate, the memory saved and the memory usage of
+        the pool. The memory saved is the size of the duplicate strings
+        that were replaced by a pooled string.
+
+        :return: The statistics.
+        :return_type: dict
+        """
+
+        return {
+            'size': len(self),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'bytes_saved': self.bytes_saved,
+            'memory_usage': self.memory_usage(),
+        }
+
+    def clear(self):
+        """Remove all strings from the pool and reset the statistics."""
+
+        self._strings.clear()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
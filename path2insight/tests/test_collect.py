@@ -0,0 +1,210 @@
+import os
+import shutil
+
+import pytest
+
+import path2insight
+
+
+@pytest.fixture
+def tree(tmp_path):
+
+    for i in range(3):
+        for j in range(4):
+            folder = tmp_path / "dir{}".format(i) / "sub{}".format(j)
+            folder.mkdir(parents=True)
+            for k in range(5):
+                (folder / "file{}.txt".format(k)).write_text(u"data")
+    (tmp_path / "README.md").write_text(u"readme")
+
+    return str(tmp_path)
+
+
+def test_walk(tree):
+
+    files, folders = path2insight.walk(tree)
+
+    assert len(files) == 3 * 4 * 5 + 1
+    assert len(folders) == 3 + 3 * 4
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 1000])
+def test_iwalk(tree, batch_size):
+
+    files, folders = path2insight.walk(tree)
+
+    result_files = []
+    result_folders = []
+    for batch_files, batch_folders in path2insight.iwalk(
+            tree, batch_size=batch_size):
+        assert len(batch_files) + len(batch_folders) > 0
+        result_files.extend(batch_files)
+        result_folders.extend(batch_folders)
+
+    assert result_files == files
+    assert result_folders == folders
+
+
+def test_iwalk_onerror(tree):
+
+    errors = []
+    missing = os.path.join(tree, 'missing')
+
+    assert list(path2insight.iwalk(missing, onerror=errors.append)) == []
+    assert len(errors) == 1
+
+
+@pytest.mark.parametrize("topdown", [True, False])
+def test_walk_parallel(tree, topdown):
+
+    files, folders = path2insight.walk(tree, topdown=topdown)
+    result_files, result_folders = path2insight.walk(
+        tree, n_jobs=4, topdown=topdown)
+
+    assert result_files == files
+    assert result_folders == folders
+
+
+class _FailingEntry(object):
+    """Directory entry of which the symlink check fails."""
+
+    def __init__(self, entry):
+        self._entry = entry
+        self.name = entry.name
+
+    def is_dir(self, **kwargs):
+        return self._entry.is_dir(**kwargs)
+
+    def is_symlink(self):
+        raise PermissionError(self.name)
+
+
+class _FailingScandir(object):
+    """os.scandir with a failing symlink check for the folder dir0."""
+
+    def __init__(self, path):
+        self._it = _scandir(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self._it.close()
+
+    def __iter__(self):
+        for entry in self._it:
+            yield _FailingEntry(entry) if entry.name == 'dir0' else entry
+
+
+_scandir = os.scandir
+
+
+def test_walk_parallel_onerror(tree, monkeypatch):
+
+    files, folders = path2insight.walk(tree)
+
+    # an entry that can't be checked doesn't abort the walk
+    monkeypatch.setattr(os, 'scandir', _FailingScandir)
+    errors = []
+    result_files, result_folders = path2insight.walk(
+        tree, n_jobs=2, onerror=errors.append)
+    result = list(path2insight.iwalk(tree, onerror=errors.append))
+
+    assert result_files == files
+    assert result_folders == folders
+    assert result == [(files, folders)]
+    assert len(errors) == 2
+    assert all(isinstance(err, PermissionError) for err in errors)
+
+
+def test_walk_parallel_delay(tree):
+
+    files, folders = path2insight.walk(tree, delay=1, n_jobs=4)
+
+    assert len(files) == 3 * 4 * 5 + 1
+    assert len(folders) == 3 + 3 * 4
+
+
+def test_walk_snapshot(tree, tmp_path_factory):
+
+    snapshot = str(tmp_path_factory.mktemp("snapshot") / "tree.json")
+
+    files, folders = path2insight.walk(tree)
+
+    # first walk creates the snapshot, second walk reuses it
+    assert path2insight.walk(tree, snapshot=snapshot) == (files, folders)
+    assert os.path.exists(snapshot)
+    assert path2insight.walk(tree, snapshot=snapshot) == (files, folders)
+
+    os.remove(os.path.join(tree, 'dir0', 'sub0', 'file0.txt'))
+    files, folders = path2insight.walk(tree)
+
+    assert path2insight.walk(tree, snapshot=snapshot) == (files, folders)
+
+
+def test_walk_changes(tree, tmp_path_factory):
+
+    snapshot = str(tmp_path_factory.mktemp("snapshot") / "tree.json")
+
+    # without snapshot, everything is added
+    changes = list(path2insight.walk_changes(tree, snapshot))
+    added_files = [fp for (fls, fld), removed in changes for fp in fls]
+    assert sorted(added_files) == sorted(path2insight.walk(tree)[0])
+
+    # no changes
+    assert list(path2insight.walk_changes(tree, snapshot)) == []
+
+    os.remove(os.path.join(tree, 'dir0', 'sub0', 'file0.txt'))
+    open(os.path.join(tree, 'dir1', 'new.txt'), 'w').close()
+    shutil.rmtree(os.path.join(tree, 'dir2', 'sub3'))
+
+    changes = list(path2insight.walk_changes(tree, snapshot))
+    added_files = [fp for (fls, fld), removed in changes for fp in fls]
+    removed_files = [fp for added, (fls, fld) in changes for fp in fls]
+    removed_folders = [fp for added, (fls, fld) in changes for fp in fld]
+
+    assert [fp.name for fp in added_files] == ['new.txt']
+    assert len(removed_files) == 1 + 5
+    assert [fp.name for fp in removed_folders] == ['sub3']
+
+    assert list(path2insight.walk_changes(tree, snapshot)) == []
+
+
+def test_walk_changes_onerror(tree, tmp_path_factory, monkeypatch):
+
+    snapshot = str(tmp_path_factory.mktemp("snapshot") / "tree.json")
+    list(path2insight.walk_changes(tree, snapshot))
+
+    # a directory that can't be listed is not reported as removed
+    unreadable = os.path.join(tree, 'dir0')
+    scan_dir = path2insight.collect._scan_dir
+
+    def failing_scan_dir(root, *args, **kwargs):
+        if root == unreadable:
+            raise PermissionError(root)
+        return scan_dir(root, *args, **kwargs)
+
+    monkeypatch.setattr(path2insight.collect, '_scan_dir', failing_scan_dir)
+    errors = []
+    assert list(path2insight.walk_changes(
+        tree, snapshot, onerror=errors.append)) == []
+    assert len(errors) == 1
+
+    # and not as added when it can be listed again
+    monkeypatch.undo()
+    assert list(path2insight.walk_changes(tree, snapshot)) == []
+    assert os.listdir(os.path.dirname(snapshot)) == ['tree.json']
+
+
+def test_walk_pool(tree):
+
+    pool = path2insight.InternPool()
+    files, folders = path2insight.walk(tree, pool=pool)
+
+    assert (files, folders) == path2insight.walk(tree)
+    assert files[0].args == (os.path.dirname(str(files[0])), files[0].name)
+    # the file names repeat in each sub folder
+    assert pool.hits > 0
+    names = {}
+    for fp in files:
+        assert names.setdefault(fp.name, fp.name) is fp.name
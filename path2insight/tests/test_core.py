@@ -1,6 +1,10 @@
+import pickle
+
 import pytest
 
 from path2insight import WindowsFilePath, PosixFilePath
+from path2insight import CompactWindowsFilePath, CompactPosixFilePath
+from path2insight.tokenizers import cached_tokenizer, clear_token_cache
 from path2insight.tests import TEST_PATHS_POSIX, TEST_PATHS_WINDOWS
 
 
@@ -155,3 +159,76 @@ def test_depth():
     filename = 'C:/Program Files/unittest/DOCS_11Mar2020-Armel final.pdf'
 
     assert WindowsFilePath(filename).depth == 3
+
+
+@pytest.mark.parametrize("path_type,compact_type,filepath", [
+    (WindowsFilePath, CompactWindowsFilePath, fp)
+    for fp in TEST_PATHS_WINDOWS + ['C:/', 'data/', 'a/b.tar.gz', '']
+] + [
+    (PosixFilePath, CompactPosixFilePath, fp)
+    for fp in TEST_PATHS_POSIX + ['/', 'a/.hidden', 'a/b.tar.gz', '']
+])
+def test_compact(path_type, compact_type, filepath):
+
+    expected = path_type(filepath)
+    result = compact_type(filepath)
+
+    assert str(result) == str(expected)
+    assert result.as_posix() == expected.as_posix()
+    for attr in ['drive', 'root', 'anchor', 'parts', 'name', 'stem',
+                 'suffix', 'suffixes', 'extension', 'extensions', 'depth']:
+        assert getattr(result, attr) == getattr(expected, attr)
+
+    assert str(result.parent) == str(expected.parent)
+    assert [str(p) for p in result.parents] == \
+        [str(p) for p in expected.parents]
+    assert result.is_absolute() == expected.is_absolute()
+
+    if expected.parts:
+        assert result.tokenize() == expected.tokenize()
+        assert result.tokenize(exclude_extension=False) == \
+            expected.tokenize(exclude_extension=False)
+        assert result.tokenize_stem() == expected.tokenize_stem()
+        assert result.tokenize_name() == expected.tokenize_name()
+        assert str(result.lower()) == str(expected.lower())
+        assert str(result.upper_name()) == str(expected.upper_name())
+        assert str(result.title_stem()) == str(expected.title_stem())
+
+    assert result.to_path() == expected
+    assert type(result.to_path()) is path_type
+    assert pickle.loads(pickle.dumps(result)) == result
+
+
+def test_compact_type():
+
+    fp = CompactWindowsFilePath('C:/Program Files/unittest/DOCS.pdf')
+
+    assert not hasattr(fp, '__dict__')
+    assert type(fp.lower_name()) is CompactWindowsFilePath
+    assert type(fp.parent) is CompactWindowsFilePath
+    assert fp == CompactWindowsFilePath('c:/program files/unittest/docs.PDF')
+    assert fp != CompactPosixFilePath('C:/Program Files/unittest/DOCS.pdf')
+    assert fp != WindowsFilePath('C:/Program Files/unittest/DOCS.pdf')
+    assert sorted([fp, fp.parent]) == [fp.parent, fp]
+
+
+def test_tokenize_cache():
+    filename = 'C:/Program Files/unittest/DOCS_11Mar2020-Armel final.pdf'
+    fp = WindowsFilePath(filename)
+
+    # the tokens are memoised on the path
+    assert fp._tokens('path') is fp._tokens('path')
+    assert fp.tokenize() == fp.tokenize()
+    assert fp.tokenize() is not fp.tokenize()
+
+    # lowering the parts gives the tokens of the lowered path
+    for kind in ['stem', 'name', 'path', 'full']:
+        assert fp._tokens(kind, lower=True) == fp.lower()._tokens(kind)
+
+    assert cached_tokenizer('Program Files') == ('Program', 'Files')
+    assert cached_tokenizer('Program Files') is \
+        cached_tokenizer('Program Files')
+
+    clear_token_cache()
+    assert fp.tokenize(token_pattern=r"[a-z]+") == \
+        ['rogram', 'iles', 'unittest', 'ar', 'rmel', 'final']
@@ -1,5 +1,12 @@
+import os
+
+import pytest
+
 import path2insight
 from path2insight.datasets import load_ensembl, load_pride
+from path2insight.datasets import iter_ensembl, iter_pride
+from path2insight.datasets import clear_cache, get_cache_dir
+from path2insight.datasets import external
 
 
 def test_load_ensembl():
@@ -32,3 +39,68 @@ def test_load_pride():
 
     # check each value
     assert all([type(fp) == path2insight.PosixFilePath for fp in data])
+
+
+@pytest.mark.parametrize("iter_func,load_func", [
+    (iter_pride, load_pride),
+    (iter_ensembl, load_ensembl),
+])
+def test_iter_datasets(iter_func, load_func):
+
+    N = 250
+
+    chunks = list(iter_func(chunksize=100, nrows=N))
+
+    # check the chunk sizes
+    assert [len(chunk) for chunk in chunks] == [100, 100, 50]
+
+    # the chunks contain the same paths as the loader
+    assert [fp for chunk in chunks for fp in chunk] == load_func(nrows=N)
+
+    frames = list(iter_func(chunksize=100, nrows=N, columnar=True))
+    assert all([isinstance(frame, path2insight.PathFrame)
+                for frame in frames])
+    assert [fp for frame in frames for fp in frame] == load_func(nrows=N)
+
+
+def test_load_cache(tmp_path, monkeypatch):
+
+    N = 100
+    cache_dir = str(tmp_path / "cache")
+
+    expected = load_ensembl(nrows=N)
+
+    # the first load creates the cache file, the second load uses it
+    assert load_ensembl(nrows=N, cache=True, cache_dir=cache_dir) == expected
+    assert len(os.listdir(cache_dir)) == 1
+
+    # a failed write leaves no temporary file behind
+    def failing_dump(*args, **kwargs):
+        raise RuntimeError('disk full')
+
+    monkeypatch.setattr(external.pickle, 'dump', failing_dump)
+    with pytest.raises(RuntimeError):
+        load_pride(nrows=N, cache=True, cache_dir=cache_dir)
+    monkeypatch.undo()
+    assert len(os.listdir(cache_dir)) == 1
+    assert load_ensembl(nrows=N, cache=True, cache_dir=cache_dir) == expected
+
+    frame = load_ensembl(columnar=True, cache=True, cache_dir=cache_dir)
+    assert isinstance(frame, path2insight.PathFrame)
+    assert frame[:N].to_list() == expected
+
+    # the environment variable sets the default cache directory
+    monkeypatch.setenv('PATH2INSIGHT_CACHE_DIR', cache_dir)
+    assert get_cache_dir() == cache_dir
+
+    # other files in the cache directory are not removed
+    for filename in ['model.pkl', 'results.pkl.tmp', 'pride-v1-notes.pkl']:
+        open(os.path.join(cache_dir, filename), 'w').close()
+    for suffix in ['.pkl.tmp', '.pkl.k2x_9ab1.tmp']:
+        open(os.path.join(cache_dir, 'pride-v{}-0123456789abcdef{}'.format(
+            external._CACHE_VERSION, suffix)), 'w').close()
+
+    assert clear_cache() == 3
+    assert sorted(os.listdir(cache_dir)) == \
+        ['model.pkl', 'pride-v1-notes.pkl', 'results.pkl.tmp']
+    assert clear_cache() == 0
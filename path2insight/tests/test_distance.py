@@ -0,0 +1,251 @@
+import pickle
+import random
+import sys
+
+import pytest
+
+# seperated imports to prevent merge conflicts
+from path2insight.algorithms.stringdist import levenshtein_matrix
+from path2insight.algorithms.stringdist import near_duplicate_pairs
+from path2insight import BKTree
+import path2insight
+
+numpy = pytest.importorskip('numpy')
+
+
+def _levenshtein(s1, s2):
+
+    previous = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1, 1):
+        current = [i]
+        for j, c2 in enumerate(s2, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (c1 != c2)))
+        previous = current
+
+    return previous[-1]
+
+
+def _random_strings(n, min_length, max_length, seed):
+
+    rand = random.Random(seed)
+
+    return [''.join(rand.choice('abcé_1') for _ in
+                    range(rand.randint(min_length, max_length)))
+            for _ in range(n)]
+
+
+# short strings, strings longer than 64 characters, duplicates and empty
+# strings
+STRINGS = _random_strings(60, 0, 12, 1) + _random_strings(6, 60, 90, 2) + \
+    ['', 'abc', 'abc', '']
+
+
+@pytest.mark.parametrize("list1,list2", [
+    (STRINGS, None),
+    (STRINGS, _random_strings(20, 0, 80, 3)),
+    (_random_strings(20, 0, 80, 3), STRINGS),
+    ([], None),
+    (['a'], []),
+])
+@pytest.mark.parametrize("block_size", [7, 128])
+def test_levenshtein_matrix(list1, list2, block_size):
+
+    columns = list1 if list2 is None else list2
+    expected = numpy.array(
+        [[_levenshtein(s1, s2) for s2 in columns] for s1 in list1],
+        dtype='int32').reshape(len(list1), len(columns))
+
+    result = levenshtein_matrix(list1, list2, block_size=block_size)
+    assert result.dtype == numpy.int32
+    assert (result == expected).all()
+
+    longest = numpy.array(
+        [[max(len(s1), len(s2)) for s2 in columns] for s1 in list1]
+    ).reshape(expected.shape)
+    result = levenshtein_matrix(list1, list2, normalise=True,
+                                block_size=block_size)
+    assert numpy.allclose(
+        result, expected / numpy.where(longest > 0, longest, 1))
+
+
+def test_levenshtein_matrix_out(tmpdir):
+
+    fn = str(tmpdir.join('distances.npy'))
+
+    result = levenshtein_matrix(STRINGS, out=fn)
+    assert isinstance(result, numpy.memmap)
+    assert (numpy.load(fn, mmap_mode='r') == levenshtein_matrix(STRINGS)).all()
+
+    out = numpy.zeros((len(STRINGS), len(STRINGS)), dtype='int32')
+    assert levenshtein_matrix(STRINGS, out=out) is out
+
+    with pytest.raises(ValueError):
+        levenshtein_matrix(STRINGS, out=numpy.zeros((2, 2)))
+
+
+def test_levenshtein_distance_stem():
+
+    paths = path2insight.parse(['data/file1.txt', 'data/file2.txt',
+                                'docs/README', 'file1.csv'],
+                               os_name='posix')
+    stems = [fp.stem for fp in paths]
+
+    result = path2insight.levenshtein_distance_stem(paths)
+    assert result.tolist() == [[_levenshtein(s1, s2) for s2 in stems]
+                               for s1 in stems]
+
+    result = path2insight.levenshtein_distance_stem(paths[0], paths)
+    assert result.tolist() == [_levenshtein(stems[0], s) for s in stems]
+
+
+@pytest.mark.parametrize("list2", [None, _random_strings(20, 0, 80, 3)])
+def test_levenshtein_matrix_parallel(monkeypatch, list2):
+
+    monkeypatch.setattr(
+        sys.modules['path2insight.algorithms.stringdist'],
+        'PARALLEL_MIN_SIZE', 0)
+
+    expected = levenshtein_matrix(STRINGS, list2, block_size=8)
+
+    result = levenshtein_matrix(STRINGS, list2, block_size=8, n_jobs=2)
+    assert (result == expected).all()
+
+    result = levenshtein_matrix(list2 or STRINGS, STRINGS, block_size=8,
+                                n_jobs=3)
+    assert (result == levenshtein_matrix(list2 or STRINGS, STRINGS)).all()
+
+    with pytest.raises(ValueError):
+        levenshtein_matrix(STRINGS, n_jobs=0)
+
+
+@pytest.mark.parametrize("max_distance", [0, 1, 2, 3])
+@pytest.mark.parametrize("q", [1, 2, 3])
+def test_near_duplicate_pairs(max_distance, q):
+
+    base = _random_strings(1, 70, 70, 4)[0]
+    strings = list(set(STRINGS + _random_strings(200, 0, 10, 5) + [
+        base, base[:30] + base[31:], base + 'x', base[:10] + 'xy' + base[10:]
+    ]))
+
+    expected = set()
+    for i, s1 in enumerate(strings):
+        for j in range(i + 1, len(strings)):
+            d = _levenshtein(s1, strings[j])
+            if d <= max_distance:
+                expected.add((i, j, d))
+
+    result = near_duplicate_pairs(strings, max_distance, q=q, batch_size=50)
+    assert len(result) == len(expected)
+    assert set(result) == expected
+
+
+def test_near_duplicates():
+
+    paths = path2insight.parse(
+        ['data/F01_run1.raw', 'data/F01_run2.raw', 'data/F02_RUN1.txt',
+         'docs/F01_run1.mzML', 'docs/README', 'docs/readme.txt'],
+        os_name='posix')
+
+    assert path2insight.near_duplicates(paths) == \
+        [('F01_run1', 'F01_run2', 1)]
+    assert path2insight.near_duplicates(paths, max_distance=4) == \
+        [('F01_run1', 'F01_run2', 1), ('F01_run1', 'F02_RUN1', 4)]
+    assert path2insight.near_duplicates(paths, lower=True) == \
+        [('f01_run1', 'f01_run2', 1), ('f01_run1', 'f02_run1', 1)]
+    assert path2insight.near_duplicates(
+        path2insight.PathFrame.from_paths(paths), lower=True) == \
+        path2insight.near_duplicates(paths, lower=True)
+
+    with pytest.raises(ValueError):
+        path2insight.near_duplicates(paths, max_distance=-1)
+
+
+@pytest.mark.parametrize("radius", [0, 1, 2, 5])
+def test_bktree_within(radius):
+
+    values = sorted(set(STRINGS))
+    tree = BKTree(values)
+    assert len(tree) == len(values)
+
+    for query in _random_strings(20, 0, 12, 6) + values[:5] + [values[-1]]:
+        expected = sorted([(v, _levenshtein(query, v)) for v in values
+                           if _levenshtein(query, v) <= radius],
+                          key=lambda pair: (pair[1], pair[0]))
+        assert tree.within(query, radius) == expected
+
+
+@pytest.mark.parametrize("k", [1, 3, 100])
+def test_bktree_nearest(k):
+
+    values = STRINGS + _random_strings(100, 0, 10, 7)
+    tree = pickle.loads(pickle.dumps(BKTree(values)))
+    assert len(tree) == len(set(values))
+
+    for query in _random_strings(20, 0, 12, 8) + ['abc']:
+        expected = sorted([(v, _levenshtein(query, v)) for v in set(values)],
+                          key=lambda pair: (pair[1], pair[0]))
+        assert tree.nearest(query, k) == expected[:k]
+
+    with pytest.raises(ValueError):
+        tree.nearest('abc', 0)
+
+
+def test_bktree_from_paths():
+
+    paths = path2insight.parse(
+        ['data/F01_run1.raw', 'data/F01_run2.raw', 'data/F02_RUN1.txt',
+         'docs/F01_run1.mzML', 'docs/README', 'docs/readme.txt'],
+        os_name='posix')
+
+    tree = BKTree.from_paths(paths)
+    assert sorted(tree) == ['F01_run1', 'F01_run2', 'F02_RUN1', 'README',
+                            'readme']
+    assert tree.nearest('F01_run3', 2) == [('F01_run1', 1), ('F01_run2', 1)]
+    assert 'README' in tree and 'Readme' not in tree
+
+    tree = BKTree.from_paths(path2insight.PathFrame.from_paths(paths),
+                             lower=True)
+    assert tree.within('f02_run2', 1) == [('f01_run2', 1), ('f02_run1', 1)]
+
+    # the Levenshtein distance on the tokens of the stems
+    tree = BKTree.from_paths(paths, key='tokens', lower=True)
+    assert ('f01', 'run1') in tree
+    assert tree.within(['f03', 'run1'], 1) == [(('f01', 'run1'), 1),
+                                               (('f02', 'run1'), 1)]
+
+    assert len(BKTree.from_paths([])) == 0
+    assert BKTree().nearest('abc') == []
+
+    with pytest.raises(ValueError):
+        BKTree.from_paths(paths, key='suffix')
+
+
+@pytest.mark.parametrize("top_k,radius", [(1, None), (3, None), (None, 1),
+                                          (2, 1), (100, None)])
+def test_distance_on_depth_sparse(top_k, radius):
+
+    pytest.importorskip('sklearn')
+
+    paths = path2insight.parse(
+        ['a', 'a/b', 'a/b/c', 'a/b/d', 'a/b/c/d/e', 'b/c', 'f'],
+        os_name='posix')
+
+    dense = path2insight.distance_on_depth(paths, metric='l1')
+    result = path2insight.distance_on_depth(paths, metric='l1', top_k=top_k,
+                                            radius=radius, working_memory=0)
+    assert result.shape == dense.shape
+
+    for i, row in enumerate(dense):
+        neighbours = sorted([(d, j) for j, d in enumerate(row) if j != i and
+                             (radius is None or d <= radius)])
+        start, end = result.indptr[i], result.indptr[i + 1]
+        assert result.data[start:end].tolist() == \
+            [d for d, _ in neighbours[:top_k]]
+        assert (dense[i, result.indices[start:end]] ==
+                result.data[start:end]).all()
+
+    result = path2insight.distance_on_depth(paths, paths[:2], metric='l1',
+                                            top_k=1)
+    assert result.shape == (7, 2)
+    assert result.data.tolist() == dense[:, :2].min(axis=1).tolist()
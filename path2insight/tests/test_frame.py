@@ -0,0 +1,163 @@
+import pytest
+
+# seperated imports to prevent merge conflicts
+from path2insight import WindowsFilePath, PosixFilePath, PathFrame
+from path2insight.tests import TEST_PATHS_POSIX
+from path2insight.tests import TEST_PATHS_WINDOWS
+from path2insight.tests import TEST_PATHS_MULTI_WINDOWS
+from path2insight.explore import TypeTagger, TokenTypeTagger, DocumentTagger
+import path2insight
+
+TEST_PATHS_MIXED = [
+    'C:/Program Files/unittest/DOCS_11Mar2020-Armel final.pdf',
+    'C:/Program Files/unittest/docs.tar.gz',
+    'D:/data/armel/README',
+    'D:/data/armel/',
+    'D:/data/armel/.gitignore',
+    'data/file.txt',
+    'C:/',
+]
+
+
+@pytest.mark.parametrize("data,os_name", [
+    (TEST_PATHS_WINDOWS, 'windows'),
+    (TEST_PATHS_MULTI_WINDOWS, 'windows'),
+    (TEST_PATHS_MIXED, 'windows'),
+    (TEST_PATHS_POSIX, 'posix'),
+])
+def test_parse_columnar(data, os_name):
+
+    frame = path2insight.parse(data, os_name=os_name, columnar=True)
+    expected = path2insight.parse(data, os_name=os_name)
+
+    assert isinstance(frame, PathFrame)
+    assert len(frame) == len(expected)
+    assert frame.to_list() == expected
+    assert [fp.parts for fp in frame] == [fp.parts for fp in expected]
+    assert frame[-1] == expected[-1]
+    assert frame[1:3].to_list() == expected[1:3]
+
+
+def test_from_paths():
+
+    paths = path2insight.parse(TEST_PATHS_MIXED, os_name='windows')
+    frame = PathFrame.from_paths(paths)
+
+    assert frame.path_type is WindowsFilePath
+    assert frame.to_list() == paths
+
+    with pytest.raises(TypeError):
+        PathFrame.from_paths(paths + [PosixFilePath('/data/file.txt')])
+
+
+@pytest.mark.parametrize("lower", [False, True])
+def test_counts(lower):
+
+    paths = path2insight.parse(TEST_PATHS_MIXED, os_name='windows')
+    frame = path2insight.parse(TEST_PATHS_MIXED, os_name='windows',
+                               columnar=True)
+
+    for func in [path2insight.extension_counts,
+                 path2insight.name_counts,
+                 path2insight.stem_counts,
+                 path2insight.drive_counts]:
+        assert func(frame, lower=lower) == func(paths, lower=lower)
+
+    assert path2insight.depth_counts(frame) == \
+        path2insight.depth_counts(paths)
+    assert path2insight.depth_counts(frame, center='mean') == \
+        path2insight.depth_counts(paths, center='mean')
+    assert path2insight.n_extension_counts(frame) == \
+        path2insight.n_extension_counts(paths)
+
+
+@pytest.mark.parametrize("parents,stem,extension", [
+    (False, True, False),
+    (True, True, True),
+    (False, True, True),
+])
+def test_token_counts(parents, stem, extension):
+
+    paths = path2insight.parse(TEST_PATHS_MIXED[:-1], os_name='windows')
+    frame = PathFrame.from_paths(paths)
+
+    for lower in [False, True]:
+        kwargs = dict(lower=lower, parents=parents, stem=stem,
+                      extension=extension)
+        assert path2insight.token_counts(frame, **kwargs) == \
+            path2insight.token_counts(paths, **kwargs)
+
+
+def test_select():
+
+    paths = path2insight.parse(TEST_PATHS_MIXED, os_name='windows')
+    frame = PathFrame.from_paths(paths)
+
+    result = path2insight.select(frame, level1='data')
+    assert isinstance(result, PathFrame)
+    assert result.to_list() == path2insight.select(paths, level1='data')
+
+    result = path2insight.select(frame, level3='*')
+    assert result.to_list() == path2insight.select(paths, level3='*')
+
+    result = path2insight.select(frame, level1=['data', 'Program Files'],
+                                 level2='unittest')
+    assert result.to_list() == path2insight.select(
+        paths, level1=['data', 'Program Files'], level2='unittest')
+
+    result = path2insight.select_re(frame, level3=r"^\.")
+    assert result.to_list() == path2insight.select_re(paths, level3=r"^\.")
+
+    result = path2insight.select(frame, level1='unknown')
+    assert len(result) == 0
+
+
+def test_taggers():
+
+    paths = path2insight.parse(TEST_PATHS_MIXED, os_name='windows')
+    frame = PathFrame.from_paths(paths)
+
+    for tagger in [TypeTagger(), TokenTypeTagger(), DocumentTagger()]:
+        assert tagger.tag(frame) == tagger.tag(paths)
+
+
+def test_memory_usage():
+
+    data = ['/pride/data/archive/2015/12/PXD{:06d}/file{}.raw'.format(
+        i // 10, i) for i in range(1000)]
+    frame = path2insight.parse(data, os_name='posix', columnar=True)
+
+    assert 0 < frame.memory_usage()
+    # folder names are stored once
+    assert len(frame.strings) < 3 * len(data)
+
+
+def test_concat():
+
+    paths = path2insight.parse(TEST_PATHS_MIXED, os_name='windows')
+    frames = [PathFrame.from_paths(paths[:3]), PathFrame.from_paths(paths[3:])]
+
+    frame = PathFrame.concat(frames)
+    assert frame.to_list() == paths
+    assert frame.counts('suffix') == PathFrame.from_paths(paths).counts(
+        'suffix')
+
+    with pytest.raises(TypeError):
+        PathFrame.concat(
+            frames + [PathFrame.from_paths([PosixFilePath('/a/b.txt')])])
+
+
+@pytest.mark.parametrize("level", [None, [2], [3, 1], [-1], [4, 1]])
+@pytest.mark.parametrize("reverse", [False, True])
+def test_argsort(level, reverse):
+
+    paths = path2insight.parse(TEST_PATHS_MIXED * 2, os_name='windows')
+    frame = PathFrame.from_paths(paths)
+
+    expected = path2insight.sort(paths, level=level, reverse=reverse)
+    order = frame.argsort(level, reverse)
+
+    assert [paths[i] for i in order] == expected
+    # the implementation without numpy
+    ranks = frame._string_ranks(casefold=level is None)
+    assert frame._argsort_keys(ranks, level, reverse) == order
@@ -1,3 +1,7 @@
+import re
+
+import pytest
+
 # seperated imports to prevent merge conflicts
 from path2insight import WindowsFilePath
 import path2insight
@@ -54,3 +58,304 @@ def test_select_re():
                 WindowsFilePath("F:/docs/file.xlsx")]
 
     assert result == expected
+
+
+def test_select_multi_level():
+
+    data = path2insight.parse([
+        'F:/data/2015/file.txt',
+        'F:/data/2016/file.raw',
+        'F:/docs/2015/report.pdf',
+        'F:/test/2015',
+        'F:/data',
+    ], os_name='windows')
+
+    result = path2insight.select(data, level1=['data', 'docs'],
+                                 level2=['2015', '2016'], level3='*')
+    assert result == data[:3]
+
+    result = path2insight.select(data, level1='data', level2='2016')
+    assert result == [data[1]]
+
+    assert path2insight.select(data, level0='F:\\') == data
+    assert path2insight.select(data, level4='*') == []
+
+    # an empty list of values matches nothing
+    assert path2insight.select(data, level1=[]) == []
+    assert path2insight.select_re(data, level1=[]) == []
+
+    # only the exact keywords level<n> are valid
+    for kwargs in [{'level1x': 'data'}, {'levelx': 'data'},
+                   {'level': 'data'}]:
+        with pytest.raises(TypeError):
+            path2insight.select(data, **kwargs)
+        with pytest.raises(TypeError):
+            path2insight.select_re(data, **kwargs)
+        with pytest.raises(TypeError):
+            path2insight.PathTrie(data).select(**kwargs)
+        with pytest.raises(TypeError):
+            path2insight.query(data).select(**kwargs)
+
+
+@pytest.mark.parametrize("pattern,expected", [
+    ([r"^d", r"^t"], [0, 1, 2, 3, 4]),
+    ([r"(d)at\1", r"te"], [3]),
+    ([r"(?i)DATA", r"docs"], [0, 1, 2, 4]),
+    ([r"(?P<x>d)ata", r"(?P<x>d)ocs"], [0, 1, 2, 4]),
+    ([re.compile("DATA", re.I), re.compile("DOCS", re.I)], [0, 1, 2, 4]),
+    ([re.compile("DATA", re.I), "docs"], [0, 1, 2, 4]),
+    ([re.compile("DATA"), "docs"], [2]),
+    ([], []),
+])
+def test_select_re_multi_pattern(pattern, expected):
+
+    data = path2insight.parse([
+        'F:/data/2015/file.txt',
+        'F:/data/2016/file.raw',
+        'F:/docs/2015/report.pdf',
+        'F:/test/2015',
+        'F:/data',
+    ], os_name='windows')
+
+    result = path2insight.select_re(data, level1=pattern)
+    assert result == [data[i] for i in expected]
+
+
+def test_query():
+
+    data = path2insight.parse([
+        'F:/data/2015/raw_b/file.raw',
+        'F:/data/2016/raw_a/file.raw',
+        'F:/data/2016/txt/file.txt',
+        'F:/docs/2015/raw_c/report.pdf',
+        'F:/data/2014/raw_c/file.raw',
+        'F:/data',
+    ], os_name='windows')
+
+    q = path2insight.query(data).select(level1='data')
+    assert isinstance(q, path2insight.Query)
+    assert q.to_list() == path2insight.select(data, level1='data')
+
+    q = q.select_re(level3=r'^raw').sort(level=2)
+    expected = path2insight.sort(
+        path2insight.select_re(
+            path2insight.select(data, level1='data'), level3=r'^raw'),
+        level=2)
+    assert q.to_list() == expected
+    assert list(q) == expected
+    assert q.head(2).to_list() == expected[:2]
+    assert q.head(2).head(5).to_list() == expected[:2]
+    assert path2insight.query(data).sort(reverse=True).head(3).to_list() \
+        == path2insight.sort(data, reverse=True)[:3]
+
+    # selections after a sort are applied before the sort
+    assert path2insight.query(data).sort(level=3).select(level2='2016') \
+        .to_list() == path2insight.sort(
+            path2insight.select(data, level2='2016'), level=3)
+
+    result = q.sample().head(2).to_list()
+    assert len(result) == 2
+    assert set(result) <= set(expected)
+    assert len(path2insight.query(data).sample(2).head(5).to_list()) == 2
+    assert len(path2insight.query(data).sample().head(100).to_list()) == 6
+
+    with pytest.raises(ValueError):
+        path2insight.query(data).sample(10).head(1).to_list()
+
+    # a head after a sample takes a smaller sample
+    assert path2insight.query(iter(data)).sample(5, seed=2).head(3) \
+        .to_list() == path2insight.sample(iter(data), 3, seed=2)
+    assert path2insight.query(iter(data)).sample(2, seed=2).head(3) \
+        .to_list() == path2insight.sample(iter(data), 2, seed=2)
+
+    assert path2insight.query(data).sample(3, seed=1).to_list() == \
+        path2insight.query(iter(data)).sample(3, seed=1).to_list()
+
+
+def test_query_lazy():
+
+    data = path2insight.parse(['F:/data/file{}.txt'.format(i)
+                               for i in range(10)], os_name='windows')
+    consumed = []
+
+    def paths():
+        for fp in data:
+            consumed.append(fp)
+            yield fp
+
+    q = path2insight.query(paths()).select(level1='data').head(3)
+    assert consumed == []
+    assert q.to_list() == data[:3]
+    assert len(consumed) == 3
+
+
+@pytest.mark.parametrize("n", [0, 1, 5, 100])
+def test_sample(n):
+
+    data = path2insight.parse(['F:/data/file{}.txt'.format(i)
+                               for i in range(100)], os_name='windows')
+
+    result = path2insight.sample(data, n, seed=1)
+    assert len(result) == n
+    assert len(set(result)) == n
+    assert result == path2insight.sample(data, n, seed=1)
+
+    # generators are sampled with a reservoir
+    result = path2insight.sample(iter(data), n, seed=1)
+    assert len(result) == n
+    assert len(set(result)) == n
+    assert set(result) <= set(data)
+    assert result == path2insight.sample(iter(data), n, seed=1)
+
+    with pytest.raises(ValueError):
+        path2insight.sample(iter(data), 101)
+    with pytest.raises(ValueError):
+        path2insight.sample(data, 101)
+
+
+def test_sample_shuffle():
+
+    data = path2insight.parse(['F:/data/file{}.txt'.format(i)
+                               for i in range(20)], os_name='windows')
+    data_copy = list(data)
+
+    result = path2insight.sample(data, seed=3)
+    assert sorted(result) == sorted(data)
+    assert data == data_copy
+    assert sorted(path2insight.sample(iter(data))) == sorted(data)
+
+
+def test_sample_uniform():
+
+    # each item has the same probability to be in a reservoir sample
+    counts = [0] * 20
+    for seed in range(2000):
+        for i in path2insight.sample(iter(range(20)), 5, seed=seed):
+            counts[i] += 1
+
+    assert min(counts) > 2000 * 5 / 20 * 0.8
+    assert max(counts) < 2000 * 5 / 20 * 1.2
+
+
+@pytest.mark.parametrize("stratify", ['extension', 1, 'level1'])
+def test_sample_stratify(stratify):
+
+    data = path2insight.parse(
+        ['F:/data/file{}.txt'.format(i) for i in range(60)] +
+        ['F:/docs/file{}.PDF'.format(i) for i in range(30)] +
+        ['F:/docs/file{}.pdf'.format(i) for i in range(10)],
+        os_name='windows')
+
+    result = path2insight.sample(iter(data), 10, seed=1, stratify=stratify)
+
+    assert len(result) == 10
+    assert len(set(result)) == 10
+    assert sum([fp.parts[1] == 'data' for fp in result]) == 6
+
+    result = path2insight.sample(data, 3, seed=1,
+                                 stratify=lambda fp: fp.suffix)
+    assert sorted([fp.suffix for fp in result]) == ['.PDF', '.txt', '.txt']
+
+    with pytest.raises(ValueError):
+        path2insight.sample(data, 101, stratify=stratify)
+
+    # a stratified sample needs n
+    with pytest.raises(ValueError):
+        path2insight.sample(data, stratify=stratify)
+    with pytest.raises(ValueError):
+        path2insight.query(data).sample(stratify=stratify)
+
+    # a PathFrame keeps its path type, also for an empty sample
+    frame = path2insight.PathFrame.from_paths(data)
+    for n in [0, 10]:
+        result = path2insight.sample(frame, n, seed=1, stratify=stratify)
+        assert isinstance(result, path2insight.PathFrame)
+        assert result.path_type is path2insight.WindowsFilePath
+        assert len(result) == n
+    assert result.to_list() == path2insight.sample(data, 10, seed=1,
+                                                   stratify=stratify)
+
+
+SORT_PATHS = [
+    'F:/data/2016/raw_a/file.raw',
+    'F:/Data/2015/raw_b/file.raw',
+    'F:/data/2016/txt/file.txt',
+    'F:/docs/2015/raw_c/report.pdf',
+    'E:/data/2014/raw_c/file.raw',
+    'F:/data',
+    'F:/data/2016/txt/file.txt',
+    'F:/',
+]
+
+
+def _sort_previous(paths, level=None, reverse=False):
+
+    def key(x):
+        a = []
+        for k in level:
+            try:
+                a.append(x.parts[k])
+            except IndexError:
+                pass
+        return a
+
+    return sorted(paths, key=key if level else None, reverse=reverse)
+
+
+@pytest.mark.parametrize("level", [None, [1], [3, 2], [-1], [4, 1]])
+@pytest.mark.parametrize("reverse", [False, True])
+def test_sort(level, reverse):
+
+    data = path2insight.parse(SORT_PATHS, os_name='windows')
+    frame = path2insight.parse(SORT_PATHS, os_name='windows', columnar=True)
+    expected = _sort_previous(data, level, reverse)
+
+    assert path2insight.sort(data, level=level, reverse=reverse) == expected
+    assert path2insight.sort(iter(data), level=level, reverse=reverse) == \
+        expected
+    assert path2insight.sort(frame, level=level, reverse=reverse) \
+        .to_list() == expected
+
+
+def test_sort_mixed_compact():
+
+    full = path2insight.parse(SORT_PATHS, os_name='windows')
+    compact = [path2insight.CompactWindowsFilePath(str(fp)) for fp in full]
+    mixed = [c if i % 2 else fp
+             for i, (fp, c) in enumerate(zip(full, compact))]
+
+    result = path2insight.sort(mixed)
+    assert [str(fp) for fp in result] == \
+        [str(fp) for fp in path2insight.sort(full)]
+
+
+def test_sort_mixed_flavour():
+
+    data = path2insight.parse(SORT_PATHS, os_name='windows') + \
+        path2insight.parse(['/data/a.txt'], os_name='posix')
+
+    with pytest.raises(TypeError):
+        path2insight.sort(data)
+
+
+@pytest.mark.parametrize("buffer_size", [1, 3, 8, 100])
+@pytest.mark.parametrize("level", [None, [3, 2]])
+def test_isort(tmp_path, buffer_size, level):
+
+    data = path2insight.parse(SORT_PATHS * 3, os_name='windows')
+
+    result = path2insight.isort(iter(data), level=level,
+                                buffer_size=buffer_size, tmp_dir=str(tmp_path))
+    assert list(result) == path2insight.sort(data, level=level)
+    assert list(tmp_path.iterdir()) == []
+
+    result = path2insight.isort(data, level=level, reverse=True,
+                                buffer_size=buffer_size, tmp_dir=str(tmp_path))
+    assert list(result) == path2insight.sort(data, level=level, reverse=True)
+
+    # stop early, the sorted runs are removed
+    result = path2insight.isort(data, level=level, buffer_size=buffer_size,
+                                tmp_dir=str(tmp_path))
+    next(result)
+    result.close()
+    assert list(tmp_path.iterdir()) == []
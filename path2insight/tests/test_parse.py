@@ -1,3 +1,5 @@
+import sys
+
 import pandas as pd
 import numpy as np
 
@@ -5,6 +7,7 @@ import pytest
 
 # seperated imports to prevent merge conflicts
 from path2insight import WindowsFilePath, PosixFilePath
+from path2insight import CompactWindowsFilePath, CompactPosixFilePath
 from path2insight.tests import TEST_PATHS_POSIX
 from path2insight.tests import TEST_PATHS_WINDOWS
 from path2insight.tests import TEST_PATHS_MULTI_WINDOWS
@@ -139,3 +142,128 @@ def test_from_list_posix(data):
 
     # each element in the list is a PosixFilePath
     assert all([isinstance(fp, PosixFilePath) for fp in result])
+
+
+TEST_PATHS_EDGE_CASES = [
+    '', '.', '..', '/', '//', '///', 'C:', 'C:/', 'C:a/b.txt', 'a/./b/.',
+    'a//b//c.tar.gz', 'a/b/', '//server/share/file.txt', '//server/share',
+    '\\\\server\\share\\dir\\file.txt', 'C:\\dir/sub\\name.', 'a/..',
+    'dir/.hidden', '/dir/a.b.c', 'x:/y:z', 'dir\\sub/file'
+]
+
+
+@pytest.mark.parametrize("path_type", [WindowsFilePath, PosixFilePath])
+def test_parse_edge_cases(path_type):
+
+    os_name = 'windows' if path_type is WindowsFilePath else 'posix'
+    expected = [path_type(fp) for fp in TEST_PATHS_EDGE_CASES]
+
+    for data in [TEST_PATHS_EDGE_CASES,
+                 np.array(TEST_PATHS_EDGE_CASES),
+                 pd.Series(TEST_PATHS_EDGE_CASES)]:
+        result = path2insight.parse(data, os_name=os_name)
+        assert [fp.parts for fp in result] == [fp.parts for fp in expected]
+        assert [fp.args for fp in result] == TEST_PATHS_EDGE_CASES
+
+        frame = path2insight.parse(data, os_name=os_name, columnar=True)
+        assert [fp.parts for fp in frame] == [fp.parts for fp in expected]
+        assert frame.column('name') == [fp.name for fp in expected]
+        assert frame.column('suffix') == [fp.suffix for fp in expected]
+        assert list(frame.depths()) == [fp.depth for fp in expected]
+
+
+@pytest.mark.parametrize("path_type", [WindowsFilePath, PosixFilePath])
+def test_parse_n_jobs(path_type, monkeypatch):
+
+    # parse the small test data in the process pool as well
+    monkeypatch.setattr(
+        sys.modules['path2insight.parse'], 'PARALLEL_MIN_SIZE', 0)
+
+    os_name = 'windows' if path_type is WindowsFilePath else 'posix'
+    data = TEST_PATHS_EDGE_CASES * 5
+    expected = path2insight.parse(data, os_name=os_name)
+
+    result = path2insight.parse(data, os_name=os_name, n_jobs=2)
+    assert result == expected
+    assert [fp.args for fp in result] == data
+
+    frame = path2insight.parse(data, os_name=os_name, columnar=True,
+                               n_jobs=2)
+    assert frame.to_list() == expected
+
+    with pytest.raises(ValueError):
+        path2insight.parse(data, os_name=os_name, n_jobs=0)
+
+
+@pytest.mark.parametrize("os_name,compact_type", [
+    ('windows', CompactWindowsFilePath),
+    ('posix', CompactPosixFilePath),
+])
+def test_parse_compact(os_name, compact_type):
+
+    expected = path2insight.parse(TEST_PATHS_EDGE_CASES, os_name=os_name)
+
+    for data in [TEST_PATHS_EDGE_CASES,
+                 np.array(TEST_PATHS_EDGE_CASES),
+                 pd.Series(TEST_PATHS_EDGE_CASES)]:
+        result = path2insight.parse(data, os_name=os_name, compact=True)
+        assert all([type(fp) is compact_type for fp in result])
+        assert [fp.to_path() for fp in result] == expected
+
+        frame = path2insight.parse(data, os_name=os_name, compact=True,
+                                   columnar=True)
+        assert frame.path_type is compact_type
+        assert frame.to_list() == result
+
+    # paths in the same directory share the parent parts
+    result = path2insight.parse(['data/a.txt', 'data/b.txt'],
+                                os_name=os_name, compact=True)
+    assert result[0]._head is result[1]._head
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_parse_pool(compact):
+
+    data = ['/data/run{}/sample{}/reads.fastq'.format(i % 3, i)
+            for i in range(20)]
+    data_copy = [''.join(list(x)) for x in data]
+
+    pool = path2insight.InternPool()
+    result = path2insight.parse(data, os_name='posix', compact=compact,
+                                pool=pool)
+    result_copy = path2insight.parse(data_copy, os_name='posix',
+                                     compact=compact, pool=pool)
+
+    assert result == path2insight.parse(data, os_name='posix',
+                                        compact=compact)
+    assert result_copy == result
+    # equal names are the same object
+    assert result_copy[0].name is result[0].name
+    assert result_copy[0].parts[1] is result[5].parts[1]
+    assert pool.hits > 0
+    assert 'reads.fastq' in pool
+
+
+def test_intern_pool():
+
+    pool = path2insight.InternPool(maxsize=2)
+    a = ''.join(['fi', 'le'])
+    b = ''.join(['fi', 'le'])
+
+    assert pool.intern(a) is a
+    assert pool.intern(b) is a
+    assert pool.intern('x') == 'x'
+    assert pool.intern('y') == 'y'
+    assert len(pool) == 2
+    assert 'y' not in pool
+
+    stats = pool.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 3
+    assert stats['hit_rate'] == 0.25
+    assert stats['bytes_saved'] == sys.getsizeof(b)
+    assert stats['memory_usage'] > 0
+
+    pool.clear()
+    assert len(pool) == 0
+    assert pool.hits == 0
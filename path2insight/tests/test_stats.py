@@ -0,0 +1,250 @@
+import pickle
+import sys
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# seperated imports to prevent merge conflicts
+from path2insight import PathFrame, HeavyHitters, HyperLogLog
+from path2insight.tests import TEST_PATHS_POSIX
+from path2insight.tests import TEST_PATHS_WINDOWS
+import path2insight
+
+TEST_PATHS_PROFILE = TEST_PATHS_WINDOWS + [
+    'C:/Program Files/unittest/docs.tar.gz',
+    'D:/data/armel/.gitignore',
+    'D:/data/armel/README.',
+    'd:/DATA/ARMEL/readme.TXT',
+    'data/file.txt',
+    'C:/',
+]
+
+
+def _expected(paths, lower):
+
+    return {
+        'depth': path2insight.depth_counts(paths),
+        'extension': path2insight.extension_counts(paths, lower=lower),
+        'n_extension': path2insight.n_extension_counts(paths),
+        'name': path2insight.name_counts(paths, lower=lower),
+        'stem': path2insight.stem_counts(paths, lower=lower),
+        'drive': path2insight.drive_counts(paths, lower=lower),
+        'token': path2insight.token_counts(paths, lower=lower),
+    }
+
+
+@pytest.mark.parametrize("lower", [False, True])
+@pytest.mark.parametrize("columnar", [False, True])
+def test_profile(lower, columnar):
+
+    paths = path2insight.parse(TEST_PATHS_PROFILE, os_name='windows')
+    data = PathFrame.from_paths(paths) if columnar else paths
+
+    result = path2insight.profile(data, lower=lower)
+    assert result == _expected(paths, lower)
+
+    result = path2insight.profile(data, stats=['stem', 'depth'], lower=lower)
+    assert list(result) == ['stem', 'depth']
+    assert result['depth'] == path2insight.depth_counts(paths)
+
+
+def test_profile_generator():
+
+    paths = path2insight.parse(TEST_PATHS_POSIX, os_name='posix')
+
+    assert path2insight.profile(iter(paths)) == _expected(paths, False)
+
+    result = path2insight.profile(iter(paths), normalize=True)
+    assert result['extension'] == path2insight.extension_counts(
+        paths, normalize=True)
+    for c in result.values():
+        assert sum(c.values()) == pytest.approx(1.0)
+
+
+def test_profile_tokens():
+
+    paths = path2insight.parse(TEST_PATHS_PROFILE, os_name='windows')
+
+    kwargs = dict(parents=True, stem=True, extension=True)
+    result = path2insight.profile(paths, stats=['token'], **kwargs)
+    assert result['token'] == path2insight.token_counts(paths, **kwargs)
+
+    with pytest.raises(NotImplementedError):
+        path2insight.profile(paths, stats=['token'], stem=False)
+    with pytest.raises(ValueError):
+        path2insight.profile(paths, stats=['size'])
+
+
+def test_merge_counts():
+
+    paths = path2insight.parse(TEST_PATHS_PROFILE, os_name='windows')
+    chunks = [paths[:3], paths[3:7], paths[7:]]
+
+    assert path2insight.merge_counts(
+        [path2insight.extension_counts(chunk) for chunk in chunks]) == \
+        path2insight.extension_counts(paths)
+    assert path2insight.merge_counts(
+        (path2insight.profile(chunk) for chunk in chunks)) == \
+        path2insight.profile(paths)
+    assert path2insight.merge_counts(
+        [path2insight.name_counts(chunk) for chunk in chunks],
+        normalize=True) == path2insight.name_counts(paths, normalize=True)
+    assert path2insight.merge_counts([]) == {}
+
+
+@pytest.mark.parametrize("func,kwargs", [
+    (path2insight.extension_counts, {'lower': True}),
+    (path2insight.name_counts, {}),
+    (path2insight.stem_counts, {}),
+    (path2insight.drive_counts, {}),
+    (path2insight.depth_counts, {}),
+    (path2insight.n_extension_counts, {}),
+    (path2insight.token_counts, {'lower': True}),
+    (path2insight.profile, {'lower': True}),
+])
+def test_counts_parallel(monkeypatch, func, kwargs):
+
+    monkeypatch.setattr(
+        sys.modules['path2insight.explore.stats'], 'PARALLEL_MIN_SIZE', 0)
+
+    paths = path2insight.parse(TEST_PATHS_PROFILE, os_name='windows')
+    expected = func(paths, **kwargs)
+
+    assert func(paths, n_jobs=2, **kwargs) == expected
+    assert func(iter(paths), n_jobs=2, **kwargs) == expected
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert func(paths, executor=executor, **kwargs) == expected
+
+
+def test_token_counts_parallel_tokenizer(monkeypatch):
+
+    monkeypatch.setattr(
+        sys.modules['path2insight.explore.stats'], 'PARALLEL_MIN_SIZE', 0)
+
+    paths = path2insight.parse(TEST_PATHS_PROFILE, os_name='windows')
+
+    # the (unused) tokenizer is not sent to the worker processes
+    assert path2insight.token_counts(
+        paths, tokenizer=lambda s: s.split('_'), n_jobs=2) == \
+        path2insight.token_counts(paths)
+
+
+def test_counts_parallel_invalid():
+
+    paths = path2insight.parse(TEST_PATHS_PROFILE, os_name='windows')
+
+    with pytest.raises(ValueError):
+        path2insight.extension_counts(paths, n_jobs=0)
+
+
+@pytest.mark.parametrize("capacity", [1, 3, 1000])
+def test_heavy_hitters(capacity):
+
+    items = [str(i % 7) * (i % 3) for i in range(100)] + ['a'] * 40
+    exact = Counter(items)
+
+    c = HeavyHitters(iter(items), capacity=capacity)
+    assert len(c) <= capacity
+    assert c.n == len(items)
+    assert c.error <= len(items) // (capacity + 1)
+    for key, n in exact.items():
+        assert c[key] <= n <= c[key] + c.error
+    assert c.most_common(1)[0][0] == 'a'
+
+    # summaries are mergeable
+    merged = HeavyHitters(items[:50], capacity=capacity)
+    merged.update(HeavyHitters(items[50:], capacity=capacity))
+    assert merged.n == len(items)
+    for key, n in exact.items():
+        assert merged[key] <= n <= merged[key] + merged.error
+
+    restored = pickle.loads(pickle.dumps(c))
+    assert restored == c
+    assert (restored.n, restored.error, restored.capacity) == \
+        (c.n, c.error, capacity)
+
+    with pytest.raises(ValueError):
+        HeavyHitters(items, capacity=0)
+
+
+@pytest.mark.parametrize("func", [
+    path2insight.name_counts,
+    path2insight.stem_counts,
+    path2insight.token_counts,
+])
+@pytest.mark.parametrize("columnar", [False, True])
+def test_counts_capacity(func, columnar):
+
+    paths = path2insight.parse(TEST_PATHS_PROFILE, os_name='windows')
+    data = PathFrame.from_paths(paths) if columnar else paths
+    exact = func(paths, lower=True)
+
+    c = func(data, lower=True, capacity=1000)
+    assert isinstance(c, HeavyHitters)
+    assert c == exact
+    assert c.error == 0
+
+    c = func(data, lower=True, capacity=2)
+    assert len(c) <= 2
+    for key, n in exact.items():
+        assert c[key] <= n <= c[key] + c.error
+
+    c = func(data, lower=True, normalize=True, capacity=1000)
+    assert c == func(paths, lower=True, normalize=True)
+
+    assert path2insight.merge_counts(
+        [func(paths[:5], capacity=1000), func(paths[5:], capacity=1000)]) \
+        == func(paths)
+
+
+def test_hyperloglog():
+
+    strings = ['path{}'.format(i) for i in range(20000)]
+
+    hll = HyperLogLog(strings + strings[:500])
+    assert abs(hll.cardinality() - 20000) < 20000 * 4 * hll.error
+    assert HyperLogLog(strings[:100]).cardinality() == 100
+    assert HyperLogLog().cardinality() == 0
+
+    # sketches are mergeable and independent of the order
+    merged = HyperLogLog(strings[:12000])
+    merged.update(HyperLogLog(reversed(strings[8000:])))
+    assert merged == hll
+    assert HyperLogLog(strings[:5]) | HyperLogLog(strings[5:]) == hll
+
+    assert pickle.loads(pickle.dumps(hll)) == hll
+
+    with pytest.raises(ValueError):
+        hll.update(HyperLogLog(precision=10))
+    with pytest.raises(ValueError):
+        HyperLogLog(precision=2)
+
+
+@pytest.mark.parametrize("func,exact", [
+    (path2insight.name_cardinality,
+     lambda paths: set([fp.name.lower() for fp in paths])),
+    (path2insight.stem_cardinality,
+     lambda paths: set([fp.stem.lower() for fp in paths])),
+    (path2insight.token_cardinality,
+     lambda paths: set(path2insight.token_counts(paths, lower=True))),
+    (path2insight.folder_cardinality,
+     lambda paths: set([fp.parent.as_posix().lower() for fp in paths
+                        if len(fp.parts) > 1])),
+])
+@pytest.mark.parametrize("columnar", [False, True])
+def test_cardinality(func, exact, columnar):
+
+    paths = path2insight.parse(TEST_PATHS_PROFILE, os_name='windows')
+    data = PathFrame.from_paths(paths) if columnar else paths
+
+    hll = func(data, lower=True)
+    assert hll.cardinality() == len(exact(paths))
+    assert hll == func(iter(paths), lower=True)
+    assert path2insight.merge_counts(
+        [func(paths[:5], lower=True), func(paths[5:], lower=True)]) == hll
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert func(paths, lower=True, executor=executor) == hll
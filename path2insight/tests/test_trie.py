@@ -0,0 +1,122 @@
+import re
+
+import pytest
+
+# seperated imports to prevent merge conflicts
+from path2insight import PathTrie, PathFrame
+import path2insight
+
+TEST_PATHS_TREE = [
+    'D:/data/armel/README',
+    'D:/data/armel/',
+    'D:/data/armel/.gitignore',
+    'C:/Program Files/unittest/docs.tar.gz',
+    'D:/data/armel/src/main.py',
+    'D:/data/armel/src/test.PY',
+    'D:/docs/armel',
+    'C:/Program Files/unittest/DOCS_11Mar2020-Armel final.pdf',
+    'data/file.txt',
+    'data/armel/file.txt',
+    'D:/data/armel/src/main.py',
+    'C:/',
+    '',
+]
+
+
+@pytest.fixture(params=[False, True])
+def paths(request):
+
+    return path2insight.parse(TEST_PATHS_TREE, os_name='windows',
+                              columnar=request.param)
+
+
+@pytest.mark.parametrize("kwargs", [
+    {},
+    {'level0': 'D:\\'},
+    {'level1': 'data'},
+    {'level2': 'armel'},
+    {'level1': ['data', 'docs'], 'level2': 'armel'},
+    {'level2': '*'},
+    {'level3': True},
+    {'level0': 'data', 'level2': '*'},
+    {'level3': 'main.py'},
+    {'level1': 'unknown'},
+    {'level1': 'data', 'level4': '*'},
+    {'level1': []},
+])
+def test_select(paths, kwargs):
+
+    trie = PathTrie(paths)
+
+    result = trie.select(**kwargs)
+    expected = path2insight.select(paths, **kwargs)
+
+    if isinstance(paths, PathFrame):
+        result = result.to_list()
+        expected = expected.to_list()
+    else:
+        assert path2insight.select(trie, **kwargs) == expected
+
+    assert result == expected
+
+
+@pytest.mark.parametrize("kwargs", [
+    {'level1': r"^d"},
+    {'level1': [r"^P", r"^d"], 'level3': r".*\.py$"},
+    {'level2': r"[A-Z]"},
+    {'level1': []},
+    {'level1': [re.compile("DATA", re.I), re.compile("DOCS", re.I)]},
+    {'level1': [re.compile("DATA", re.I), "docs"]},
+])
+def test_select_re(paths, kwargs):
+
+    trie = PathTrie(paths)
+
+    result = trie.select_re(**kwargs)
+    expected = path2insight.select_re(paths, **kwargs)
+
+    if isinstance(paths, PathFrame):
+        result = result.to_list()
+        expected = expected.to_list()
+
+    assert result == expected
+
+
+def test_select_invalid_keyword(paths):
+
+    with pytest.raises(TypeError):
+        PathTrie(paths).select(levels=1)
+
+
+@pytest.mark.parametrize("prefix", [
+    None, 'D:/data', 'D:/data/armel', 'D:/data/armel/src/main.py',
+    ('data',), 'D:/unknown', 'E:/'
+])
+def test_subtree(prefix):
+
+    paths = path2insight.parse(TEST_PATHS_TREE, os_name='windows')
+    trie = PathTrie(paths)
+
+    parts = path2insight.WindowsFilePath(prefix).parts \
+        if isinstance(prefix, str) else prefix or ()
+    expected = [fp for fp in paths if fp.parts[:len(parts)] == parts]
+
+    assert trie.subtree(prefix) == expected
+    assert trie.count(prefix) == len(expected)
+    assert trie.depth_counts(prefix) == path2insight.depth_counts(expected)
+    for lower in [False, True]:
+        assert trie.extension_counts(prefix, lower=lower) == \
+            path2insight.extension_counts(expected, lower=lower)
+
+    # the counts are kept in the index
+    assert trie.extension_counts(prefix) == \
+        path2insight.extension_counts(expected)
+
+
+def test_empty():
+
+    trie = PathTrie([])
+
+    assert len(trie) == 0
+    assert trie.select(level1='data') == []
+    assert trie.count() == 0
@@ -1,13 +1,103 @@
 import re
 
+from functools import lru_cache
+
 DEFAULT_TOKENIZE_PATTERN = r"(?u)([a-zA-Z0-9\:]+)(?=[^a-zA-Z0-9\:]|$)"
 DEFAULT_PATH_SPLIT_PATTERN = r"[\\\/]+"
 DEFAULT_CAMEL_SPLIT_PATTERN = None
 DEFAULT_TITLE_SPLIT_PATTERN = None
 
+# the maximum number of strings in the token cache of each pattern
+TOKEN_CACHE_SIZE = 100000
+
+# the token cache, {(token_pattern, lower): {string: tokens}}
+_token_cache = {}
+
+
+@lru_cache(maxsize=64)
+def _compile(token_pattern):
+    """Compile a token pattern (once)."""
+
+    if isinstance(token_pattern, type(re.compile(''))):
+        return token_pattern
+
+    return re.compile(token_pattern, re.UNICODE)
+
 
 def tokenizer(x, token_pattern):
-    return re.findall(token_pattern, x, re.UNICODE)
+    return _compile(token_pattern).findall(x)
+
+
+def _get_token_cache(token_pattern, lower=False):
+    """Return the token cache of a pattern."""
+
+    try:
+        return _token_cache[(token_pattern, lower)]
+    except KeyError:
+        return _token_cache.setdefault((token_pattern, lower), {})
+
+
+def _cache_tokens(cache, x, token_pattern, lower=False):
+    """Tokenise a string and add the tokens to the cache."""
+
+    if len(cache) >= TOKEN_CACHE_SIZE:
+        cache.clear()
+
+    tokens = cache[x] = tuple(
+        _compile(token_pattern).findall(x.lower() if lower else x))
+
+    return tokens
+
+
+def cached_tokenizer(x, token_pattern=DEFAULT_TOKENIZE_PATTERN):
+    """Make tokens of a string, using a shared cache.
+
+    The tokens of each string are computed once. This is much faster for
+    collections of file paths, in which the same folder names occur over
+    and over. The cache holds at most TOKEN_CACHE_SIZE strings for each
+    pattern, see :py:func:`clear_token_cache`.
+
+    :param x: The string.
+    :type x: str
+    :param token_pattern: The regular expression of a token.
+    :type token_pattern: str
+
+    :return: tuple of tokens (strings)
+    :return_type: tuple
+    """
+
+    cache = _get_token_cache(token_pattern)
+
+    try:
+        return cache[x]
+    except KeyError:
+        return _cache_tokens(cache, x, token_pattern)
+
+
+def _cached_tokenize_parts(parts, token_pattern=DEFAULT_TOKENIZE_PATTERN,
+                           lower=False):
+    """Make the tokens of a list of strings with the token cache.
+
+    Same as chaining cached_tokenizer over the (lowered) strings, but
+    without a function call for each string.
+    """
+
+    cache = _get_token_cache(token_pattern, lower)
+
+    tokens = []
+    for part in parts:
+        part_tokens = cache.get(part)
+        if part_tokens is None:
+            part_tokens = _cache_tokens(cache, part, token_pattern, lower)
+        tokens.extend(part_tokens)
+
+    return tuple(tokens)
+
+
+def clear_token_cache():
+    """Remove all strings from the token cache."""
+
+    _token_cache.clear()
 
 
 def splitter(x, split_pattern):
@@ -23,7 +113,7 @@ def default_tokenizer(x):
     :return: list of tokens (strings)
     :return_type: list
     """
-    return tokenizer(x, DEFAULT_TOKENIZE_PATTERN)
+    return list(cached_tokenizer(x, DEFAULT_TOKENIZE_PATTERN))
 
 
 def path_tokenizer(x):
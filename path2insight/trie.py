@@ -0,0 +1,409 @@
+"""Prefix tree index for fast selection and aggregation of file paths."""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+
+from path2insight.frame import PathFrame, _split_name
+from path2insight.utils import gc_paused
+
+# typecode of the array with the positions of the paths
+_POSITION_TYPECODE = 'q'
+
+
+class _TrieNode(object):
+    """A folder in the prefix tree.
+
+    The paths are stored in the order of a depth-first walk over the
+    folders. The paths below a folder are the range [start, end). The
+    paths in the folder itself come first, sorted by name, in the range
+    [files, mid).
+    """
+
+    __slots__ = ('children', 'depth', 'start', 'files', 'mid', 'end',
+                 'counts')
+
+    def __init__(self, depth):
+
+        self.children = {}
+        self.depth = depth
+        self.start = self.files = self.mid = self.end = 0
+        self.counts = None
+
+
+class PathTrie(object):
+    """Prefix tree (trie) index over a list of file paths.
+
+    The index is built once and answers level queries (like
+    :py:func:`path2insight.select` and :py:func:`path2insight.select_re`),
+    subtree listings and subtree counts in time that depends on the size
+    of the result, not on the number of indexed paths. Each folder is a
+    node of the tree, the paths below a folder are stored next to each
+    other.
+
+    :param paths: The paths to index.
+    :type paths: list of WindowsFilePath or PosixFilePath objects, PathFrame
+
+    :Example:
+
+    >>> trie = path2insight.PathTrie(paths)
+    >>> trie.select(level1='data', level3='*')
+    [PosixFilePath('/data/2015/PXD000001/file.raw'), ...]
+    >>> trie.count('/data/2015')
+    4128
+    >>> trie.extension_counts('/data/2015').most_common(2)
+    [('.raw', 3140), ('.mzML', 988)]
+
+    :Note:
+
+    The index refers to the paths, it does not copy them. Don't change the
+    list of paths after building the index.
+
+    """
+
+    def __init__(self, paths):
+
+        self.paths = paths
+
+        if isinstance(paths, PathFrame):
+            self.path_type = paths.path_type
+            rows = (parts for _, _, parts in paths.iterparts())
+        else:
+            self.path_type = type(paths[0]) if len(paths) else None
+            rows = (fp.parts for fp in paths)
+
+        self._root = root = _TrieNode(0)
+
+        # the entries (name, position in paths) of each folder, keyed by
+        # the parts of the folder
+        nodes = {(): root}
+        entries = {id(root): []}
+        empty = []
+
+        with gc_paused():
+            for i, parts in enumerate(rows):
+                if not parts:
+                    empty.append(i)
+                    continue
+
+                folder = parts[:-1]
+                try:
+                    node = nodes[folder]
+                except KeyError:
+                    node = root
+                    for part in folder:
+                        try:
+                            node = node.children[part]
+                        except KeyError:
+                            child = _TrieNode(node.depth + 1)
+                            node.children[part] = child
+                            entries[id(child)] = []
+                            node = child
+                    nodes[folder] = node
+
+                entries[id(node)].append((parts[-1], i))
+
+            self._order = array(_POSITION_TYPECODE, empty)
+            self._names = [None] * len(empty)
+            self._layout(root, entries)
+
+    def _layout(self, root, entries):
+        """Store the paths in the order of a depth-first walk."""
+
+        order = self._order
+        names = self._names
+
+        stack = [(root, False)]
+        while stack:
+            node, done = stack.pop()
+
+            if done:
+                node.end = len(order)
+                continue
+
+            if node is not root:
+                node.start = len(order)
+            node.files = len(order)
+
+            node_entries = entries.pop(id(node))
+            node_entries.sort()
+            order.extend([i for _, i in node_entries])
+            names.extend([name for name, _ in node_entries])
+            node.mid = len(order)
+
+            stack.append((node, True))
+            for name in sorted(node.children, reverse=True):
+                stack.append((node.children[name], False))
+
+    def __len__(self):
+        return len(self._order)
+
+    def __repr__(self):
+        return "PathTrie(n_paths={})".format(len(self))
+
+    def _take(self, positions):
+        """Return the paths at the positions, in the order of the input."""
+
+        order = self._order
+        indices = sorted([order[k] for k in positions])
+
+        if isinstance(self.paths, PathFrame):
+            return self.paths.take(indices)
+
+        return [self.paths[i] for i in indices]
+
+    def _prefix_parts(self, prefix):
+        """Return the parts of a prefix given as string, path or parts."""
+
+        if prefix is None:
+            return ()
+        if isinstance(prefix, (list, tuple)):
+            return tuple(prefix)
+        if hasattr(prefix, 'parts'):
+            return tuple(prefix.parts)
+
+        return tuple(self.path_type(prefix).parts)
+
+    def _find(self, parts):
+        """Return the folder node of parts, or None."""
+
+        node = self._root
+        for part in parts:
+            node = node.children.get(part)
+            if node is None:
+                return None
+
+        return node
+
+    def _file_range(self, node, name):
+        """Return the positions of the paths in a folder with this name."""
+
+        return (bisect_left(self._names, name, node.files, node.mid),
+                bisect_right(self._names, name, node.files, node.mid))
+
+    def _subtree_ranges(self, prefix):
+        """Return the position ranges of the paths that start with prefix.
+
+        The paths that start with prefix are the paths with prefix as
+        name in the parent folder and the paths in the folder prefix.
+        """
+
+        parts = self._prefix_parts(prefix)
+
+        if not parts:
+            return [(0, len(self))]
+
+        parent = self._find(parts[:-1])
+        if parent is None:
+            return []
+
+        ranges = [self._file_range(parent, parts[-1])]
+
+        folder = parent.children.get(parts[-1])
+        if folder is not None:
+            ranges.append((folder.start, folder.end))
+
+        return ranges
+
+    def subtree(self, prefix=None):
+        """Return the paths that start with prefix.
+
+        :param prefix: The parts of the folder, a path or a string. Default
+            None (all paths).
+        :type prefix: str, WindowsFilePath, PosixFilePath, tuple
+
+        :return: The paths below prefix (including prefix itself), in the
+            order of the indexed paths.
+        :return_type: list, PathFrame
+        """
+
+        return self._take(
+            [k for start, end in self._subtree_ranges(prefix)
+             for k in range(start, end)])
+
+    def count(self, prefix=None):
+        """Return the number of paths that start with prefix.
+
+        :param prefix: The parts of the folder, a path or a string. Default
+            None (all paths).
+        :type prefix: str, WindowsFilePath, PosixFilePath, tuple
+
+        :return: The number of paths.
+        :return_type: int
+        """
+
+        return sum([end - start
+                    for start, end in self._subtree_ranges(prefix)])
+
+    def _file_counts(self, start, end, key, depth):
+        """Count the paths in a range of a single folder."""
+
+        if key == 'depth':
+            return Counter({depth: end - start}) if end > start \
+                else Counter()
+
+        names = self._names[start:end]
+        if key[1]:
+            return Counter([_split_name(name)[1].lower() for name in names])
+        return Counter([_split_name(name)[1] for name in names])
+
+    def _node_counts(self, node, key):
+        """Count the paths below a node. The result is kept in the node."""
+
+        if node.counts is None:
+            node.counts = {}
+        elif key in node.counts:
+            return node.counts[key]
+
+        c = self._file_counts(node.files, node.mid, key, node.depth)
+        for child in node.children.values():
+            c.update(self._node_counts(child, key))
+
+        node.counts[key] = c
+
+        return c
+
+    def _counts(self, prefix, key):
+
+        parts = self._prefix_parts(prefix)
+
+        if not parts:
+            # the paths without parts have depth 0 and no extension
+            c = Counter(self._node_counts(self._root, key))
+            if self._root.files:
+                c[0 if key == 'depth' else ''] += self._root.files
+            return c
+
+        parent = self._find(parts[:-1])
+        if parent is None:
+            return Counter()
+
+        start, end = self._file_range(parent, parts[-1])
+        c = self._file_counts(start, end, key, parent.depth)
+
+        folder = parent.children.get(parts[-1])
+        if folder is not None:
+            c.update(self._node_counts(folder, key))
+
+        return c
+
+    def depth_counts(self, prefix=None):
+        """Count the depths of the paths that start with prefix.
+
+        The counts of each folder are computed once and kept in the index.
+
+        :param prefix: The parts of the folder, a path or a string. Default
+            None (all paths).
+        :type prefix: str, WindowsFilePath, PosixFilePath, tuple
+
+        :return: The depths counted (see
+            :py:func:`path2insight.depth_counts`).
+        :return_type: collections.Counter
+        """
+
+        return self._counts(prefix, 'depth')
+
+    def extension_counts(self, prefix=None, lower=False):
+        """Count the extensions of the paths that start with prefix.
+
+        The counts of each folder are computed once and kept in the index.
+
+        :param prefix: The parts of the folder, a path or a string. Default
+            None (all paths).
+        :type prefix: str, WindowsFilePath, PosixFilePath, tuple
+        :param lower: Convert the extensions to lower before counting.
+        :type lower: bool
+
+        :return: The extensions counted (see
+            :py:func:`path2insight.extension_counts`).
+        :return_type: collections.Counter
+        """
+
+        return self._counts(prefix, ('suffix', lower))
+
+    def select(self, **kwargs):
+        """Select paths based on their part names.
+
+        Same as :py:func:`path2insight.select`, only the folders on the
+        selected levels are visited.
+
+        :return: A list with the selection of matching filepaths (or a
+            PathFrame if the index is built from a PathFrame).
+        :return_type: list, PathFrame
+        """
+
+        return self._select(kwargs, False)
+
+    def select_re(self, **kwargs):
+        """Select paths based on their part names with regexp patterns.
+
+        Same as :py:func:`path2insight.select_re`, only the folders on the
+        selected levels are visited.
+
+        :return: A list with the selection of matching filepaths (or a
+            PathFrame if the index is built from a PathFrame).
+        :return_type: list, PathFrame
+        """
+
+        return self._select(kwargs, True)
+
+    def _select(self, levels, use_re):
+
+        # the level arguments are compiled like select and select_re
+        from path2insight.handling import _parse_levels, _compile_level
+
+        levels = dict(_parse_levels(levels))
+
+        if not levels:
+            return self._take(range(len(self)))
+
+        max_level = max(levels)
+
+        nodes = [self._root]
+        positions = []
+        for level in range(max_level + 1):
+            match = _compile_level(levels[level], use_re) \
+                if level in levels else None
+
+            if level == max_level:
+                for node in nodes:
+                    positions.extend(self._match_files(node, match))
+                    for child in _match_children(node, match):
+                        positions.extend(range(child.start, child.end))
+            else:
+                nodes = [child for node in nodes
+                         for child in _match_children(node, match)]
+
+        return self._take(positions)
+
+    def _match_files(self, node, match):
+        """Return the positions of the paths in a folder that match."""
+
+        if match is None:
+            return range(node.files, node.mid)
+
+        if isinstance(match, frozenset):
+            positions = []
+            for v in match:
+                if isinstance(v, str):
+                    positions.extend(range(*self._file_range(node, v)))
+            return positions
+
+        names = self._names
+        return [k for k in range(node.files, node.mid) if match(names[k])]
+
+
+def _match_children(node, match):
+    """Return the child folders of a node that match.
+
+    :param match: None (all children), a frozenset of names or a function
+        that takes the name and returns True if it matches.
+    """
+
+    if match is None:
+        return list(node.children.values())
+
+    if isinstance(match, frozenset):
+        return [node.children[v] for v in match if v in node.children]
+
+    return [child for name, child in node.children.items() if match(name)]
@@ -1,10 +1,14 @@
+import gc
 import sys
 
-from collections import Iterable
+from collections.abc import Iterable
+from contextlib import contextmanager
 
 from path2insight import WindowsFilePath, PosixFilePath
+from path2insight import CompactWindowsFilePath, CompactPosixFilePath
 
-PATH_OBJECT_TYPES = (WindowsFilePath, PosixFilePath)
+PATH_OBJECT_TYPES = (WindowsFilePath, PosixFilePath,
+                     CompactWindowsFilePath, CompactPosixFilePath)
 
 
 # ----------------------------------------------------
@@ -16,7 +20,7 @@ class VisibleDeprecationWarning(UserWarning):
     pass
 
 
-def MissingDependencyError(Exception):
+class MissingDependencyError(Exception):
     """Optional dependency not available."""
 
     pass
@@ -33,6 +37,34 @@ def _import_jellyfish():
             "Install the module 'jellyfish' to compute string distances.")
 
 
+def _import_numpy():
+    """Check if numpy is installed."""
+
+    try:
+        import numpy
+        return numpy
+    except ModuleNotFoundError:
+        raise MissingDependencyError(
+            "Install the module 'numpy' to compute distance matrices.")
+
+
+@contextmanager
+def gc_paused():
+    """Pause the cyclic garbage collector.
+
+    Creating many path objects triggers the garbage collector over and
+    over, while the objects contain no reference cycles.
+    """
+
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
 def iteritems(d):
     """Python 2, 3 compatibility."""
     try:
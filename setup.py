@@ -33,12 +33,6 @@ def get_version_number():
 
 REQUIRED_DEPENDENCIES = []
 
-# check if pathlib is available. If not, install pathlib2 (from pypi)
-try:
-    import pathlib
-except ImportError:
-    REQUIRED_DEPENDENCIES.append('pathlib2')
-
 setup(
     name='path2insight',
 
@@ -60,16 +54,18 @@ setup(
         'Intended Audience :: Developers',
         'Topic :: Software Development :: Build Tools',
         'License :: OSI Approved :: MIT License',
-        'Programming Language :: Python :: 2',
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.3',
-        'Programming Language :: Python :: 3.4',
-        'Programming Language :: Python :: 3.5',
+        'Programming Language :: Python :: 3 :: Only',
         'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
     ],
     keywords='filepath pathlib datamanagement exploration',
     packages=find_packages(exclude=['docs', 'tests']),
+    python_requires='>=3.6',
     install_requires=REQUIRED_DEPENDENCIES,
     extras_require={
         'test': ['pytest', 'parameterized'],